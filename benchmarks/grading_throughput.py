@@ -0,0 +1,282 @@
+"""
+Benchmark the throughput of grading a synthetic contest end to end.
+
+Generates a contest of P problems with A authors and T test cases each. Every
+problem asks for the sum of N integers, and every author submits a trivial C or
+Python solution that answers correctly, answers wrong, crashes or times out,
+cycling through the languages and the verdicts. The contest is then graded
+through the same entry point as `hammurabi grade`, with a trace. The discovery time,
+the test runs per second, the judge overhead per run, the median and 95th percentile
+of each phase of judging, and the report generation time are read from the trace and
+the result store of the grading run, and emitted as JSON to compare between releases.
+
+Usage: python -m benchmarks.grading_throughput [--problems P] [--authors A] [--testcases T]
+       [--input-size N] [--languages LANG [LANG ...]] [--verdicts VERDICT [VERDICT ...]]
+       [--jobs N] [--compile-jobs N] [--output FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError
+from pathlib import Path
+from typing import Any
+
+from hammurabi.grader import grader
+from hammurabi.grader import timing
+from hammurabi.grader.resultstore import RESULT_STORE_FILENAME
+from hammurabi.grader.resultstore import ResultStore
+from hammurabi.utils import product
+
+LANGUAGE_EXTENSIONS = {"c": ".c", "python": ".py"}
+
+C_SOLUTION_TEMPLATE = """\
+#include <stdio.h>
+
+int main(void) {{
+    long long count = 0, value = 0, total = 0;
+    FILE *input_file = fopen("{input_filename}", "r");
+    if (fscanf(input_file, "%lld", &count) != 1) return 1;
+    for (long long i = 0; i < count; i++) {{
+        if (fscanf(input_file, "%lld", &value) != 1) return 1;
+        total += value;
+    }}
+    fclose(input_file);
+{ending}
+}}
+"""
+
+C_ENDINGS = {
+    "correct": '    FILE *output_file = fopen("{output_filename}", "w");\n'
+    '    fprintf(output_file, "%lld\\n", total);\n'
+    "    fclose(output_file);\n"
+    "    return 0;",
+    "wrong": '    FILE *output_file = fopen("{output_filename}", "w");\n'
+    '    fprintf(output_file, "%lld\\n", total + 1);\n'
+    "    fclose(output_file);\n"
+    "    return 0;",
+    "crash": '    fprintf(stderr, "Crashed on purpose.\\n");\n    return 1;',
+    "timeout": "    volatile long long spin = 0;\n    for (;;) spin++;",
+}
+
+PYTHON_SOLUTION_TEMPLATE = """\
+with open("{input_filename}") as input_file:
+    count, *values = map(int, input_file.read().split())
+total = sum(values[:count])
+{ending}
+"""
+
+PYTHON_ENDINGS = {
+    "correct": 'with open("{output_filename}", "w") as output_file:\n'
+    '    output_file.write(f"{{total}}\\n")',
+    "wrong": 'with open("{output_filename}", "w") as output_file:\n'
+    '    output_file.write(f"{{total + 1}}\\n")',
+    "crash": 'raise SystemExit("Crashed on purpose.")',
+    "timeout": "while True:\n    pass",
+}
+
+VERDICTS = ("correct", "wrong", "crash", "timeout")
+
+
+def main() -> None:
+    """Run the benchmark and print or write its results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, default=2, help="Problems in the contest.")
+    parser.add_argument("--authors", type=int, default=8, help="Authors per problem.")
+    parser.add_argument("--testcases", type=int, default=10, help="Test cases per problem.")
+    parser.add_argument(
+        "--input-size", type=int, default=1000, metavar="N", help="Integers per test case."
+    )
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        choices=sorted(LANGUAGE_EXTENSIONS),
+        default=["c", "python"],
+        help="Languages of the solutions, assigned to the authors in turn.",
+    )
+    parser.add_argument(
+        "--verdicts",
+        nargs="+",
+        choices=VERDICTS,
+        default=list(VERDICTS),
+        help="Verdicts the solutions aim for, assigned to the authors in turn.",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=0.5, help="Time limit per test case, in seconds."
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Test cases run in parallel.")
+    parser.add_argument("--compile-jobs", type=int, default=1, help="Solutions compiled ahead.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated inputs.")
+    parser.add_argument("--output", metavar="FILE", help="Write the results to FILE.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="hammurabi-benchmark-") as contest_dir:
+        contest_path = Path(contest_dir)
+        _generate_contest(contest_path / "problems", args)
+        results = _grade_contest(contest_path, args)
+
+    output = json.dumps(
+        {
+            "benchmark": "grading_throughput",
+            "environment": _describe_environment(),
+            "parameters": vars(args),
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output is not None:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+def _generate_contest(problem_root: Path, args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    for problem_index in range(1, args.problems + 1):
+        problem_name = f"sum{problem_index}"
+        problem_path = problem_root / problem_name
+        (problem_path / "testcases").mkdir(parents=True)
+        (problem_path / "answers").mkdir()
+        time_limits = ", ".join(f"{language}: {args.time_limit}" for language in args.languages)
+        (problem_path / "problem.yaml").write_text(f"limits:\n  time: {{{time_limits}}}\n")
+
+        for testcase_index in range(1, args.testcases + 1):
+            values = [rng.randint(-(10**9), 10**9) for _ in range(args.input_size)]
+            testcase_name = f"{testcase_index:02d}"
+            (problem_path / "testcases" / f"{testcase_name}.in").write_text(
+                f"{len(values)}\n{' '.join(map(str, values))}\n"
+            )
+            (problem_path / "answers" / f"{testcase_name}.out").write_text(f"{sum(values)}\n")
+
+        for author_index in range(args.authors):
+            language = args.languages[author_index % len(args.languages)]
+            verdict = args.verdicts[(author_index // len(args.languages)) % len(args.verdicts)]
+            solution_path = problem_path / "solutions" / f"author{author_index:03d}-{verdict}"
+            solution_path.mkdir(parents=True)
+            source_path = solution_path / f"{problem_name}{LANGUAGE_EXTENSIONS[language]}"
+            source_path.write_text(_get_solution_source(problem_name, language, verdict))
+
+
+def _get_solution_source(problem_name: str, language: str, verdict: str) -> str:
+    template, endings = (
+        (C_SOLUTION_TEMPLATE, C_ENDINGS)
+        if language == "c"
+        else (PYTHON_SOLUTION_TEMPLATE, PYTHON_ENDINGS)
+    )
+    ending = endings[verdict].format(output_filename=f"{problem_name}.out")
+    return template.format(input_filename=f"{problem_name}.in", ending=ending)
+
+
+def _grade_contest(contest_path: Path, args: argparse.Namespace) -> dict[str, Any]:
+    """Grade the contest like `hammurabi grade`, and read the timings from its trace and results."""
+    config_filename = contest_path / "hammurabi.yaml"
+    problem_root = json.dumps(str(contest_path / "problems"))
+    report_root = json.dumps(str(contest_path / "reports"))
+    config_filename.write_text(
+        f"locations:\n  problem_root: {problem_root}\n  report_root: {report_root}\n"
+    )
+    trace_filename = contest_path / "trace.json"
+    grade_args = argparse.Namespace(
+        conf=str(config_filename),
+        problem=None,
+        author=None,
+        reference=False,
+        testcase=None,
+        jobs=args.jobs,
+        compile_jobs=args.compile_jobs,
+        repeat=1,
+        incremental=False,
+        trace=str(trace_filename),
+        profile=False,
+        resume=None,
+    )
+
+    start_ns = time.perf_counter_ns()
+    with contextlib.redirect_stdout(io.StringIO()):
+        grader.grade(grade_args)
+    grading_seconds = (time.perf_counter_ns() - start_ns) / 1e9
+
+    spans = [
+        event
+        for event in json.loads(trace_filename.read_text())["traceEvents"]
+        if event["ph"] == "X"
+    ]
+    [result_store_filename] = (contest_path / "reports").glob(f"*/{RESULT_STORE_FILENAME}")
+    with contextlib.closing(ResultStore(result_store_filename)) as result_store:
+        testruns = result_store.load_testruns()
+
+    # Judging spans from the first compilation to the last verified answer.
+    judging_spans = [span for span in spans if span["cat"] in ("compile", "run", "verify")]
+    judging_seconds = (
+        max(span["ts"] + span["dur"] for span in judging_spans)
+        - min(span["ts"] for span in judging_spans)
+    ) / 1e6
+    # The time of judging a test run that isn't spent running the solution.
+    overheads_ns = sorted(
+        judge_ns - execute_ns
+        for testrun in testruns
+        if (judge_ns := testrun.get_phase_time_ns("judge")) is not None
+        and (execute_ns := testrun.get_phase_time_ns("execute")) is not None
+    )
+    return {
+        "testruns": len(testruns),
+        "results": dict(
+            sorted(
+                collections.Counter(
+                    testrun.result.status_code if testrun.result else "" for testrun in testruns
+                ).items()
+            )
+        ),
+        "compiled_solutions": sum(1 for span in spans if span["cat"] == "compile"),
+        "grading_seconds": grading_seconds,
+        "discovery_seconds": _get_span_seconds(spans, "discovery"),
+        "judging_seconds": judging_seconds,
+        "runs_per_second": len(testruns) / judging_seconds if judging_seconds else None,
+        "judge_overhead_ms": _summarize_ms(overheads_ns),
+        "phase_ms": {
+            phase: {"p50": p50_ns / 1e6, "p95": p95_ns / 1e6}
+            for phase, (p50_ns, p95_ns) in timing.summarize_phase_times(testruns).items()
+        },
+        "report_seconds": _get_span_seconds(spans, "report"),
+    }
+
+
+def _get_span_seconds(spans: list[dict[str, Any]], category: str) -> float:
+    """Return the total duration of the trace spans of a category, in seconds."""
+    return sum(span["dur"] for span in spans if span["cat"] == category) / 1e6
+
+
+def _summarize_ms(ordered_times_ns: list[int]) -> dict[str, float] | None:
+    if not ordered_times_ns:
+        return None
+    return {
+        "p50": timing.get_percentile(ordered_times_ns, 0.5) / 1e6,
+        "p95": timing.get_percentile(ordered_times_ns, 0.95) / 1e6,
+        "mean": sum(ordered_times_ns) / len(ordered_times_ns) / 1e6,
+    }
+
+
+def _describe_environment() -> dict[str, Any]:
+    try:
+        hammurabi_version = product.get_version_string()
+    except PackageNotFoundError:
+        hammurabi_version = None
+    return {
+        "hammurabi": hammurabi_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+if __name__ == "__main__":
+    main()
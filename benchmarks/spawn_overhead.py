@@ -0,0 +1,91 @@
+"""
+Benchmark the overhead of spawning a solution process with resource limits.
+
+Compares spawning a trivial command with the limits applied by a `preexec_fn`,
+which forces `subprocess` to fork the grader, with the limits applied by the spawn
+shell of `hammurabi.grader.runners.spawn`, which lets `subprocess` use `vfork` or
+`posix_spawn`. Since the cost of `fork` grows with the memory of the parent, each
+method is measured with the grader holding different amounts of resident memory.
+
+Usage: python -m benchmarks.spawn_overhead [--runs N] [--grader-memory MB [MB ...]]
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+from hammurabi.grader.runners.spawn import SpawnLimits
+from hammurabi.grader.runners.spawn import get_preexec_fn
+from hammurabi.grader.runners.spawn import get_spawn_command
+
+
+def main() -> None:
+    """Run the benchmark and print the median spawn time of each method."""
+    if sys.platform == "win32":
+        sys.exit("The spawn overhead benchmark requires a POSIX system.")
+    import resource  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=200, help="Spawns per measurement.")
+    parser.add_argument(
+        "--grader-memory",
+        type=int,
+        nargs="+",
+        default=[0, 256, 1024],
+        metavar="MB",
+        help="Resident memory held by the grader during each measurement.",
+    )
+    args = parser.parse_args()
+
+    cmd = [shutil.which("true") or "/bin/true"]
+    limits = SpawnLimits(
+        rlimits={
+            resource.RLIMIT_AS: (512 * 1024 * 1024, 512 * 1024 * 1024),
+            resource.RLIMIT_CPU: (10, 11),
+        }
+    )
+    methods: dict[str, Callable[[], None]] = {
+        "no limits": lambda: _spawn(cmd),
+        "preexec_fn": lambda: _spawn(cmd, preexec_fn=get_preexec_fn(limits)),
+        "spawn shell": lambda: _spawn(get_spawn_command(cmd, limits)),
+    }
+
+    print(f"Median time to spawn and reap `{cmd[0]}`, over {args.runs} runs (microseconds):")
+    print()
+    print(f"{'grader memory':>14}" + "".join(f"{name:>14}" for name in methods))
+    for grader_memory_mb in args.grader_memory:
+        ballast = _allocate_resident_memory(grader_memory_mb)
+        medians = [_measure(method, args.runs) for method in methods.values()]
+        print(f"{grader_memory_mb:>11} MB" + "".join(f"{median:>14.0f}" for median in medians))
+        del ballast
+
+
+def _spawn(cmd: list[str], preexec_fn: Callable[[], None] | None = None) -> None:
+    subprocess.Popen(cmd, preexec_fn=preexec_fn).wait()  # noqa: PLW1509
+
+
+def _measure(method: Callable[[], None], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter_ns()
+        method()
+        timings.append((time.perf_counter_ns() - start_time) / 1000)
+    return statistics.median(timings)
+
+
+def _allocate_resident_memory(size_mb: int) -> bytearray:
+    ballast = bytearray(size_mb * 1024 * 1024)
+    # Touch every page, so that the memory is resident and `fork` has to copy its mappings.
+    for offset in range(0, len(ballast), 4096):
+        ballast[offset] = 1
+    return ballast
+
+
+if __name__ == "__main__":
+    main()
@@ -95,6 +95,83 @@ def _parse_command_line_args(args: list[str]) -> argparse.Namespace:
         help="Run only these particular test cases (by name, no extensions).",
         required=False,
     )
+    grade_command_parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Run up to N test cases of a solution in parallel (default: 1).",
+        required=False,
+    )
+    grade_command_parser.add_argument(
+        "--compile-jobs",
+        dest="compile_jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help=(
+            "Compile up to N upcoming solutions in the background "
+            "while the current one runs (default: 1)."
+        ),
+        required=False,
+    )
+    grade_command_parser.add_argument(
+        "--repeat",
+        dest="repeat",
+        type=_positive_int,
+        default=1,
+        metavar="K",
+        help=(
+            "Run each correct solution K times per test case and report "
+            "the median, MAD, minimum and confidence interval of its time (default: 1)."
+        ),
+        required=False,
+    )
+
+    grade_command_parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        help=(
+            "Reuse the stored results of test runs whose solution, test case "
+            "and settings haven't changed since a previous grading run."
+        ),
+        required=False,
+    )
+
+    grade_command_parser.add_argument(
+        "--trace",
+        dest="trace",
+        metavar="FILE",
+        help=(
+            "Write a trace of the grading run to FILE in the Trace Event Format, "
+            "to open in chrome://tracing or Perfetto."
+        ),
+        required=False,
+    )
+
+    grade_command_parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        help=(
+            "Profile the grader's own code, and write the profile with a summary "
+            "of its hotspots to the report directory."
+        ),
+        required=False,
+    )
+
+    grade_command_parser.add_argument(
+        "--resume",
+        dest="resume",
+        metavar="REPORT_DIR",
+        help=(
+            "Resume an interrupted grading run in its report directory, "
+            "skipping the test runs it has already finished."
+        ),
+        required=False,
+    )
 
     languages_command = "languages"
     languages_command_description = "Describe the configured language compilers/interpreters."
@@ -128,6 +205,17 @@ def _parse_command_line_args(args: list[str]) -> argparse.Namespace:
         sys.exit(ERROR_INVALID_ARGS)
 
 
+def _positive_int(value: str) -> int:
+    """Parse a strictly positive integer command-line argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: '{value}'") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
 def _print_banner() -> None:
     """Print the product banner."""
     product.print_banner()
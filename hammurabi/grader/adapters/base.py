@@ -3,21 +3,29 @@
 from __future__ import annotations
 
 import contextlib
+import dataclasses
+import hashlib
 import shutil
 import subprocess
+import threading
+import traceback
+from collections.abc import Iterator
 from pathlib import Path
 
 from hammurabi.exceptions import OutputDirectoryError
 from hammurabi.exceptions import TestRunPrematureTerminationError
 from hammurabi.grader import runners
+from hammurabi.grader.buildcache import BuildCache
 from hammurabi.grader.config import ProblemConfig
 from hammurabi.grader.model import Solution
 from hammurabi.grader.model import TestCase
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunCompilationErrorResult
 from hammurabi.grader.model import TestRunFormatErrorResult
+from hammurabi.grader.model import TestRunInternalErrorResult
 from hammurabi.grader.model import TestRunRuntimeErrorResult
 from hammurabi.grader.model import TestRunSolutionMissingResult
+from hammurabi.grader.runners import affinity
 from hammurabi.grader.runners.base import BaseSolutionRunner
 from hammurabi.utils import fileio
 
@@ -31,7 +39,13 @@ class BaseSolutionAdapter:
 
     def __init__(self, solution: Solution | None) -> None:
         self.is_compiled = False
+        self.compilation_error: (
+            TestRunCompilationErrorResult | TestRunInternalErrorResult | None
+        ) = None
+        self.compiler_output_filename: str | None = None
         self.solution = solution
+        self._solution_digest: str | None = None
+        self._compile_lock = threading.Lock()
         if solution is not None:
             self.config = solution.problem.config
             self.output_dir = (
@@ -79,13 +93,80 @@ class BaseSolutionAdapter:
         except OSError as e:
             raise OutputDirectoryError("Internal error: cannot create output directory") from e
 
+    def precompile(self, testcase: TestCase) -> None:
+        """
+        Compile the solution ahead of its first test run.
+
+        This is best effort: nothing is raised here. A compilation error, or any other
+        failure to compile, is memoized by `ensure_compiled` and reported by every
+        subsequent test run.
+        """
+        if self.get_entry_point_file() is None:
+            return
+        with contextlib.suppress(Exception):
+            self.ensure_compiled(self.create_testrun(testcase))
+
+    def ensure_compiled(self, testrun: TestRun) -> None:
+        """
+        Compile the solution once and replay the outcome for all subsequent test runs.
+
+        Both successful and failed compilations are memoized, so a solution with a
+        compilation error does not invoke the compiler again for every test case.
+        Neither does a compiler that can't be started: any other failure is raised
+        as is, and replayed as an internal error for the subsequent test runs.
+
+        Raises
+        ------
+        TestRunPrematureTerminationError
+            If the solution failed to compile (now or during an earlier test run).
+        """
+        # Concurrent test runs of the same solution must wait for a single compilation.
+        with self._compile_lock:
+            if not self.is_compiled and self.compilation_error is None:
+                self.compiler_output_filename = testrun.compiler_output_filename
+                try:
+                    # The compiler must not compete with the grader on its judge core.
+                    with affinity.unpinned():
+                        self.compile(testrun)
+                except TestRunPrematureTerminationError as e:
+                    if isinstance(e.result, TestRunCompilationErrorResult):
+                        self.compilation_error = e.result
+                    raise
+                except Exception:
+                    self.compilation_error = TestRunInternalErrorResult(
+                        exception_info=traceback.format_exc()
+                    )
+                    raise
+
+        # Point every test run at the log of the one compilation that actually happened.
+        testrun.compiler_output_filename = self.compiler_output_filename
+
+        if self.compilation_error is not None:
+            result = dataclasses.replace(self.compilation_error)
+            raise TestRunPrematureTerminationError(result)
+
     def compile(self, testrun: TestRun) -> None:
-        """Compile the solution if required."""
+        """Compile the solution if required, reusing the build cache when it's enabled."""
         solution = self._require_solution()
         compile_cmd = self.get_compile_command_line(testrun)
 
         if compile_cmd is not None:
+            assert solution.root_dir is not None
             assert testrun.compiler_output_filename is not None
+            compile_env = self.get_compile_env()
+
+            build_cache = BuildCache.from_config(self.config)
+            cache_key = ""
+            if build_cache is not None:
+                cache_key = build_cache.compute_key(
+                    solution.root_dir, solution.files, compile_cmd, compile_env
+                )
+                if build_cache.restore(
+                    cache_key, solution.root_dir, testrun.compiler_output_filename
+                ):
+                    self.is_compiled = True
+                    return
+
             with open(testrun.compiler_output_filename, "w", encoding="utf-8") as compiler_output:
                 try:
                     exit_code = subprocess.call(
@@ -94,7 +175,7 @@ class BaseSolutionAdapter:
                         cwd=solution.root_dir,
                         stdout=compiler_output,
                         stderr=compiler_output,
-                        env=self.get_compile_env(),
+                        env=compile_env,
                         timeout=60,
                     )
                 except subprocess.TimeoutExpired:
@@ -107,8 +188,51 @@ class BaseSolutionAdapter:
                 result = TestRunCompilationErrorResult(message=compiler_output_text)
                 raise TestRunPrematureTerminationError(result)
 
+            if build_cache is not None:
+                build_cache.store(
+                    cache_key,
+                    solution.root_dir,
+                    testrun.compiler_output_filename,
+                    exclude=self._get_build_cache_exclusions(),
+                )
+
         self.is_compiled = True
 
+    def get_solution_digest(self) -> str | None:
+        """
+        Return a digest of the compiled solution directory, or None if it isn't compiled.
+
+        The digest covers both the sources and the compiled artifacts, but not the
+        input and output files of the problem.
+        """
+        solution = self._require_solution()
+        with self._compile_lock:
+            if not self.is_compiled or solution.root_dir is None:
+                return None
+
+            if self._solution_digest is None:
+                root_path = Path(solution.root_dir)
+                excluded = {solution.problem.input_filename, solution.problem.output_filename}
+                hasher = hashlib.sha256()
+                for file_path in sorted(fileio.walk_files(root_path)):
+                    relative_name = file_path.relative_to(root_path).as_posix()
+                    if relative_name in excluded:
+                        continue
+                    hasher.update(relative_name.encode("utf-8") + b"\0")
+                    hasher.update(fileio.hash_file(file_path).encode("ascii") + b"\0")
+                self._solution_digest = hasher.hexdigest()
+
+            return self._solution_digest
+
+    def _get_build_cache_exclusions(self) -> list[str]:
+        """Return the files in the solution directory that are not compilation artifacts."""
+        solution = self._require_solution()
+        assert solution.root_dir is not None
+        root_path = Path(solution.root_dir)
+        exclusions = [Path(f).relative_to(root_path).as_posix() for f in solution.files]
+        exclusions.extend([solution.problem.input_filename, solution.problem.output_filename])
+        return exclusions
+
     def get_compile_command_line(self, testrun: TestRun) -> list[str] | None:
         """Return the compilation command as an argument list, or None if not needed."""
         return None
@@ -140,19 +264,54 @@ class BaseSolutionAdapter:
             )
         return entry_point_file
 
-    def supply_testcase(self, testcase: TestCase) -> None:
-        """Copy the test case input to the solution directory."""
+    def get_work_dir(self, testrun: TestRun) -> Path:
+        """Return the directory in which the solution runs for a test run."""
+        if testrun.work_dir is not None:
+            return Path(testrun.work_dir)
         solution = self._require_solution()
         assert solution.root_dir is not None
-        solution_input_path = Path(solution.root_dir) / solution.problem.input_filename
-        shutil.copyfile(testcase.input_filename, solution_input_path)
+        return Path(solution.root_dir)
 
-    def cleanup_testcase(self, testcase: TestCase) -> None:
-        """Remove the test case input from the solution directory."""
+    def create_work_dir(self, testrun: TestRun) -> None:
+        """
+        Create a private working directory for the test run.
+
+        The working directory replicates the (compiled) solution directory using
+        reflinks where the filesystem allows, so test runs of the same solution don't
+        share any state and can run at the same time. Hard links are never used, since
+        the solution may write to its working directory.
+        """
         solution = self._require_solution()
         assert solution.root_dir is not None
-        solution_input_path = Path(solution.root_dir) / solution.problem.input_filename
-        solution_input_path.unlink()
+        work_dir = self.output_dir / ".workspace" / testrun.testcase.name
+        shutil.rmtree(work_dir, ignore_errors=True)
+        fileio.clone_tree(solution.root_dir, work_dir, allow_hard_link=False)
+        testrun.work_dir = str(work_dir)
+
+        # A stale output file must never be mistaken for the answer of this run.
+        (work_dir / solution.problem.output_filename).unlink(missing_ok=True)
+
+    def remove_work_dir(self, testrun: TestRun) -> None:
+        """Remove the private working directory of the test run, if any."""
+        if testrun.work_dir is None:
+            return
+        shutil.rmtree(testrun.work_dir, ignore_errors=True)
+
+    def supply_testcase(self, testrun: TestRun) -> None:
+        """Place a private replica of the test case input into the working directory."""
+        solution = self._require_solution()
+        solution_input_path = self.get_work_dir(testrun) / solution.problem.input_filename
+        solution_input_path.unlink(missing_ok=True)
+        # A hard link would let the solution overwrite the input of the test case.
+        fileio.clone_file(
+            testrun.testcase.input_filename, solution_input_path, allow_hard_link=False
+        )
+
+    def cleanup_testcase(self, testrun: TestRun) -> None:
+        """Remove the test case input from the working directory."""
+        solution = self._require_solution()
+        solution_input_path = self.get_work_dir(testrun) / solution.problem.input_filename
+        solution_input_path.unlink(missing_ok=True)
 
     def get_source_files(self) -> list[str]:
         """Return all source files for the solution."""
@@ -167,13 +326,19 @@ class BaseSolutionAdapter:
         entry_point = self.get_entry_point_file()
         return [solution.language or "", entry_point or ""]
 
-    def create_testrun(self, testcase: TestCase) -> TestRun:
-        """Create a TestRun instance for a test case."""
+    def create_testrun(self, testcase: TestCase, attempt: int = 1) -> TestRun:
+        """
+        Create a TestRun instance for a test case.
+
+        The test runs of later attempts, which re-run a borderline test run,
+        keep their output files next to those of the first attempt.
+        """
         solution = self._require_solution()
+        output_name = testcase.name if attempt == 1 else f"{testcase.name}.attempt{attempt}"
         compiler_output_filename = str(self.output_dir / f"compiler_{testcase.name}.log")
-        answer_filename = str(self.output_dir / f"{testcase.name}.out")
-        stdout_filename = str(self.output_dir / f"{testcase.name}.stdout")
-        stderr_filename = str(self.output_dir / f"{testcase.name}.stderr")
+        answer_filename = str(self.output_dir / f"{output_name}.out")
+        stdout_filename = str(self.output_dir / f"{output_name}.stdout")
+        stderr_filename = str(self.output_dir / f"{output_name}.stderr")
         memory_limit = self.config.limits.memory
         time_limit = self.config.limits.time.get_for_language(solution.language)
 
@@ -190,23 +355,48 @@ class BaseSolutionAdapter:
         )
 
     def run(self, testrun: TestRun) -> None:
-        """Run the solution for a test case."""
+        """Run the solution for a test case, timing the phases of the run in its `data`."""
+        with testrun.timed_phase("run"), self._prepare_run(testrun) as cmd:
+            runner = self.create_runner(testrun, cmd)
+            with testrun.timed_phase("execute"):
+                runner.run(testrun, cmd)
+
+    async def run_async(self, testrun: TestRun) -> None:
+        """
+        Run the solution for a test case from an asyncio event loop.
+
+        Only the run itself is awaited: a solution that isn't compiled yet
+        (see `precompile`) is compiled while blocking the event loop.
+        """
+        with testrun.timed_phase("run"), self._prepare_run(testrun) as cmd:
+            runner = self.create_runner(testrun, cmd)
+            with testrun.timed_phase("execute"):
+                await runner.run_async(testrun, cmd)
+
+    @contextlib.contextmanager
+    def _prepare_run(self, testrun: TestRun) -> Iterator[list[str]]:
+        """Set up the working directory of a test run, yield its command, then collect output."""
         if self.get_entry_point_file() is None:
             result = TestRunSolutionMissingResult()
             raise TestRunPrematureTerminationError(result)
 
-        if not self.is_compiled:
-            self.compile(testrun)
+        self.ensure_compiled(testrun)
 
         try:
-            self.supply_testcase(testrun.testcase)
-            cmd = self.get_run_command_line(testrun)
-            runner = self.create_runner(testrun, cmd)
-            runner.run(testrun, cmd)
+            with testrun.timed_phase("work_dir"):
+                self.create_work_dir(testrun)
+            try:
+                with testrun.timed_phase("supply_testcase"):
+                    self.supply_testcase(testrun)
+                yield self.get_run_command_line(testrun)
+            finally:
+                self.cleanup_testcase(testrun)
+
+            with testrun.timed_phase("collect_output"):
+                self.collect_output(testrun)
         finally:
-            self.cleanup_testcase(testrun.testcase)
-
-        self.collect_output(testrun)
+            with testrun.timed_phase("work_dir"):
+                self.remove_work_dir(testrun)
 
     def create_runner(self, testrun: TestRun, cmd: list[str]) -> BaseSolutionRunner:
         """Create the appropriate runner for the solution."""
@@ -222,11 +412,10 @@ class BaseSolutionAdapter:
     def collect_output(self, testrun: TestRun) -> None:
         """Collect the solution output after execution."""
         solution = self._require_solution()
-        assert solution.root_dir is not None
         assert testrun.stderr_filename is not None
         assert testrun.answer_filename is not None
 
-        given_answer_path = Path(solution.root_dir) / solution.problem.output_filename
+        given_answer_path = self.get_work_dir(testrun) / solution.problem.output_filename
         if not given_answer_path.exists():
             stderr_path = Path(testrun.stderr_filename)
             if stderr_path.stat().st_size > 0:
@@ -0,0 +1,114 @@
+"""Admission control of concurrent solution runs by their memory limits."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+
+import psutil
+
+from hammurabi.grader.model import TestRun
+
+# The key of the per-language concurrency caps in the runner parameters.
+CONCURRENCY_CAPS_PARAM = "max_concurrent_runs"
+
+
+def get_default_memory_budget_mb(fraction: float) -> int:
+    """Return the given fraction of the memory that is currently available, in megabytes."""
+    return int(psutil.virtual_memory().available * fraction / (1024 * 1024))
+
+
+def get_concurrency_cap(testrun: TestRun) -> int | None:
+    """Return the maximum number of concurrent runs of the test run's language, if capped."""
+    caps = testrun.solution.problem.config.runner.params.get(CONCURRENCY_CAPS_PARAM) or {}
+    cap = caps.get(testrun.solution.language)
+    return int(cap) if cap is not None else None
+
+
+class AdmissionController:
+    """
+    Starts a solution run only when its memory limit fits into the memory budget.
+
+    The memory limits of the running solutions are reserved from the budget, so
+    that concurrent runs can't make the machine swap even if they all use the memory
+    they're allowed to. A run is also held back while the number of running
+    solutions in its language is at the cap set by `runner.params.max_concurrent_runs`.
+    A run is always admitted when nothing else is running, even if its limit
+    exceeds the budget on its own.
+
+    Runs can be admitted from worker threads and from asyncio event loops alike.
+    """
+
+    def __init__(self, memory_budget_mb: int) -> None:
+        self.memory_budget_mb = memory_budget_mb
+        self._reserved_memory_mb = 0
+        self._running_by_language: dict[str | None, int] = {}
+        self._condition = threading.Condition()
+        # Events of the asyncio tasks waiting for a run to finish, with their event loops.
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @contextlib.contextmanager
+    def admit(self, testrun: TestRun) -> Iterator[None]:
+        """Block until the test run may start, and hold its reservation while in the context."""
+        memory_mb, language, cap = _get_request(testrun)
+        with testrun.timed_phase("admission"), self._condition:
+            while not self._try_reserve(memory_mb, language, cap):
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            self._release(memory_mb, language)
+
+    @contextlib.asynccontextmanager
+    async def admit_async(self, testrun: TestRun) -> AsyncIterator[None]:
+        """Wait until the test run may start, without blocking the event loop, like `admit`."""
+        memory_mb, language, cap = _get_request(testrun)
+        loop = asyncio.get_running_loop()
+        with testrun.timed_phase("admission"):
+            while True:
+                with self._condition:
+                    if self._try_reserve(memory_mb, language, cap):
+                        break
+                    waiter = (loop, asyncio.Event())
+                    self._async_waiters.append(waiter)
+                try:
+                    await waiter[1].wait()
+                finally:
+                    with self._condition, contextlib.suppress(ValueError):
+                        self._async_waiters.remove(waiter)
+        try:
+            yield
+        finally:
+            self._release(memory_mb, language)
+
+    def _try_reserve(self, memory_mb: int, language: str | None, cap: int | None) -> bool:
+        """Reserve the resources of a run if they are available. Must hold the condition."""
+        running = sum(self._running_by_language.values())
+        running_in_language = self._running_by_language.get(language, 0)
+        if running > 0 and self._reserved_memory_mb + memory_mb > self.memory_budget_mb:
+            return False
+        if cap is not None and running_in_language >= max(cap, 1):
+            return False
+        self._reserved_memory_mb += memory_mb
+        self._running_by_language[language] = running_in_language + 1
+        return True
+
+    def _release(self, memory_mb: int, language: str | None) -> None:
+        with self._condition:
+            self._reserved_memory_mb -= memory_mb
+            self._running_by_language[language] -= 1
+            self._condition.notify_all()
+            async_waiters, self._async_waiters = self._async_waiters, []
+        for loop, event in async_waiters:
+            # The loop of a cancelled waiter may be closed already.
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(event.set)
+
+
+def _get_request(testrun: TestRun) -> tuple[int, str | None, int | None]:
+    """Return the memory to reserve for a test run, its language and its concurrency cap."""
+    memory_mb = testrun.memory_limit or testrun.solution.problem.config.limits.memory
+    return memory_mb, testrun.solution.language, get_concurrency_cap(testrun)
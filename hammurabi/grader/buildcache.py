@@ -0,0 +1,256 @@
+"""Persistent, content-addressed cache of compiled solutions."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import uuid
+from collections.abc import Iterable
+from collections.abc import Sequence
+from pathlib import Path
+
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.utils import fileio
+
+MANIFEST_FILENAME = "manifest.json"
+ARTIFACTS_DIRNAME = "artifacts"
+COMPILER_OUTPUT_FILENAME = "compiler.log"
+
+# Environment variables that can change the outcome of a compilation.
+RELEVANT_ENV_VARIABLES = {
+    "CLASSPATH",
+    "CPATH",
+    "C_INCLUDE_PATH",
+    "CPLUS_INCLUDE_PATH",
+    "INCLUDE",
+    "LANG",
+    "LIB",
+    "LIBPATH",
+    "LIBRARY_PATH",
+    "PATH",
+}
+RELEVANT_ENV_PREFIXES = ("DOTNET_", "GCC_", "JAVA_", "JDK_", "LC_", "MSBUILD", "NUGET_")
+
+
+class BuildCache:
+    """
+    On-disk cache of compiled solutions shared across grading runs.
+
+    Entries are keyed by a hash of the solution sources, the compile command line,
+    the compiler identity and version, and the relevant environment variables.
+    Each entry stores the files left in the solution directory by the compiler,
+    along with the compiler output. Least recently used entries are evicted once
+    the total size of the cache exceeds the configured limit.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_size_bytes: int) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+
+    @classmethod
+    def from_config(cls, config: ProblemConfig) -> BuildCache | None:
+        """Create the build cache described by the configuration, or None if it's disabled."""
+        if not config.build_cache.enabled or not config.build_cache_dir:
+            return None
+        return cls(config.build_cache_dir, config.build_cache.max_size_mb * 1024 * 1024)
+
+    def compute_key(
+        self,
+        solution_root_dir: str,
+        source_files: Iterable[str],
+        compile_cmd: Sequence[str],
+        compile_env: dict[str, str] | None,
+    ) -> str:
+        """
+        Compute the cache key of a compilation.
+
+        Parameters
+        ----------
+        solution_root_dir
+            The directory the compiler runs in.
+        source_files
+            The source files of the solution.
+        compile_cmd
+            The compile command line.
+        compile_env
+            The compiler environment, or None if the current environment is inherited.
+
+        Returns
+        -------
+        str
+            A hex digest that changes whenever anything affecting the build changes.
+        """
+        hasher = hashlib.sha256()
+
+        def update(*parts: str) -> None:
+            for part in parts:
+                hasher.update(part.encode("utf-8"))
+                hasher.update(b"\0")
+
+        # The solution may be graded from a different location, so the key uses relative paths.
+        root_path = Path(solution_root_dir)
+        for source_file in sorted(source_files):
+            source_path = Path(source_file)
+            with contextlib.suppress(ValueError):
+                source_path = source_path.relative_to(root_path)
+            update("source", source_path.as_posix(), fileio.hash_file(source_file))
+
+        update("command", *[arg.replace(solution_root_dir, "<root>") for arg in compile_cmd])
+
+        env = compile_env if compile_env is not None else dict(os.environ)
+        update("compiler", *get_executable_identity(compile_cmd[0], env.get("PATH")))
+        for name, value in sorted(env.items()):
+            if name in RELEVANT_ENV_VARIABLES or name.startswith(RELEVANT_ENV_PREFIXES):
+                update("env", name, value)
+
+        return hasher.hexdigest()
+
+    def restore(self, key: str, solution_root_dir: str, compiler_output_filename: str) -> bool:
+        """
+        Restore the compiled artifacts of a cache entry into the solution directory.
+
+        Returns
+        -------
+        bool
+            True on a cache hit, False if the entry is missing or unusable.
+        """
+        entry_dir = self._get_entry_dir(key)
+        manifest_path = entry_dir / MANIFEST_FILENAME
+        try:
+            with open(manifest_path, encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+
+            for relative_name in manifest["files"]:
+                target_path = Path(solution_root_dir) / relative_name
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                target_path.unlink(missing_ok=True)
+                fileio.clone_file(
+                    entry_dir / ARTIFACTS_DIRNAME / relative_name,
+                    target_path,
+                    allow_hard_link=False,
+                )
+
+            shutil.copyfile(entry_dir / COMPILER_OUTPUT_FILENAME, compiler_output_filename)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError):
+            # A corrupted entry is treated as a miss and replaced on the next store.
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return False
+
+        # Mark the entry as recently used.
+        with contextlib.suppress(OSError):
+            os.utime(manifest_path)
+        return True
+
+    def store(
+        self,
+        key: str,
+        solution_root_dir: str,
+        compiler_output_filename: str,
+        exclude: Iterable[str] = (),
+    ) -> None:
+        """
+        Store the files in the solution directory as the artifacts of a compilation.
+
+        Parameters
+        ----------
+        key
+            The cache key computed by `compute_key`.
+        solution_root_dir
+            The directory containing the compiled solution.
+        compiler_output_filename
+            The file containing the compiler output.
+        exclude
+            Paths (relative to the solution directory) that must not be stored,
+            such as the source files.
+        """
+        root_path = Path(solution_root_dir)
+        excluded = set(exclude)
+        staging_dir = self.cache_dir / "staging" / uuid.uuid4().hex
+        artifacts_dir = staging_dir / ARTIFACTS_DIRNAME
+
+        try:
+            artifacts_dir.mkdir(parents=True)
+            files: list[str] = []
+            total_size = 0
+            for file_path in sorted(fileio.walk_files(root_path)):
+                relative_name = file_path.relative_to(root_path).as_posix()
+                if relative_name in excluded:
+                    continue
+                target_path = artifacts_dir / relative_name
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                fileio.clone_file(file_path, target_path, allow_hard_link=False)
+                files.append(relative_name)
+                total_size += target_path.stat().st_size
+
+            shutil.copyfile(compiler_output_filename, staging_dir / COMPILER_OUTPUT_FILENAME)
+            manifest = {"key": key, "size": total_size, "files": files}
+            fileio.write_entire_file(str(staging_dir / MANIFEST_FILENAME), json.dumps(manifest))
+
+            entry_dir = self._get_entry_dir(key)
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            # Renaming is atomic, and fails if another grader has stored the same entry first.
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits into its size limit."""
+        entries: list[tuple[float, int, Path]] = []
+        for manifest_path in self.cache_dir.glob(f"??/*/{MANIFEST_FILENAME}"):
+            try:
+                last_used = manifest_path.stat().st_mtime
+                with open(manifest_path, encoding="utf-8") as manifest_file:
+                    size = int(json.load(manifest_file)["size"])
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((last_used, size, manifest_path.parent))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+
+    def _get_entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+
+def get_executable_identity(executable: str, search_path: str | None) -> tuple[str, ...]:
+    """Return the resolved path, file stats and version banner of an executable."""
+    resolved = shutil.which(executable, path=search_path) or executable
+    try:
+        real_path = os.path.realpath(resolved)
+        stat = os.stat(real_path)
+    except OSError:
+        return (executable,)
+    return (real_path, str(stat.st_size), str(stat.st_mtime_ns)) + (
+        _get_executable_version(real_path, stat.st_size, stat.st_mtime_ns),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _get_executable_version(executable: str, size: int, mtime_ns: int) -> str:
+    """Return the version banner of an executable (cached per executable build)."""
+    del size, mtime_ns  # Only used as part of the cache key.
+    try:
+        completed = subprocess.run(
+            [executable, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return (completed.stdout + completed.stderr).strip()
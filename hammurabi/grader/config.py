@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Any
+from typing import Literal
 
 import yaml
 from pydantic import BaseModel
@@ -33,8 +34,14 @@ class LimitsConfig(BaseModel):
     """Resource limits for solution execution."""
 
     memory: int = 512
+    use_memory_cgroup: bool = True
     time: TimeLimitsConfig = Field(default_factory=TimeLimitsConfig)
     time_limit_multiplier: float = 1.0
+    time_limit_clock: Literal["wall", "cpu"] = "wall"
+    borderline_reruns: int = 0
+    borderline_band: float = 0.1
+    pin_cpu_cores: bool = False
+    reserve_judge_core: bool = True
 
 
 class LocationsConfig(BaseModel):
@@ -65,6 +72,41 @@ class ReportingConfig(BaseModel):
     alert_banner: str = ""
     warning_banner: str = ""
     info_banner: str = ""
+    export_pickle: bool = False
+
+
+class BuildCacheConfig(BaseModel):
+    """Persistent cache of compiled solutions shared across grading runs."""
+
+    enabled: bool = False
+    location: str = "cache/builds"
+    max_size_mb: int = 1024
+
+
+class ResultCacheConfig(BaseModel):
+    """Persistent cache of test run results used by incremental grading."""
+
+    location: str = "cache/results"
+
+
+class AdmissionConfig(BaseModel):
+    """Admission control of concurrent solution runs."""
+
+    # The sum of the memory limits of the concurrent runs may not exceed this budget.
+    # If not set, a fraction of the memory available when grading starts is used.
+    memory_budget_mb: int | None = None
+    memory_budget_fraction: float = 0.75
+
+
+class MetricsConfig(BaseModel):
+    """Prometheus metrics of the grading runs."""
+
+    # If set, the metrics are written to this file for the node_exporter textfile collector.
+    textfile: str | None = None
+    # The number of seconds between writes of the textfile while grading.
+    write_interval: float = 15.0
+    # If set, the metrics are also served at http://127.0.0.1:<http_port>/metrics.
+    http_port: int | None = None
 
 
 class GraderConfig(BaseModel):
@@ -75,11 +117,17 @@ class GraderConfig(BaseModel):
     runner: RunnerConfig = Field(default_factory=RunnerConfig)
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     reporting: ReportingConfig = Field(default_factory=ReportingConfig)
+    build_cache: BuildCacheConfig = Field(default_factory=BuildCacheConfig)
+    result_cache: ResultCacheConfig = Field(default_factory=ResultCacheConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
 
     # Computed paths (set by apply_locations)
     problem_root_dir: str = ""
     report_root_dir: str = ""
     report_output_dir: str = ""
+    build_cache_dir: str = ""
+    result_cache_dir: str = ""
 
     @classmethod
     def from_file(cls, path: str | Path) -> GraderConfig:
@@ -101,9 +149,11 @@ class GraderConfig(BaseModel):
             "runner": self.runner.model_dump(),
             "security": self.security.model_dump(),
             "reporting": self.reporting.model_dump(),
+            "build_cache": self.build_cache.model_dump(),
             "problem_root_dir": self.problem_root_dir,
             "report_root_dir": self.report_root_dir,
             "report_output_dir": self.report_output_dir,
+            "build_cache_dir": self.build_cache_dir,
         }
 
         # Deep merge with problem config overrides
@@ -126,11 +176,13 @@ class ProblemConfig(BaseModel):
     runner: RunnerConfig = Field(default_factory=RunnerConfig)
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     reporting: ReportingConfig = Field(default_factory=ReportingConfig)
+    build_cache: BuildCacheConfig = Field(default_factory=BuildCacheConfig)
 
     # Computed paths (inherited)
     problem_root_dir: str = ""
     report_root_dir: str = ""
     report_output_dir: str = ""
+    build_cache_dir: str = ""
 
     # Problem-specific fields
     verifier: str = "AnswerVerifier"
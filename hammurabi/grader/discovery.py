@@ -28,6 +28,7 @@ import itertools
 from pathlib import Path
 
 from hammurabi.grader import adapters
+from hammurabi.grader import tracing
 from hammurabi.grader.config import GraderConfig
 from hammurabi.grader.config import ProblemConfig
 from hammurabi.grader.model import Problem
@@ -72,8 +73,9 @@ def discover_problems(grader_config: GraderConfig) -> list[Problem]:
         problem = Problem(problem_path.name, str(problem_path))
 
         # Read problem-specific config and merge with grader config
-        problem_config = _read_problem_config(problem_path)
-        problem.config = grader_config.merge_with(problem_config)
+        with tracing.span(f"config merge {problem.name}", "config", problem=problem.name):
+            problem_config = _read_problem_config(problem_path)
+            problem.config = grader_config.merge_with(problem_config)
 
         # Set input/output filenames from config or defaults
         problem.input_filename = problem.config.problem_input_file or f"{problem.name}.in"
@@ -3,20 +3,41 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
 import datetime
+import os
 import shutil
 import socket
+import time
 import traceback
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
 
 from hammurabi.exceptions import TestRunPrematureTerminationError
 from hammurabi.exceptions import VerifierCreationError
 from hammurabi.grader import adapters
 from hammurabi.grader import discovery
+from hammurabi.grader import profiling
 from hammurabi.grader import reporting
+from hammurabi.grader import reruns
+from hammurabi.grader import timing
+from hammurabi.grader import tracing
 from hammurabi.grader import verifiers
 from hammurabi.grader.adapters.base import BaseSolutionAdapter
+from hammurabi.grader.admission import AdmissionController
+from hammurabi.grader.admission import get_default_memory_budget_mb
 from hammurabi.grader.config import GraderConfig
+from hammurabi.grader.config import LimitsConfig
+from hammurabi.grader.journal import JOURNAL_FILENAME
+from hammurabi.grader.journal import Journal
+from hammurabi.grader.metrics import GraderMetrics
+from hammurabi.grader.metrics import MetricsExporter
 from hammurabi.grader.model import GraderJobScope
 from hammurabi.grader.model import Problem
 from hammurabi.grader.model import Solution
@@ -25,47 +46,249 @@ from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunInternalErrorResult
 from hammurabi.grader.model import TestRunSolutionMissingResult
 from hammurabi.grader.model import TestRunUnverifiedResult
+from hammurabi.grader.resultcache import ResultCache
+from hammurabi.grader.resultstore import RESULT_STORE_FILENAME
+from hammurabi.grader.resultstore import ResultStore
+from hammurabi.grader.runners import affinity
 from hammurabi.grader.verifiers.common import AnswerVerifier
 from hammurabi.utils import confreader
 from hammurabi.utils import terminal
 
 
+@dataclass
+class GradingSession:
+    """Settings and shared services used while judging the solutions of a grading run."""
+
+    # The maximum number of test cases of a solution to run in parallel.
+    jobs: int = 1
+    # The number of solutions compiled ahead of the one being judged.
+    compile_jobs: int = 1
+    # If set, test runs found in the cache are not executed; their stored outcome is reused.
+    result_cache: ResultCache | None = None
+    # If set, finished test runs are journaled, and journaled test runs are restored from it.
+    journal: Journal | None = None
+    # If set, the test runs of every judged solution are written to the store as one batch.
+    result_store: ResultStore | None = None
+    # If set, solutions only start running when their memory limits fit into its budget.
+    admission: AdmissionController | None = None
+    # The number of times each correct test run is measured, to report robust time statistics.
+    repeat: int = 1
+    # If set, the test runs and the latencies of judging them are recorded in these metrics.
+    metrics: GraderMetrics | None = None
+
+
 def grade(args: argparse.Namespace) -> None:
-    """Run the grading process."""
-    config = _read_config(args)
-    _apply_locations_to_config(config)
-    _load_custom_verifiers()
-    problems = discovery.discover_problems(config)
+    """
+    Run the grading process.
+
+    A trace of it is written to `args.trace` if given. If `args.profile` is set, the
+    grader's own code is profiled, and the profile is written to the report directory.
+    """
+    profiler = cProfile.Profile() if args.profile else None
+    with tracing.tracing_to(args.trace), profiler or contextlib.nullcontext():
+        config = _grade(args)
+
+    if profiler is not None:
+        profile_path, hotspots_path = profiling.write_profile(
+            profiler, Path(config.report_output_dir)
+        )
+        print("Profile:", terminal.green(str(profile_path.resolve())))
+        print("Profile hotspots:", terminal.green(str(hotspots_path.resolve())))
+
+
+def _grade(args: argparse.Namespace) -> GraderConfig:
+    """
+    Discover, judge and report the solutions selected by the command line arguments.
+
+    Returns
+    -------
+    GraderConfig
+        The configuration of the grading run, with its locations set up.
+    """
+    with tracing.span("read config", "config"):
+        config = _read_config(args)
+        _apply_locations_to_config(config, resume_dir=args.resume)
+        _load_custom_verifiers()
+    with tracing.span("discovery", "discovery"):
+        problems = discovery.discover_problems(config)
     scope = _get_scope(problems, args)
+    _pin_grader(list(scope.tasks))
+    jobs = _get_parallel_runs(args.jobs, list(scope.tasks))
+    if jobs < args.jobs:
+        print(terminal.dim(f"Running {jobs} solutions at once: one per free physical core."))
 
-    testruns: list[TestRun] = []
+    journal = Journal(Path(config.report_output_dir) / JOURNAL_FILENAME)
+    if args.resume is not None:
+        print()
+        print(terminal.bold(f"Resuming grading run: {len(journal)} test runs already finished."))
+
+    result_store_filename = Path(config.report_output_dir) / RESULT_STORE_FILENAME
+    with contextlib.closing(ResultStore(result_store_filename)) as result_store:
+        session = GradingSession(
+            jobs=jobs,
+            compile_jobs=args.compile_jobs,
+            result_cache=ResultCache(config.result_cache_dir) if args.incremental else None,
+            journal=journal,
+            result_store=result_store,
+            admission=_create_admission_controller(config),
+            repeat=args.repeat,
+        )
+        metrics_exporter = _create_metrics_exporter(config)
+        if metrics_exporter is not None:
+            session.metrics = metrics_exporter.metrics
+            metrics_exporter.start()
+
+        testruns: list[TestRun] = []
+
+        try:
+            with contextlib.suppress(KeyboardInterrupt):
+                _judge_scope(scope, testruns, session)
+        finally:
+            if metrics_exporter is not None:
+                metrics_exporter.stop()
+        _print_phase_time_summary(testruns)
+
+        padded_testruns = _fill_testruns_for_missing_solutions(list(testruns))
+        result_store.add_testruns(padded_testruns[len(testruns) :])
+        _generate_reports(config, result_store)
+
+    return config
+
+
+async def grade_async(
+    scope: GraderJobScope, session: GradingSession | None = None
+) -> AsyncIterator[TestRun]:
+    """
+    Judge all solutions in the scope, yielding the test runs as they complete.
+
+    The asyncio counterpart of `grade`, for applications that embed the grader.
+    The problems in the scope must be discovered with a configuration whose locations
+    are set up. Up to `session.jobs` test runs are executed at once across all
+    solutions, or fewer if there are fewer cores to pin them to, while up to
+    `session.compile_jobs` solutions are compiled at once in worker threads.
+    Solutions are run with `run_async` of the configured runner,
+    so with `AsyncSubprocessSolutionRunner` a running solution doesn't take a thread.
+
+    Parameters
+    ----------
+    scope
+        The problems, solutions and test cases to judge.
+    session
+        The settings and services of the grading run. Defaults to a serial session
+        without a result cache or a journal.
+
+    Yields
+    ------
+    TestRun
+        The finished test runs, in the order they complete.
+        If the iteration is stopped early, the test runs still running are cancelled.
+    """
+    if session is None:
+        session = GradingSession()
+    _pin_grader(list(scope.tasks))
+    run_semaphore = asyncio.Semaphore(_get_parallel_runs(session.jobs, list(scope.tasks)))
+    compile_semaphore = asyncio.Semaphore(session.compile_jobs)
+    # Finished test runs, followed by None once all solutions are judged.
+    finished_testruns: asyncio.Queue[TestRun | None] = asyncio.Queue()
+    if session.metrics is not None:
+        session.metrics.queued_testruns.inc(
+            amount=sum(
+                len(testcases)
+                for solution_testcases in scope.tasks.values()
+                for testcases in solution_testcases.values()
+            )
+        )
+
+    async def judge_testcase(
+        solution: Solution, testcase: TestCase, adapter: BaseSolutionAdapter
+    ) -> TestRun:
+        async with run_semaphore:
+            testrun = await _judge_testcase_timed_async(solution, testcase, adapter, session)
+        finished_testruns.put_nowait(testrun)
+        return testrun
+
+    async def judge_solution(solution: Solution, testcases: list[TestCase]) -> None:
+        async with compile_semaphore:
+            try:
+                adapter = await asyncio.to_thread(_prepare_adapter, solution, testcases, session)
+            except Exception:
+                print("Cannot create solution adapter.")
+                traceback.print_exc()
+                return
 
+        testruns = await asyncio.gather(
+            *(judge_testcase(solution, testcase, adapter) for testcase in testcases)
+        )
+        if session.result_store is not None:
+            session.result_store.add_testruns(testruns)
+
+    judging = asyncio.gather(
+        *(
+            judge_solution(solution, testcases)
+            for solution_testcases in scope.tasks.values()
+            for solution, testcases in solution_testcases.items()
+        )
+    )
+    judging.add_done_callback(lambda _: finished_testruns.put_nowait(None))
     try:
-        for problem in scope.tasks:
-            print()
-            print(terminal.cyan_bold(f"Judging problem: {problem.name}"))
-            print(terminal.dim("=" * 75))
+        while (testrun := await finished_testruns.get()) is not None:
+            yield testrun
+        await judging
+    finally:
+        # Cancel the remaining test runs and wait for them to clean up.
+        judging.cancel()
+        await asyncio.gather(judging, return_exceptions=True)
 
-            for solution in scope.tasks[problem]:
-                print()
-                print(
-                    terminal.cyan(
-                        f"Judging solution: {problem.name}   "
-                        f"Author: {solution.author}   "
-                        f"Language: {solution.language}"
-                    )
-                )
-                print(terminal.dim("-" * 75))
 
-                testcases = scope.tasks[problem][solution]
-                solution_testruns = judge_solution(solution, testcases)
-                testruns.extend(solution_testruns)
+def _get_parallel_runs(jobs: int, problems: list[Problem]) -> int:
+    """
+    Return the number of solutions to run at once.
+
+    If the solutions of any of the problems are pinned to CPU cores,
+    there are never more runs than cores to pin them to.
+    """
+    pinned_limits = _get_pinned_limits(problems)
+    if not pinned_limits:
+        return jobs
+    reserve_judge_core = any(limits.reserve_judge_core for limits in pinned_limits)
+    return affinity.get_max_parallel_runs(jobs, reserve_judge_core)
 
-    except KeyboardInterrupt:
-        pass
 
-    testruns = _fill_testruns_for_missing_solutions(testruns)
-    _generate_reports(config, testruns)
+def _pin_grader(problems: list[Problem]) -> None:
+    """Pin the grader to its reserved core if the solutions of any problem are pinned."""
+    if any(limits.reserve_judge_core for limits in _get_pinned_limits(problems)):
+        affinity.pin_grader_to_judge_core()
+
+
+def _get_pinned_limits(problems: list[Problem]) -> list[LimitsConfig]:
+    return [problem.config.limits for problem in problems if problem.config.limits.pin_cpu_cores]
+
+
+def _create_admission_controller(config: GraderConfig) -> AdmissionController:
+    """Create the admission controller of the grading run from its memory budget."""
+    memory_budget_mb = config.admission.memory_budget_mb
+    if memory_budget_mb is None:
+        memory_budget_mb = get_default_memory_budget_mb(config.admission.memory_budget_fraction)
+    return AdmissionController(memory_budget_mb)
+
+
+def _create_metrics_exporter(config: GraderConfig) -> MetricsExporter | None:
+    """Create the exporter of the metrics of the grading run, if any are configured."""
+    metrics_config = config.metrics
+    if metrics_config.textfile is None and metrics_config.http_port is None:
+        return None
+
+    textfile_path = None
+    if metrics_config.textfile is not None:
+        textfile_path = Path(metrics_config.textfile)
+        if not textfile_path.is_absolute():
+            textfile_path = (Path.cwd() / textfile_path).resolve()
+    return MetricsExporter(
+        GraderMetrics(),
+        textfile=textfile_path,
+        write_interval=metrics_config.write_interval,
+        http_port=metrics_config.http_port,
+    )
 
 
 def _read_config(args: argparse.Namespace) -> GraderConfig:
@@ -124,11 +347,26 @@ def _get_scope(problems: list[Problem], args: argparse.Namespace) -> GraderJobSc
     return GraderJobScope(tasks)
 
 
-def _apply_locations_to_config(config: GraderConfig) -> None:
-    """Set up directory paths in the configuration."""
+def _apply_locations_to_config(config: GraderConfig, resume_dir: str | None = None) -> None:
+    """
+    Set up directory paths in the configuration.
+
+    Parameters
+    ----------
+    config
+        The grader configuration.
+    resume_dir
+        The output directory of an interrupted grading run to resume, if any.
+        It is reused instead of creating a new output directory.
+    """
     config.problem_root_dir = _get_problem_root_dir(config)
     config.report_root_dir = _get_report_root_dir(config)
-    config.report_output_dir = _get_report_output_dir(config)
+    if resume_dir is not None:
+        config.report_output_dir = _get_resumed_report_output_dir(resume_dir)
+    else:
+        config.report_output_dir = _get_report_output_dir(config)
+    config.build_cache_dir = _get_build_cache_dir(config)
+    config.result_cache_dir = _get_result_cache_dir(config)
 
 
 def _get_problem_root_dir(config: GraderConfig) -> str:
@@ -147,6 +385,22 @@ def _get_report_root_dir(config: GraderConfig) -> str:
     return str(report_root_path)
 
 
+def _get_build_cache_dir(config: GraderConfig) -> str:
+    """Get the directory of the persistent build cache."""
+    build_cache_path = Path(config.build_cache.location)
+    if not build_cache_path.is_absolute():
+        build_cache_path = (Path.cwd() / build_cache_path).resolve()
+    return str(build_cache_path)
+
+
+def _get_result_cache_dir(config: GraderConfig) -> str:
+    """Get the directory of the persistent result cache."""
+    result_cache_path = Path(config.result_cache.location)
+    if not result_cache_path.is_absolute():
+        result_cache_path = (Path.cwd() / result_cache_path).resolve()
+    return str(result_cache_path)
+
+
 def _get_report_output_dir(config: GraderConfig) -> str:
     """Create and return the output directory for this grading run."""
     dt = datetime.datetime.now()
@@ -160,66 +414,532 @@ def _get_report_output_dir(config: GraderConfig) -> str:
     return str(report_output_path)
 
 
+def _get_resumed_report_output_dir(resume_dir: str) -> str:
+    """Validate and return the output directory of the grading run to resume."""
+    report_output_path = Path(resume_dir).resolve()
+    if not (report_output_path / JOURNAL_FILENAME).exists():
+        raise OSError(
+            f"Cannot resume grading: '{report_output_path}' does not contain a "
+            f"{JOURNAL_FILENAME} file."
+        )
+    return str(report_output_path)
+
+
 def _load_custom_verifiers() -> None:
     """Load custom verifiers from the 'verifiers' directory."""
     verifiers_dir = Path(__file__).parent / "verifiers"
     verifiers.load_custom_verifiers(verifiers_dir)
 
 
-def judge_solution(solution: Solution, testcases: list[TestCase]) -> list[TestRun]:
-    """Judge all test cases for a solution."""
+def _judge_scope(scope: GraderJobScope, testruns: list[TestRun], session: GradingSession) -> None:
+    """
+    Judge all solutions in the scope, appending the test runs as they finish.
+
+    Solutions are judged one at a time, while a pool of `session.compile_jobs` threads
+    prepares and compiles the next `session.compile_jobs` solutions in the background.
+    """
+    compile_jobs = session.compile_jobs
+    work = [
+        (problem, solution, testcases)
+        for problem, solution_testcases in scope.tasks.items()
+        for solution, testcases in solution_testcases.items()
+    ]
+    if session.metrics is not None:
+        session.metrics.queued_testruns.inc(amount=sum(len(testcases) for *_, testcases in work))
+
+    compile_pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=compile_jobs, thread_name_prefix="compile"
+    )
     try:
+        prepared_adapters: collections.deque[concurrent.futures.Future[BaseSolutionAdapter]] = (
+            collections.deque()
+        )
+        next_to_prepare = 0
+        current_problem: Problem | None = None
+
+        for index, (problem, solution, testcases) in enumerate(work):
+            # Keep the compile stage a bounded number of solutions ahead of the run stage.
+            while next_to_prepare < len(work) and next_to_prepare <= index + compile_jobs:
+                _, upcoming_solution, upcoming_testcases = work[next_to_prepare]
+                prepared_adapters.append(
+                    compile_pool.submit(
+                        _prepare_adapter, upcoming_solution, upcoming_testcases, session
+                    )
+                )
+                next_to_prepare += 1
+
+            if problem is not current_problem:
+                current_problem = problem
+                print()
+                print(terminal.cyan_bold(f"Judging problem: {problem.name}"))
+                print(terminal.dim("=" * 75))
+
+            print()
+            print(
+                terminal.cyan(
+                    f"Judging solution: {problem.name}   "
+                    f"Author: {solution.author}   "
+                    f"Language: {solution.language}"
+                )
+            )
+            print(terminal.dim("-" * 75))
+
+            solution_testruns = judge_solution(
+                solution, testcases, session, prepared_adapter=prepared_adapters.popleft()
+            )
+            testruns.extend(solution_testruns)
+            if session.result_store is not None:
+                session.result_store.add_testruns(solution_testruns)
+    except BaseException:
+        compile_pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    compile_pool.shutdown()
+
+
+def _prepare_adapter(
+    solution: Solution, testcases: list[TestCase], session: GradingSession
+) -> BaseSolutionAdapter:
+    """Create and prepare the adapter of a solution, compiling it if there's anything to run."""
+    journal = session.journal
+    start_ns = time.monotonic_ns()
+    with tracing.span(
+        f"compile {solution.problem.name}/{solution.author}",
+        "compile",
+        problem=solution.problem.name,
+        author=solution.author,
+        language=solution.language,
+    ):
         adapter = _create_adapter(solution)
         adapter.prepare()
+        pending_testcases = [
+            testcase
+            for testcase in testcases
+            if journal is None or not journal.contains(testcase, solution.author)
+        ]
+        if pending_testcases:
+            adapter.precompile(pending_testcases[0])
+
+    if session.metrics is not None:
+        session.metrics.compile_duration.observe(
+            (time.monotonic_ns() - start_ns) / 1_000_000_000, solution.language or ""
+        )
+    return adapter
+
+
+def judge_solution(
+    solution: Solution,
+    testcases: list[TestCase],
+    session: GradingSession | None = None,
+    prepared_adapter: concurrent.futures.Future[BaseSolutionAdapter] | None = None,
+) -> list[TestRun]:
+    """
+    Judge all test cases for a solution.
+
+    Parameters
+    ----------
+    solution
+        The solution to judge.
+    testcases
+        The test cases to run the solution against.
+        The test runs are always returned in the same order.
+    session
+        The settings and services of the grading run. Defaults to a serial session
+        without a result cache or a journal.
+    prepared_adapter
+        The adapter of the solution, being prepared by the compile stage.
+        If None, the adapter is created and prepared here.
+    """
+    if session is None:
+        session = GradingSession()
+
+    try:
+        if prepared_adapter is not None:
+            adapter = prepared_adapter.result()
+        else:
+            adapter = _prepare_adapter(solution, testcases, session)
     except Exception:
         print("Cannot create solution adapter.")
         traceback.print_exc()
         return []
 
+    if session.jobs > 1:
+        return _judge_testcases_in_parallel(solution, testcases, adapter, session)
+
     testruns: list[TestRun] = []
     for testcase in testcases:
-        testrun = None
-        try:
-            print(
-                f"Running test case: {testcase.name} (score: {testcase.score})",
-                end=" ",
+        _print_testcase_header(testcase)
+        testrun = _judge_testcase_timed(solution, testcase, adapter, session)
+        _print_testrun_summary(testrun)
+        testruns.append(testrun)
+
+    return testruns
+
+
+def _judge_testcases_in_parallel(
+    solution: Solution,
+    testcases: list[TestCase],
+    adapter: BaseSolutionAdapter,
+    session: GradingSession,
+) -> list[TestRun]:
+    """Judge the test cases of a solution using a pool of worker threads."""
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=_get_parallel_runs(session.jobs, [solution.problem]), thread_name_prefix="run"
+    )
+    try:
+        futures = [
+            executor.submit(_judge_testcase_timed, solution, testcase, adapter, session)
+            for testcase in testcases
+        ]
+
+        # Report the results in the original order, as soon as each one becomes available.
+        testruns: list[TestRun] = []
+        for testcase, future in zip(testcases, futures, strict=True):
+            testrun = future.result()
+            _print_testcase_header(testcase)
+            _print_testrun_summary(testrun)
+            testruns.append(testrun)
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    executor.shutdown()
+    return testruns
+
+
+def _judge_testcase_timed(
+    solution: Solution,
+    testcase: TestCase,
+    adapter: BaseSolutionAdapter,
+    session: GradingSession,
+) -> TestRun:
+    """
+    Judge a single test case, record the end of the judging process and journal it.
+
+    If the session repeats test runs, a correct test run is run again until its time
+    is measured `session.repeat` times, and the statistics of the samples are recorded
+    in its `data`. The test run is recorded in the metrics of the session, if any.
+    """
+    with _tracked_as_active(session.metrics):
+        testrun = _restore_journaled_testrun(testcase, adapter, session.journal)
+        if testrun is None:
+            testrun = judge_testcase(
+                solution, testcase, adapter, session.result_cache, session.admission
             )
-            testrun = judge_testcase(solution, testcase, adapter)
-        except KeyboardInterrupt:
-            raise
+            if _needs_repetitions(testrun, session.repeat):
+                repetitions = _create_repetitions(testrun, adapter, session.repeat)
+                for repetition in repetitions:
+                    _run_attempt(solution, repetition, adapter, session.admission)
+                _record_time_samples(testrun, repetitions)
+            _finish_judging(testrun, session)
+    return testrun
 
+
+async def _judge_testcase_timed_async(
+    solution: Solution,
+    testcase: TestCase,
+    adapter: BaseSolutionAdapter,
+    session: GradingSession,
+) -> TestRun:
+    """Judge a single test case like `_judge_testcase_timed`, awaiting the run of the solution."""
+    with _tracked_as_active(session.metrics):
+        testrun = _restore_journaled_testrun(testcase, adapter, session.journal)
+        if testrun is None:
+            testrun = await judge_testcase_async(
+                solution, testcase, adapter, session.result_cache, session.admission
+            )
+            if _needs_repetitions(testrun, session.repeat):
+                repetitions = _create_repetitions(testrun, adapter, session.repeat)
+                for repetition in repetitions:
+                    await _run_attempt_async(solution, repetition, adapter, session.admission)
+                _record_time_samples(testrun, repetitions)
+            _finish_judging(testrun, session)
+    return testrun
+
+
+def _restore_journaled_testrun(
+    testcase: TestCase, adapter: BaseSolutionAdapter, journal: Journal | None
+) -> TestRun | None:
+    """Return the test run of a test case restored from the journal, if it's already finished."""
+    if journal is None:
+        return None
+    testrun = adapter.create_testrun(testcase)
+    if not journal.restore(testrun):
+        return None
+    testrun.data["resumed"] = True
+    return testrun
+
+
+def _finish_judging(testrun: TestRun, session: GradingSession) -> None:
+    """Record the end of the judging process of a test run, and journal it."""
+    if not testrun.data.get("cached"):
         testrun.record_judge_end_time()
-        lean_time_elapsed = testrun.get_lean_elapsed_milliseconds()
-        judge_time_elapsed = testrun.get_judge_elapsed_milliseconds()
-        judge_overhead = judge_time_elapsed - lean_time_elapsed
 
-        result_str = testrun.result.colored_str() if testrun.result else ""
+    if session.journal is not None:
+        session.journal.append(testrun)
+    if session.metrics is not None:
+        session.metrics.observe_testrun(testrun)
+
+
+@contextlib.contextmanager
+def _tracked_as_active(metrics: GraderMetrics | None) -> Iterator[None]:
+    """Count a queued test run as active in the metrics while it's being judged."""
+    if metrics is None:
+        yield
+        return
+
+    metrics.queued_testruns.dec()
+    metrics.active_testruns.inc()
+    try:
+        yield
+    finally:
+        metrics.active_testruns.dec()
+
+
+def _print_phase_time_summary(testruns: list[TestRun]) -> None:
+    """Print the median and 95th percentile time of each phase of judging the test runs."""
+    # Cached and resumed test runs carry the phase times of an earlier grading run.
+    judged_testruns = [
+        testrun
+        for testrun in testruns
+        if not testrun.data.get("cached") and not testrun.data.get("resumed")
+    ]
+    phase_times_ns = timing.summarize_phase_times(judged_testruns)
+    if not phase_times_ns:
+        return
+
+    print()
+    print(terminal.bold("Judging phases (p50 / p95):"))
+    print(terminal.dim("---------------------------"))
+    for phase, (p50_ns, p95_ns) in phase_times_ns.items():
         print(
-            f"-> {result_str}, Time: {lean_time_elapsed} ms, "
-            f"Overall time: {judge_time_elapsed} (+{judge_overhead}) ms"
+            f"{phase}: {reporting.format_nanoseconds(p50_ns)} / "
+            f"{reporting.format_nanoseconds(p95_ns)} ms"
         )
-        if isinstance(testrun.result, TestRunInternalErrorResult):
-            print(terminal.red(testrun.result.format_details() or ""))
 
-        testruns.append(testrun)
 
-    return testruns
+def _print_testcase_header(testcase: TestCase) -> None:
+    """Print the beginning of the console line for a test case."""
+    print(f"Running test case: {testcase.name} (score: {testcase.score})", end=" ")
+
+
+def _print_testrun_summary(testrun: TestRun) -> None:
+    """Print the result and timing of a finished test run."""
+    lean_time_elapsed = testrun.get_lean_elapsed_milliseconds()
+    judge_time_elapsed = testrun.get_judge_elapsed_milliseconds()
+    judge_overhead = judge_time_elapsed - lean_time_elapsed
+
+    result_str = testrun.result.colored_str() if testrun.result else ""
+    origin_str = ""
+    if testrun.data.get("cached"):
+        origin_str = terminal.dim(" (cached)")
+    elif testrun.data.get("resumed"):
+        origin_str = terminal.dim(" (resumed)")
+    stats_str = ""
+    if "attempts" in testrun.data:
+        stats_str = terminal.dim(
+            f" ({len(testrun.data['attempts'])} attempts, "
+            f"min: {reporting.format_nanoseconds(testrun.data.get('min_time_ns'))} ms, "
+            f"median: {reporting.format_nanoseconds(testrun.data.get('median_time_ns'))} ms)"
+        )
+    if "repeat" in testrun.data:
+        repeat = testrun.data["repeat"]
+        stats_str += terminal.dim(
+            f" ({len(repeat['samples_ns'])} samples, "
+            f"median: {reporting.format_nanoseconds(repeat['median_ns'])} ms, "
+            f"MAD: {reporting.format_nanoseconds(repeat['mad_ns'])} ms)"
+        )
+    print(
+        f"-> {result_str}, Time: {lean_time_elapsed} ms, "
+        f"Overall time: {judge_time_elapsed} (+{judge_overhead}) ms{origin_str}{stats_str}"
+    )
+    if isinstance(testrun.result, TestRunInternalErrorResult):
+        print(terminal.red(testrun.result.format_details() or ""))
 
 
-def judge_testcase(solution: Solution, testcase: TestCase, adapter: BaseSolutionAdapter) -> TestRun:
-    """Judge a single test case."""
+def judge_testcase(
+    solution: Solution,
+    testcase: TestCase,
+    adapter: BaseSolutionAdapter,
+    result_cache: ResultCache | None = None,
+    admission: AdmissionController | None = None,
+) -> TestRun:
+    """
+    Judge a single test case, reusing a cached outcome if a result cache is given.
+
+    If an admission controller is given, the solution only starts running once it admits the run.
+    A test run whose time lands close to the time limit is re-run as configured by
+    `limits.borderline_reruns`, and the fastest attempt decides its outcome.
+    The time spent in each phase of judging is recorded in the `data` of the test run
+    (see `JUDGE_PHASES`).
+    """
     testrun = adapter.create_testrun(testcase)
-    try:
-        testrun.record_judge_start_time()
-        adapter.run(testrun)
+    judge_start_ns = time.monotonic_ns()
 
-        if solution != solution.problem.reference_solution:
-            verifier = _create_verifier(testrun)
-            verifier.verify(testrun)
-        else:
-            testrun.result = TestRunUnverifiedResult(
-                "Verification ignored - running the reference solution."
-            )
+    is_cached, fingerprint = _restore_cached_testrun(testrun, adapter, result_cache)
+    if is_cached:
+        return testrun
+
+    attempts = [testrun]
+    _run_attempt(solution, testrun, adapter, admission)
+    while reruns.should_rerun(attempts):
+        attempts.append(adapter.create_testrun(testcase, attempt=len(attempts) + 1))
+        _run_attempt(solution, attempts[-1], adapter, admission)
+    testrun = _pick_attempt(attempts)
+    testrun.record_phase_time("judge", time.monotonic_ns() - judge_start_ns)
+
+    _finish_testrun(testrun, result_cache, fingerprint)
+    return testrun
+
+
+async def judge_testcase_async(
+    solution: Solution,
+    testcase: TestCase,
+    adapter: BaseSolutionAdapter,
+    result_cache: ResultCache | None = None,
+    admission: AdmissionController | None = None,
+) -> TestRun:
+    """Judge a single test case like `judge_testcase`, awaiting the run of the solution."""
+    testrun = adapter.create_testrun(testcase)
+    judge_start_ns = time.monotonic_ns()
+
+    is_cached, fingerprint = _restore_cached_testrun(testrun, adapter, result_cache)
+    if is_cached:
+        return testrun
+
+    attempts = [testrun]
+    await _run_attempt_async(solution, testrun, adapter, admission)
+    while reruns.should_rerun(attempts):
+        attempts.append(adapter.create_testrun(testcase, attempt=len(attempts) + 1))
+        await _run_attempt_async(solution, attempts[-1], adapter, admission)
+    testrun = _pick_attempt(attempts)
+    testrun.record_phase_time("judge", time.monotonic_ns() - judge_start_ns)
+
+    _finish_testrun(testrun, result_cache, fingerprint)
+    return testrun
+
+
+def _run_attempt(
+    solution: Solution,
+    testrun: TestRun,
+    adapter: BaseSolutionAdapter,
+    admission: AdmissionController | None,
+) -> None:
+    """Run the solution for a test run once it's admitted, and verify its answer."""
+    with _capture_testrun_result(testrun):
+        with admission.admit(testrun) if admission is not None else contextlib.nullcontext():
+            testrun.record_judge_start_time()
+            with tracing.span(_get_testrun_span_name("run", testrun), "run"):
+                adapter.run(testrun)
+        _verify_testrun(solution, testrun)
+
+
+async def _run_attempt_async(
+    solution: Solution,
+    testrun: TestRun,
+    adapter: BaseSolutionAdapter,
+    admission: AdmissionController | None,
+) -> None:
+    """Run the solution for a test run like `_run_attempt`, awaiting the run of the solution."""
+    with _capture_testrun_result(testrun):
+        async with (
+            admission.admit_async(testrun) if admission is not None else contextlib.nullcontext()
+        ):
+            testrun.record_judge_start_time()
+            with tracing.span(_get_testrun_span_name("run", testrun), "run"):
+                await adapter.run_async(testrun)
+        _verify_testrun(solution, testrun)
+
+
+def _pick_attempt(attempts: list[TestRun]) -> TestRun:
+    """Return the attempt that decides the outcome of a test run, removing the others' output."""
+    testrun = reruns.pick_attempt(attempts)
+    for attempt in attempts:
+        if attempt is not testrun:
+            _remove_output_files(attempt)
+    return testrun
+
+
+def _remove_output_files(testrun: TestRun) -> None:
+    """Remove the answer, stdout and stderr files of a test run whose outcome is discarded."""
+    for filename in (testrun.answer_filename, testrun.stdout_filename, testrun.stderr_filename):
+        if filename is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(filename)
+
+
+def _needs_repetitions(testrun: TestRun, repeat: int) -> bool:
+    """Return True if a judged test run is measured again: only a correct run is worth timing."""
+    return (
+        repeat > 1
+        and not testrun.data.get("cached")
+        and testrun.result is not None
+        and testrun.result.is_correct()
+    )
+
+
+def _create_repetitions(
+    testrun: TestRun, adapter: BaseSolutionAdapter, repeat: int
+) -> list[TestRun]:
+    """Return the test runs that measure a judged test run again, numbered after its attempts."""
+    attempt_count = len(testrun.data.get("attempts", [])) or 1
+    return [
+        adapter.create_testrun(testrun.testcase, attempt=attempt)
+        for attempt in range(attempt_count + 1, attempt_count + repeat)
+    ]
+
+
+def _record_time_samples(testrun: TestRun, repetitions: list[TestRun]) -> None:
+    """
+    Record the statistics of the times of a test run and its repetitions in its `data`.
+
+    Only the repetitions that answered correctly are sampled, and their output files
+    are removed, since the outcome of the test run is decided by its own run.
+    """
+    samples_ns = [reruns.get_measured_time_ns(testrun)]
+    for repetition in repetitions:
+        if repetition.result is not None and repetition.result.is_correct():
+            samples_ns.append(reruns.get_measured_time_ns(repetition))
+        _remove_output_files(repetition)
+
+    measured_samples_ns = [sample for sample in samples_ns if sample is not None]
+    if measured_samples_ns:
+        testrun.data["repeat"] = timing.summarize_time_samples(measured_samples_ns)
+
+
+def _get_testrun_span_name(action: str, testrun: TestRun) -> str:
+    """Return the name of the trace span of a step of judging a test run."""
+    solution = testrun.solution
+    return f"{action} {solution.problem.name}/{solution.author}/{testrun.testcase.name}"
+
+
+def _restore_cached_testrun(
+    testrun: TestRun, adapter: BaseSolutionAdapter, result_cache: ResultCache | None
+) -> tuple[bool, str | None]:
+    """
+    Restore the outcome of a test run from the result cache, if it's there.
+
+    Returns
+    -------
+    tuple[bool, str | None]
+        Whether the outcome was restored, and the fingerprint of the test run.
+    """
+    if result_cache is None:
+        return False, None
+
+    fingerprint = _get_testrun_fingerprint(testrun, adapter, result_cache)
+    if fingerprint is not None and result_cache.restore(fingerprint, testrun):
+        testrun.data["cached"] = True
+        _apply_score(testrun)
+        return True, fingerprint
+    return False, fingerprint
+
+
+@contextlib.contextmanager
+def _capture_testrun_result(testrun: TestRun) -> Iterator[None]:
+    """Turn the failures of running and verifying a solution into the result of its test run."""
+    try:
+        yield
 
     except TestRunPrematureTerminationError as e:
         testrun.result = e.result
@@ -231,12 +951,54 @@ def judge_testcase(solution: Solution, testcase: TestCase, adapter: BaseSolution
         del exc  # Unused, we use traceback.format_exc() instead
         testrun.result = TestRunInternalErrorResult(exception_info=traceback.format_exc())
 
+
+def _verify_testrun(solution: Solution, testrun: TestRun) -> None:
+    """Verify the answer of a finished test run, unless it ran the reference solution."""
+    if solution != solution.problem.reference_solution:
+        with (
+            testrun.timed_phase("verify"),
+            tracing.span(_get_testrun_span_name("verify", testrun), "verify"),
+        ):
+            verifier = _create_verifier(testrun)
+            verifier.verify(testrun)
+    else:
+        testrun.result = TestRunUnverifiedResult(
+            "Verification ignored - running the reference solution."
+        )
+
+
+def _finish_testrun(
+    testrun: TestRun, result_cache: ResultCache | None, fingerprint: str | None
+) -> None:
+    """Score a judged test run and store it in the result cache."""
+    _apply_score(testrun)
+
+    if result_cache is not None and fingerprint is not None and result_cache.is_cacheable(testrun):
+        # Timings are stored as they'll be reported, including the end of the judging process.
+        testrun.record_judge_end_time()
+        result_cache.store(fingerprint, testrun)
+
+
+def _apply_score(testrun: TestRun) -> None:
+    """Award the test case score to a correct result, and zero to any other result."""
     if testrun.result is not None and testrun.result.is_correct():
         testrun.result.score = testrun.testcase.score
     elif testrun.result is not None:
         testrun.result.score = 0
 
-    return testrun
+
+def _get_testrun_fingerprint(
+    testrun: TestRun, adapter: BaseSolutionAdapter, result_cache: ResultCache
+) -> str | None:
+    """Return the result cache fingerprint of a test run, or None if it can't be cached."""
+    solution_digest = adapter.get_solution_digest()
+    if solution_digest is None:
+        return None
+    try:
+        run_cmd = adapter.get_run_command_line(testrun)
+        return result_cache.compute_fingerprint(testrun, solution_digest, run_cmd)
+    except OSError:
+        return None
 
 
 def _create_adapter(solution: Solution) -> BaseSolutionAdapter:
@@ -300,9 +1062,10 @@ def _fill_testruns_for_missing_solutions(testruns: list[TestRun]) -> list[TestRu
     return padded_testruns
 
 
-def _generate_reports(config: GraderConfig, testruns: list[TestRun]) -> None:
-    """Generate all report files."""
+def _generate_reports(config: GraderConfig, result_store: ResultStore) -> None:
+    """Generate all report files from the test runs in the result store."""
     report_output_path = Path(config.report_output_dir)
+    testruns = result_store.load_testruns()
 
     def get_report_path(relative_name: str) -> str:
         return str((report_output_path / relative_name).resolve())
@@ -315,11 +1078,17 @@ def _generate_reports(config: GraderConfig, testruns: list[TestRun]) -> None:
     heatmap_html_report_location = get_report_path("report-heatmap.html")
 
     # Generate report files.
-    reporting.pickle_testruns(testruns, pickle_location)
-    reporting.generate_testrun_log_csv(testruns, testrun_csv_log_location)
-    reporting.generate_full_log_html(testruns, full_html_log_location)
-    reporting.generate_matrix_report_html(testruns, matrix_html_report_location)
-    reporting.generate_heatmap_report_html(testruns, heatmap_html_report_location)
+    if config.reporting.export_pickle:
+        with tracing.span("pickle", "report"):
+            reporting.pickle_testruns(testruns, pickle_location)
+    with tracing.span("CSV log", "report"):
+        reporting.generate_testrun_log_csv(testruns, testrun_csv_log_location)
+    with tracing.span("full HTML log", "report"):
+        reporting.generate_full_log_html(testruns, full_html_log_location)
+    with tracing.span("matrix HTML report", "report"):
+        reporting.generate_matrix_report_html(testruns, matrix_html_report_location)
+    with tracing.span("heatmap HTML report", "report"):
+        reporting.generate_heatmap_report_html(testruns, heatmap_html_report_location)
 
     # Copy the stylesheets used by the reports.
     styles_dir = Path(__file__).parent / "resources" / "styles"
@@ -329,7 +1098,10 @@ def _generate_reports(config: GraderConfig, testruns: list[TestRun]) -> None:
     print()
     print(terminal.bold("Reports:"))
     print(terminal.dim("--------"))
-    print("Pickled test runs:", terminal.green(pickle_location))
+    print("Journal:", terminal.green(get_report_path(JOURNAL_FILENAME)))
+    print("Results database:", terminal.green(str(result_store.filename.resolve())))
+    if config.reporting.export_pickle:
+        print("Pickled test runs:", terminal.green(pickle_location))
     print("CSV log:", terminal.green(testrun_csv_log_location))
     print("Detailed HTML log:", terminal.green(full_html_log_location))
     print("Matrix HTML report:", terminal.green(matrix_html_report_location))
@@ -0,0 +1,131 @@
+"""Append-only journal of finished test runs, used to resume interrupted grading runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from hammurabi.grader import serialization
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+
+JOURNAL_FILENAME = "journal.jsonl"
+
+JournalKey = tuple[str, str, str]
+
+
+class Journal:
+    """
+    Journal of the test runs finished during a grading run.
+
+    Every finished test run is appended to the journal as a single JSON line and
+    flushed to disk right away, so the work done before a crash or an interruption
+    is never lost. When a grading run is resumed, the journaled test runs are
+    restored instead of being executed again.
+    """
+
+    def __init__(self, filename: str | Path) -> None:
+        self.filename = Path(filename)
+        _truncate_incomplete_line(self.filename)
+        self._entries = _read_entries(self.filename)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of test runs in the journal."""
+        return len(self._entries)
+
+    def contains(self, testcase: TestCase, author: str) -> bool:
+        """Return True if the test run of the author's solution for the test case is journaled."""
+        return _get_key(testcase, author) in self._entries
+
+    def restore(self, testrun: TestRun) -> bool:
+        """
+        Restore the outcome of a journaled test run.
+
+        Returns
+        -------
+        bool
+            True if the test run was found in the journal.
+        """
+        entry = self._entries.get(_get_key(testrun.testcase, testrun.solution.author))
+        if entry is None:
+            return False
+
+        serialization.apply_testrun_outcome(testrun, entry["outcome"])
+        compiler_output_filename = entry.get("compiler_output_filename")
+        if compiler_output_filename is not None and Path(compiler_output_filename).exists():
+            testrun.compiler_output_filename = compiler_output_filename
+        return True
+
+    def append(self, testrun: TestRun) -> None:
+        """Append a finished test run to the journal and flush it to disk."""
+        entry = {
+            "problem": testrun.solution.problem.name,
+            "author": testrun.solution.author,
+            "testcase": testrun.testcase.name,
+            "compiler_output_filename": testrun.compiler_output_filename,
+            "outcome": serialization.testrun_outcome_to_dict(testrun),
+        }
+        line = json.dumps(entry, default=str) + "\n"
+
+        with self._lock:
+            with open(self.filename, "a", encoding="utf-8") as journal_file:
+                journal_file.write(line)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            self._entries[_get_key(testrun.testcase, testrun.solution.author)] = entry
+
+
+def _get_key(testcase: TestCase, author: str) -> JournalKey:
+    return testcase.problem.name, author, testcase.name
+
+
+def _truncate_incomplete_line(filename: Path) -> None:
+    """
+    Cut off the last line of a journal file if the grader was killed while writing it.
+
+    Otherwise, the next appended entry would be glued onto the incomplete line and lost.
+    """
+    if not filename.exists():
+        return
+
+    with open(filename, "rb+") as journal_file:
+        size = journal_file.seek(0, os.SEEK_END)
+        end = size
+        # Scan backwards in blocks for the newline that ends the last complete line.
+        while end > 0:
+            block_start = max(0, end - 4096)
+            journal_file.seek(block_start)
+            block = journal_file.read(end - block_start)
+            newline_index = block.rfind(b"\n")
+            if newline_index >= 0:
+                end = block_start + newline_index + 1
+                break
+            end = block_start
+        if end < size:
+            journal_file.truncate(end)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+
+def _read_entries(filename: Path) -> dict[JournalKey, dict[str, Any]]:
+    """Read the entries of a journal file, skipping lines that can't be parsed."""
+    entries: dict[JournalKey, dict[str, Any]] = {}
+    if not filename.exists():
+        return entries
+
+    with open(filename, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            # The last line may be incomplete if the grader was killed while writing it.
+            try:
+                entry = json.loads(line)
+                key = (entry["problem"], entry["author"], entry["testcase"])
+                serialization.result_from_dict(entry["outcome"]["result"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            entries[key] = entry
+
+    return entries
@@ -0,0 +1,315 @@
+"""Prometheus metrics of the grading runs, for judge machines that run unattended."""
+
+from __future__ import annotations
+
+import http.server
+import math
+import os
+import threading
+from abc import ABC
+from abc import abstractmethod
+from pathlib import Path
+
+from hammurabi.grader.model import TestRun
+
+# The upper bounds of the buckets of the latency histograms, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric(ABC):
+    """A metric in the Prometheus text exposition format, with a value per set of labels."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        """Return the lines of the metric in the text exposition format."""
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._render_samples(),
+        ]
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """Return the lines of the samples of the metric, one per set of label values."""
+
+    def _format_labels(self, label_values: LabelValues, **extra_labels: str) -> str:
+        labels = {**dict(zip(self.label_names, label_values, strict=True)), **extra_labels}
+        if not labels:
+            return ""
+        formatted_labels = ",".join(
+            f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()
+        )
+        return f"{{{formatted_labels}}}"
+
+
+class Counter(Metric):
+    """A value that only goes up, such as the number of finished test runs."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase the value for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        """Return the value for the given label values."""
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{self._format_labels(label_values)} {_format_value(value)}"
+                for label_values, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, such as the number of test runs being judged."""
+
+    metric_type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """Decrease the value for the given label values."""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        """Set the value for the given label values."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def _render_samples(self) -> list[str]:
+        # A gauge without labels is always exposed, even before it's first set.
+        if not self.label_names and not self._values:
+            return [f"{self.name} 0"]
+        return super()._render_samples()
+
+
+class Histogram(Metric):
+    """The distribution of observed values, such as run latencies, in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, label_names)
+        self.buckets = (*buckets, math.inf)
+        # The bucket counts, the sum and the count of the observations, by label values.
+        self._observations: dict[LabelValues, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observed value for the given label values."""
+        with self._lock:
+            bucket_counts, total, count = self._observations.get(
+                label_values, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[index] += 1
+            self._observations[label_values] = (bucket_counts, total + value, count + 1)
+
+    def get_count(self, *label_values: str) -> int:
+        """Return the number of observations for the given label values."""
+        with self._lock:
+            return self._observations.get(label_values, ([], 0.0, 0))[2]
+
+    def _render_samples(self) -> list[str]:
+        lines: list[str] = []
+        with self._lock:
+            for label_values, (bucket_counts, total, count) in sorted(self._observations.items()):
+                for upper_bound, bucket_count in zip(self.buckets, bucket_counts, strict=True):
+                    labels = self._format_labels(label_values, le=_format_value(upper_bound))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = self._format_labels(label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class GraderMetrics:
+    """The throughput and health metrics of the grading runs of this process."""
+
+    def __init__(self) -> None:
+        self.testruns = Counter(
+            "hammurabi_testruns_total",
+            "Judged test runs, by result status code and language.",
+            ("status", "language"),
+        )
+        self.run_duration = Histogram(
+            "hammurabi_run_duration_seconds",
+            "Wall time of the solution runs, by language.",
+            ("language",),
+        )
+        self.compile_duration = Histogram(
+            "hammurabi_compile_duration_seconds",
+            "Time to prepare and compile the solutions, by language.",
+            ("language",),
+        )
+        self.judge_overhead = Histogram(
+            "hammurabi_judge_overhead_seconds",
+            "Time spent judging a test run on top of running the solution.",
+        )
+        self.queued_testruns = Gauge("hammurabi_queued_testruns", "Test runs waiting to be judged.")
+        self.active_testruns = Gauge(
+            "hammurabi_active_testruns", "Test runs being judged by the workers."
+        )
+
+    def get_metrics(self) -> list[Metric]:
+        """Return all metrics."""
+        return [
+            self.testruns,
+            self.run_duration,
+            self.compile_duration,
+            self.judge_overhead,
+            self.queued_testruns,
+            self.active_testruns,
+        ]
+
+    def observe_testrun(self, testrun: TestRun) -> None:
+        """
+        Record a judged test run.
+
+        Test runs whose outcome was reused from the result cache are counted,
+        but their timings, measured by an earlier grading run, are not.
+        """
+        language = testrun.solution.language or ""
+        status = testrun.result.status_code if testrun.result is not None else ""
+        self.testruns.inc(status, language)
+        if testrun.data.get("cached"):
+            return
+
+        if testrun.wall_time_ns is not None:
+            self.run_duration.observe(testrun.wall_time_ns / 1_000_000_000, language)
+        judge_overhead_ms = (
+            testrun.get_judge_elapsed_milliseconds() - testrun.get_lean_elapsed_milliseconds()
+        )
+        self.judge_overhead.observe(max(judge_overhead_ms, 0) / 1000)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = [line for metric in self.get_metrics() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Exposes the metrics of the grading runs to Prometheus while grading.
+
+    The metrics are rewritten to a file for the node_exporter textfile collector
+    every `write_interval` seconds and when the exporter stops, and are served
+    over HTTP on localhost, if a port is given.
+    """
+
+    def __init__(
+        self,
+        metrics: GraderMetrics,
+        textfile: Path | None = None,
+        write_interval: float = 15.0,
+        http_port: int | None = None,
+    ) -> None:
+        self.metrics = metrics
+        self.textfile = textfile
+        self.write_interval = write_interval
+        self.http_port = http_port
+        self._stopped = threading.Event()
+        self._writer_thread: threading.Thread | None = None
+        self._http_server: http.server.ThreadingHTTPServer | None = None
+
+    def start(self) -> None:
+        """Start writing the textfile and serving the metrics in background threads."""
+        if self.textfile is not None:
+            self.write_textfile()
+            self._writer_thread = threading.Thread(
+                target=self._write_periodically, name="metrics-writer", daemon=True
+            )
+            self._writer_thread.start()
+
+        if self.http_port is not None:
+            self._http_server = http.server.ThreadingHTTPServer(
+                ("127.0.0.1", self.http_port), _create_metrics_handler(self.metrics)
+            )
+            threading.Thread(
+                target=self._http_server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        """Stop the background threads, and write the final metrics to the textfile."""
+        self._stopped.set()
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+            self.write_textfile()
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+
+    def write_textfile(self) -> None:
+        """Write the metrics to the textfile, replacing it atomically so it's never half-written."""
+        assert self.textfile is not None
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.textfile.with_name(f".{self.textfile.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.metrics.render())
+        os.replace(temp_path, self.textfile)
+
+    def get_http_address(self) -> tuple[str, int] | None:
+        """Return the host and port the metrics are served on, if they are."""
+        if self._http_server is None:
+            return None
+        host, port = self._http_server.server_address[:2]
+        return str(host), int(port)
+
+    def _write_periodically(self) -> None:
+        while not self._stopped.wait(self.write_interval):
+            self.write_textfile()
+
+
+def _create_metrics_handler(
+    metrics: GraderMetrics,
+) -> type[http.server.BaseHTTPRequestHandler]:
+    """Return the HTTP request handler class that serves the metrics at /metrics."""
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - Named by http.server.
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            content = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args: object) -> None:
+            # Scrapes would otherwise be logged to stderr, between the test run results.
+            pass
+
+    return MetricsHandler
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import contextlib
 import time
 from collections.abc import Callable
+from collections.abc import Iterator
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
@@ -75,6 +77,21 @@ class TestCase:
         )
 
 
+# The phases of judging a test run, timed in its `data["phase_times_ns"]`:
+# the whole judging of its test case, waiting for admission, the run of the adapter,
+# and the steps of that run, followed by the verification of the answer.
+JUDGE_PHASES = (
+    "judge",
+    "admission",
+    "run",
+    "work_dir",
+    "supply_testcase",
+    "execute",
+    "collect_output",
+    "verify",
+)
+
+
 @dataclass
 class TestRun:
     """A single execution of a solution against a test case."""
@@ -96,6 +113,12 @@ class TestRun:
     judge_end_time: int | None = field(default=None, repr=False)
     lean_start_time: int | None = field(default=None, repr=False)
     lean_end_time: int | None = field(default=None, repr=False)
+    wall_time_ns: int | None = field(default=None, repr=False)
+    cpu_user_time_ns: int | None = field(default=None, repr=False)
+    cpu_system_time_ns: int | None = field(default=None, repr=False)
+    peak_memory_mb: int | None = field(default=None, repr=False)
+    cpu_core: int | None = field(default=None, repr=False)
+    work_dir: str | None = field(default=None, repr=False)
     data: dict[str, Any] = field(default_factory=dict, repr=False)
 
     def __str__(self) -> str:
@@ -121,6 +144,24 @@ class TestRun:
         """Record the end time of the actual solution execution."""
         self.lean_end_time = self._get_timestamp()
 
+    def record_phase_time(self, phase: str, elapsed_ns: int) -> None:
+        """Add the monotonic time spent in a phase of judging (see `JUDGE_PHASES`)."""
+        phase_times_ns = self.data.setdefault("phase_times_ns", {})
+        phase_times_ns[phase] = phase_times_ns.get(phase, 0) + elapsed_ns
+
+    @contextlib.contextmanager
+    def timed_phase(self, phase: str) -> Iterator[None]:
+        """Record the monotonic time spent in the block as a phase of judging."""
+        start_ns = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self.record_phase_time(phase, time.monotonic_ns() - start_ns)
+
+    def get_phase_time_ns(self, phase: str) -> int | None:
+        """Return the monotonic time spent in a phase of judging, if it was timed."""
+        return self.data.get("phase_times_ns", {}).get(phase)
+
     def get_judge_elapsed_milliseconds(self) -> int:
         """Return total elapsed time including judge overhead."""
         if self.judge_end_time is None or self.judge_start_time is None:
@@ -133,6 +174,18 @@ class TestRun:
             return 0
         return self.lean_end_time - self.lean_start_time
 
+    def get_wall_time_milliseconds(self) -> float | None:
+        """Return the monotonic wall time of the solution process, if measured."""
+        if self.wall_time_ns is None:
+            return None
+        return self.wall_time_ns / 1_000_000
+
+    def get_cpu_time_milliseconds(self) -> float | None:
+        """Return the user plus system CPU time of the solution process tree, if measured."""
+        if self.cpu_user_time_ns is None or self.cpu_system_time_ns is None:
+            return None
+        return (self.cpu_user_time_ns + self.cpu_system_time_ns) / 1_000_000
+
     def _get_timestamp(self) -> int:
         """Return current time in milliseconds."""
         return int(round(time.time() * 1000))
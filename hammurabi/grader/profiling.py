@@ -0,0 +1,39 @@
+"""Profiles of the grader's own Python code, written into the report directory."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+from pathlib import Path
+
+PROFILE_FILENAME = "profile.pstats"
+HOTSPOTS_FILENAME = "profile-hotspots.txt"
+
+# The number of functions listed in the hotspots summary, by each sort order.
+HOTSPOT_COUNT = 30
+
+
+def write_profile(
+    profiler: cProfile.Profile, report_dir: Path, hotspot_count: int = HOTSPOT_COUNT
+) -> tuple[Path, Path]:
+    """
+    Write the profile of a grading run and a summary of its hotspots to the report directory.
+
+    The profile can be explored with `python -m pstats`, or visualized with a tool
+    like snakeviz. The summary lists the functions that take the most time by
+    themselves, and the ones that take the most time including their callees.
+
+    Returns
+    -------
+    tuple[Path, Path]
+        The paths of the profile and of its hotspots summary.
+    """
+    profile_path = report_dir / PROFILE_FILENAME
+    hotspots_path = report_dir / HOTSPOTS_FILENAME
+    profiler.dump_stats(profile_path)
+
+    with open(hotspots_path, "w") as hotspots_file:
+        stats = pstats.Stats(profiler, stream=hotspots_file).strip_dirs()
+        for sort_key in (pstats.SortKey.TIME, pstats.SortKey.CUMULATIVE):
+            stats.sort_stats(sort_key).print_stats(hotspot_count)
+    return profile_path, hotspots_path
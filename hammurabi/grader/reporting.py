@@ -12,6 +12,7 @@ from pathlib import Path
 from jinja2 import FileSystemLoader
 from jinja2.environment import Environment
 
+from hammurabi.grader.model import JUDGE_PHASES
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunCompilationErrorResult
 from hammurabi.grader.model import TestRunCorrectAnswerResult
@@ -56,6 +57,21 @@ def generate_testrun_log_csv(testruns: list[TestRun], filename: str) -> None:
             "score",
             "solution_time",
             "overall_time",
+            "wall_time",
+            "cpu_user_time",
+            "cpu_system_time",
+            "peak_memory",
+            "cpu_core",
+            "attempts",
+            "min_time",
+            "median_time",
+            "samples",
+            "sample_median_time",
+            "sample_mad_time",
+            "sample_min_time",
+            "sample_ci_low_time",
+            "sample_ci_high_time",
+            *(f"{phase}_phase_time" for phase in JUDGE_PHASES),
             "details",
         ]
 
@@ -64,6 +80,7 @@ def generate_testrun_log_csv(testruns: list[TestRun], filename: str) -> None:
 
         for testrun in testruns:
             details = testrun.result.format_details() if testrun.result else ""
+            repeat = testrun.data.get("repeat", {})
             writer.writerow(
                 {
                     "start_time": testrun.judge_start_time,
@@ -78,6 +95,24 @@ def generate_testrun_log_csv(testruns: list[TestRun], filename: str) -> None:
                     "score": testrun.result.score if testrun.result else 0,
                     "solution_time": testrun.get_lean_elapsed_milliseconds(),
                     "overall_time": testrun.get_judge_elapsed_milliseconds(),
+                    "wall_time": format_nanoseconds(testrun.wall_time_ns),
+                    "cpu_user_time": format_nanoseconds(testrun.cpu_user_time_ns),
+                    "cpu_system_time": format_nanoseconds(testrun.cpu_system_time_ns),
+                    "peak_memory": testrun.peak_memory_mb,
+                    "cpu_core": testrun.cpu_core,
+                    "attempts": len(testrun.data.get("attempts", [])) or 1,
+                    "min_time": format_nanoseconds(testrun.data.get("min_time_ns")),
+                    "median_time": format_nanoseconds(testrun.data.get("median_time_ns")),
+                    "samples": len(repeat.get("samples_ns", [])) or "",
+                    "sample_median_time": format_nanoseconds(repeat.get("median_ns")),
+                    "sample_mad_time": format_nanoseconds(repeat.get("mad_ns")),
+                    "sample_min_time": format_nanoseconds(repeat.get("min_ns")),
+                    "sample_ci_low_time": format_nanoseconds(repeat.get("ci_low_ns")),
+                    "sample_ci_high_time": format_nanoseconds(repeat.get("ci_high_ns")),
+                    **{
+                        f"{phase}_phase_time": format_nanoseconds(testrun.get_phase_time_ns(phase))
+                        for phase in JUDGE_PHASES
+                    },
                     "details": csv_escape_string(str(details))[:1000],
                 }
             )
@@ -126,13 +161,19 @@ def generate_matrix_report_html(testruns: list[TestRun], filename: str) -> None:
 
 
 def generate_heatmap_report_html(testruns: list[TestRun], filename: str) -> None:
-    """Generate a time-based heatmap HTML report."""
+    """
+    Generate a time-based heatmap HTML report.
+
+    The time of a test run measured repeatedly with `grade --repeat` is the median
+    of its samples, which is less sensitive to a noisy run than a single measurement.
+    """
     env = get_jinja_environment()
     for testrun in testruns:
-        testrun.__dict__["data"] = {}
+        heatmap_time = get_heatmap_time_milliseconds(testrun)
+        testrun.__dict__["data"] = {"heatmap_time": heatmap_time}
         if is_correct_answer(testrun):
             testrun.data["heatmap_adjusted_time"] = adjust_time_for_language(
-                testrun.get_lean_elapsed_milliseconds(), testrun.solution.language
+                heatmap_time, testrun.solution.language
             )
         else:
             testrun.data["heatmap_adjusted_time"] = None
@@ -181,6 +222,7 @@ def get_jinja_environment() -> Environment:
         {
             "format_timestamp": format_timestamp,
             "format_timestamp_micro": format_timestamp_micro,
+            "format_nanoseconds": format_nanoseconds,
             "dump": dump_preformatted_text,
             "dump_file": dump_file,
             "contextual_style": get_contextual_style_by_result,
@@ -210,6 +252,13 @@ def format_timestamp_micro(timestamp: float) -> str | None:
     return None
 
 
+def format_nanoseconds(nanoseconds: int | None) -> str:
+    """Format a duration in nanoseconds as milliseconds with microsecond precision."""
+    if nanoseconds is None:
+        return ""
+    return f"{nanoseconds / 1_000_000:.3f}"
+
+
 def dump_preformatted_text(content: str | None) -> str | None:
     """Truncate content if it's too long for display."""
     truncate_limit = 1024
@@ -251,7 +300,15 @@ def is_correct_answer(testrun: TestRun) -> bool:
     return testrun.result is not None and testrun.result.is_correct()
 
 
-def adjust_time_for_language(time: int, language: str | None) -> float:
+def get_heatmap_time_milliseconds(testrun: TestRun) -> float:
+    """Return the time of a test run shown in the heatmap: the median of its samples, if any."""
+    repeat = testrun.data.get("repeat")
+    if repeat is not None:
+        return repeat["median_ns"] / 1_000_000
+    return testrun.get_lean_elapsed_milliseconds()
+
+
+def adjust_time_for_language(time: float, language: str | None) -> float:
     """Adjust execution time to account for language performance differences."""
     bootstrap_allowances: dict[str, float] = {
         "c": 0.0,
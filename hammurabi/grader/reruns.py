@@ -0,0 +1,82 @@
+"""Re-runs of test runs whose time lands close to the time limit."""
+
+from __future__ import annotations
+
+import math
+import statistics
+
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.runners.subproc import get_time_limits
+
+
+def get_measured_time_ns(testrun: TestRun) -> int | None:
+    """Return the time of a test run on the clock its time limit is enforced on, if measured."""
+    limits = testrun.solution.problem.config.limits
+    if limits.time_limit_clock == "cpu" and testrun.cpu_user_time_ns is not None:
+        return testrun.cpu_user_time_ns + (testrun.cpu_system_time_ns or 0)
+    return testrun.wall_time_ns
+
+
+def is_borderline(testrun: TestRun) -> bool:
+    """
+    Return True if the time of a test run lands within the borderline band of its limit.
+
+    Only the verdicts that depend on time are re-run: a correct answer that finished
+    below the time limit by less than the band, or a timeout that didn't exceed the limit
+    by more than the band, so that the load of the machine may have decided its verdict.
+    A wrong answer or a crash is not borderline, since a re-run wouldn't change it.
+    A run killed at the timeout or by its CPU time limit is not borderline either,
+    since it's unknown by how much it would have exceeded the limit.
+    """
+    time_ns = get_measured_time_ns(testrun)
+    if time_ns is None or testrun.result is None or testrun.data.get("killed_at_limit"):
+        return False
+
+    time_limit_ns = get_time_limits(testrun)[0] * 1_000_000_000
+    band_ns = time_limit_ns * testrun.solution.problem.config.limits.borderline_band
+    if isinstance(testrun.result, TestRunTimeoutResult):
+        return time_limit_ns <= time_ns < time_limit_ns + band_ns
+    if isinstance(testrun.result, TestRunCorrectAnswerResult):
+        return time_ns >= time_limit_ns - band_ns
+    return False
+
+
+def should_rerun(attempts: list[TestRun]) -> bool:
+    """Return True if a test run needs another attempt after the given ones."""
+    limits = attempts[-1].solution.problem.config.limits
+    return len(attempts) <= limits.borderline_reruns and is_borderline(attempts[-1])
+
+
+def pick_attempt(attempts: list[TestRun]) -> TestRun:
+    """
+    Return the attempt that decides the outcome of a test run, with all attempts recorded.
+
+    The fastest attempt is the one least slowed down by the load of the machine.
+    If the test run was re-run, the result and time of every attempt, and the
+    minimum and median time, are recorded in its `data`, and its judging is
+    considered to start with the first attempt.
+    """
+    if len(attempts) == 1:
+        return attempts[0]
+
+    times_ns = [get_measured_time_ns(attempt) for attempt in attempts]
+    best_index = min(
+        range(len(attempts)),
+        key=lambda index: times_ns[index] if times_ns[index] is not None else math.inf,
+    )
+    best = attempts[best_index]
+    best.data["attempts"] = [
+        {
+            "result": attempt.result.status_code if attempt.result is not None else None,
+            "time_ns": time_ns,
+        }
+        for attempt, time_ns in zip(attempts, times_ns, strict=True)
+    ]
+    measured_times_ns = [time_ns for time_ns in times_ns if time_ns is not None]
+    if measured_times_ns:
+        best.data["min_time_ns"] = min(measured_times_ns)
+        best.data["median_time_ns"] = round(statistics.median(measured_times_ns))
+    best.judge_start_time = attempts[0].judge_start_time
+    return best
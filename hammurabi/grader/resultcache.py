@@ -0,0 +1,157 @@
+"""Persistent cache of test run results for incremental grading."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from hammurabi.grader import serialization
+from hammurabi.grader.buildcache import get_executable_identity
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunInternalErrorResult
+from hammurabi.utils import fileio
+
+# Bump whenever the fingerprint or the entry layout changes to invalidate old entries.
+FORMAT_VERSION = "1"
+OUTCOME_FILENAME = "testrun.json"
+
+# The TestRun attributes naming the output files stored along with the outcome.
+OUTPUT_FILE_ATTRIBUTES = ["answer_filename", "stdout_filename", "stderr_filename"]
+
+
+class ResultCache:
+    """
+    On-disk cache of test run outcomes shared across grading runs.
+
+    Entries are keyed by a fingerprint of everything that can affect the outcome
+    of a test run: the solution sources and compiled artifacts, the run command and
+    interpreter, the test case input and expected answer, the limits, the verifier
+    and the runner configuration. Each entry stores the result, the timings and the
+    output files of the run, so the reports of a grading run that reuses an entry
+    are as complete as if the solution had been run again.
+    """
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def compute_fingerprint(
+        self, testrun: TestRun, solution_digest: str, run_cmd: list[str]
+    ) -> str:
+        """
+        Compute the fingerprint of a test run.
+
+        Parameters
+        ----------
+        testrun
+            The test run, before it's executed.
+        solution_digest
+            A digest of the solution directory after compilation,
+            covering both the sources and the compiled artifacts.
+        run_cmd
+            The command that runs the solution.
+
+        Returns
+        -------
+        str
+            A hex digest that changes whenever anything affecting the outcome changes.
+        """
+        solution = testrun.solution
+        problem = solution.problem
+        config = problem.config
+        hasher = hashlib.sha256()
+
+        def update(*parts: str) -> None:
+            for part in parts:
+                hasher.update(part.encode("utf-8"))
+                hasher.update(b"\0")
+
+        update("format", FORMAT_VERSION)
+        update("solution", solution_digest, str(solution.language))
+        update("reference", str(solution == problem.reference_solution))
+
+        root_dir = solution.root_dir or ""
+        update(
+            "command", *[arg.replace(root_dir, "<root>") if root_dir else arg for arg in run_cmd]
+        )
+        if run_cmd:
+            update("interpreter", *get_executable_identity(run_cmd[0], os.environ.get("PATH")))
+
+        update("input", fileio.hash_file(testrun.testcase.input_filename))
+        answer_path = Path(testrun.testcase.correct_answer_filename)
+        update("answer", fileio.hash_file(answer_path) if answer_path.is_file() else "")
+        update("files", problem.input_filename, problem.output_filename)
+
+        update("limits", str(testrun.memory_limit), str(testrun.time_limit))
+        update("limits_config", config.limits.model_dump_json())
+        update("verifier", config.verifier)
+        update("runner", config.runner.model_dump_json())
+        update("security", config.security.model_dump_json())
+
+        return hasher.hexdigest()
+
+    def restore(self, fingerprint: str, testrun: TestRun) -> bool:
+        """
+        Restore the outcome and the output files of a cached test run.
+
+        Returns
+        -------
+        bool
+            True on a cache hit, False if the entry is missing or unusable.
+        """
+        entry_dir = self._get_entry_dir(fingerprint)
+        try:
+            with open(entry_dir / OUTCOME_FILENAME, encoding="utf-8") as outcome_file:
+                outcome = json.load(outcome_file)
+
+            for attribute in OUTPUT_FILE_ATTRIBUTES:
+                cached_path = entry_dir / attribute
+                target_filename = getattr(testrun, attribute)
+                if target_filename is not None and cached_path.is_file():
+                    shutil.copyfile(cached_path, target_filename)
+
+            serialization.apply_testrun_outcome(testrun, outcome)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError):
+            # A corrupted entry is treated as a miss and replaced on the next store.
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return False
+
+        return True
+
+    def store(self, fingerprint: str, testrun: TestRun) -> None:
+        """Store the outcome and the output files of a finished test run."""
+        staging_dir = self.cache_dir / "staging" / uuid.uuid4().hex
+        try:
+            staging_dir.mkdir(parents=True)
+            for attribute in OUTPUT_FILE_ATTRIBUTES:
+                filename = getattr(testrun, attribute)
+                if filename is not None and Path(filename).is_file():
+                    shutil.copyfile(filename, staging_dir / attribute)
+
+            outcome = serialization.testrun_outcome_to_dict(testrun)
+            fileio.write_entire_file(
+                str(staging_dir / OUTCOME_FILENAME), json.dumps(outcome, default=str)
+            )
+
+            entry_dir = self._get_entry_dir(fingerprint)
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    @staticmethod
+    def is_cacheable(testrun: TestRun) -> bool:
+        """Return True if the outcome of the test run may be reused by later grading runs."""
+        # Internal errors are failures of the judge rather than the solution.
+        return testrun.result is not None and not isinstance(
+            testrun.result, TestRunInternalErrorResult
+        )
+
+    def _get_entry_dir(self, fingerprint: str) -> Path:
+        return self.cache_dir / fingerprint[:2] / fingerprint
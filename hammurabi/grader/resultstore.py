@@ -0,0 +1,340 @@
+"""SQLite database holding the problems, solutions, test cases and test runs of a grading run."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from hammurabi.grader import serialization
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+
+RESULT_STORE_FILENAME = "testruns.db"
+
+# Bump whenever the schema changes.
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    root_dir TEXT NOT NULL,
+    input_filename TEXT NOT NULL,
+    output_filename TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS solutions (
+    id INTEGER PRIMARY KEY,
+    problem_id INTEGER NOT NULL REFERENCES problems (id),
+    author TEXT NOT NULL,
+    root_dir TEXT,
+    language TEXT,
+    run_command TEXT,
+    files TEXT NOT NULL,
+    is_reference INTEGER NOT NULL,
+    UNIQUE (problem_id, author)
+);
+
+CREATE TABLE IF NOT EXISTS testcases (
+    id INTEGER PRIMARY KEY,
+    problem_id INTEGER NOT NULL REFERENCES problems (id),
+    name TEXT NOT NULL,
+    input_filename TEXT NOT NULL,
+    correct_answer_filename TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    UNIQUE (problem_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    solution_id INTEGER NOT NULL REFERENCES solutions (id),
+    testcase_id INTEGER NOT NULL REFERENCES testcases (id),
+    output_dir TEXT,
+    status_code TEXT,
+    status TEXT,
+    score INTEGER,
+    result TEXT,
+    memory_limit INTEGER,
+    time_limit REAL,
+    peak_memory_mb INTEGER,
+    cpu_core INTEGER,
+    data TEXT NOT NULL,
+    UNIQUE (solution_id, testcase_id)
+);
+
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (id),
+    judge_start_time INTEGER,
+    judge_end_time INTEGER,
+    lean_start_time INTEGER,
+    lean_end_time INTEGER,
+    wall_time_ns INTEGER,
+    cpu_user_time_ns INTEGER,
+    cpu_system_time_ns INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (run_id, kind)
+);
+"""
+
+# The TestRun attributes stored in the artifacts table, by artifact kind.
+ARTIFACT_ATTRIBUTES = {
+    "answer": "answer_filename",
+    "compiler_output": "compiler_output_filename",
+    "stdout": "stdout_filename",
+    "stderr": "stderr_filename",
+}
+
+TIMING_COLUMNS = [
+    "judge_start_time",
+    "judge_end_time",
+    "lean_start_time",
+    "lean_end_time",
+    "wall_time_ns",
+    "cpu_user_time_ns",
+    "cpu_system_time_ns",
+]
+
+
+class ResultStore:
+    """
+    Normalized SQLite store of the test runs of a grading run.
+
+    Test runs are written as they finish, one transaction per batch, and the store
+    is the source of truth for the reports. Writing a test run for a (solution,
+    test case) pair that is already stored replaces the stored outcome.
+    """
+
+    def __init__(self, filename: str | Path) -> None:
+        self.filename = Path(filename)
+        self._connection = sqlite3.connect(self.filename)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        # The journal already makes the results durable, so the store can trade it for speed.
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._create_schema()
+        self._problem_ids: dict[str, int] = {}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def add_testruns(self, testruns: Iterable[TestRun]) -> None:
+        """Write a batch of finished test runs in a single transaction."""
+        try:
+            with self._connection:
+                for testrun in testruns:
+                    self._write_testrun(testrun)
+        except sqlite3.Error:
+            # Rows inserted by the failed transaction are gone, so are their cached ids.
+            self._problem_ids.clear()
+            raise
+
+    def load_testruns(self) -> list[TestRun]:
+        """
+        Load all stored test runs, in the order they were first written.
+
+        The problems, solutions and test cases are re-created from the store,
+        so the test runs form the same object graph as during grading.
+        """
+        problems = self._load_problems()
+        solutions = self._load_solutions(problems)
+        testcases = self._load_testcases(problems)
+
+        columns = ", ".join(f"t.{column}" for column in TIMING_COLUMNS)
+        rows = self._connection.execute(
+            f"""
+            SELECT r.id, r.solution_id, r.testcase_id, r.output_dir, r.result,
+                   r.memory_limit, r.time_limit, r.peak_memory_mb, r.cpu_core, r.data,
+                   {columns}
+            FROM runs r LEFT JOIN timings t ON t.run_id = r.id
+            ORDER BY r.id
+            """
+        ).fetchall()
+        artifacts = self._load_artifacts()
+
+        testruns: list[TestRun] = []
+        for row in rows:
+            run_id, solution_id, testcase_id, output_dir, result, memory_limit, time_limit = row[:7]
+            peak_memory_mb, cpu_core, data = row[7:10]
+            timings = dict(zip(TIMING_COLUMNS, row[10:], strict=True))
+            run_artifacts = artifacts.get(run_id, {})
+
+            testrun = TestRun(
+                solution=solutions[solution_id],
+                testcase=testcases[testcase_id],
+                output_dir=output_dir,
+                answer_filename=run_artifacts.get("answer"),
+                compiler_output_filename=run_artifacts.get("compiler_output"),
+                stdout_filename=run_artifacts.get("stdout"),
+                stderr_filename=run_artifacts.get("stderr"),
+                result=serialization.result_from_dict(json.loads(result)) if result else None,
+                memory_limit=memory_limit,
+                time_limit=time_limit,
+                peak_memory_mb=peak_memory_mb,
+                cpu_core=cpu_core,
+                data=json.loads(data),
+                **timings,
+            )
+            testruns.append(testrun)
+
+        return testruns
+
+    def _create_schema(self) -> None:
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version not in (0, SCHEMA_VERSION):
+            raise sqlite3.DatabaseError(
+                f"Unsupported result store schema version {version} in '{self.filename}'"
+            )
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _write_testrun(self, testrun: TestRun) -> None:
+        solution_id = self._write_solution(testrun.solution)
+        testcase_id = self._write_testcase(testrun.testcase)
+        result = testrun.result
+        values: dict[str, Any] = {
+            "solution_id": solution_id,
+            "testcase_id": testcase_id,
+            "output_dir": testrun.output_dir,
+            "status_code": result.status_code if result else None,
+            "status": result.status if result else None,
+            "score": result.score if result else None,
+            "result": json.dumps(serialization.result_to_dict(result)) if result else None,
+            "memory_limit": testrun.memory_limit,
+            "time_limit": testrun.time_limit,
+            "peak_memory_mb": testrun.peak_memory_mb,
+            "cpu_core": testrun.cpu_core,
+            "data": json.dumps(testrun.data, default=str),
+        }
+        run_id = self._upsert("runs", values, ["solution_id", "testcase_id"])
+
+        timings = {column: getattr(testrun, column) for column in TIMING_COLUMNS}
+        self._upsert("timings", {"run_id": run_id, **timings}, ["run_id"])
+
+        self._connection.execute("DELETE FROM artifacts WHERE run_id = ?", (run_id,))
+        self._connection.executemany(
+            "INSERT INTO artifacts (run_id, kind, path) VALUES (?, ?, ?)",
+            [
+                (run_id, kind, getattr(testrun, attribute))
+                for kind, attribute in ARTIFACT_ATTRIBUTES.items()
+                if getattr(testrun, attribute) is not None
+            ],
+        )
+
+    def _write_problem(self, problem: Problem) -> int:
+        if problem.name in self._problem_ids:
+            return self._problem_ids[problem.name]
+
+        values = {
+            "name": problem.name,
+            "root_dir": problem.root_dir,
+            "input_filename": problem.input_filename,
+            "output_filename": problem.output_filename,
+            "config": problem.config.model_dump_json(),
+        }
+        self._problem_ids[problem.name] = self._upsert("problems", values, ["name"])
+        return self._problem_ids[problem.name]
+
+    def _write_solution(self, solution: Solution) -> int:
+        values = {
+            "problem_id": self._write_problem(solution.problem),
+            "author": solution.author,
+            "root_dir": solution.root_dir,
+            "language": solution.language,
+            "run_command": solution.run_command,
+            "files": json.dumps(solution.files),
+            "is_reference": int(solution is solution.problem.reference_solution),
+        }
+        return self._upsert("solutions", values, ["problem_id", "author"])
+
+    def _write_testcase(self, testcase: TestCase) -> int:
+        values = {
+            "problem_id": self._write_problem(testcase.problem),
+            "name": testcase.name,
+            "input_filename": testcase.input_filename,
+            "correct_answer_filename": testcase.correct_answer_filename,
+            "score": testcase.score,
+        }
+        return self._upsert("testcases", values, ["problem_id", "name"])
+
+    def _upsert(self, table: str, values: dict[str, Any], key_columns: list[str]) -> int:
+        """Insert or update a row identified by its unique key columns, and return its rowid."""
+        columns = ", ".join(values)
+        placeholders = ", ".join(f":{column}" for column in values)
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in values if column not in key_columns
+        )
+        self._connection.execute(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}",
+            values,
+        )
+        condition = " AND ".join(f"{column} = :{column}" for column in key_columns)
+        (rowid,) = self._connection.execute(
+            f"SELECT rowid FROM {table} WHERE {condition}", values
+        ).fetchone()
+        return rowid
+
+    def _load_problems(self) -> dict[int, Problem]:
+        problems: dict[int, Problem] = {}
+        rows = self._connection.execute(
+            "SELECT id, name, root_dir, input_filename, output_filename, config FROM problems"
+        )
+        for problem_id, name, root_dir, input_filename, output_filename, config in rows:
+            problems[problem_id] = Problem(
+                name=name,
+                root_dir=root_dir,
+                input_filename=input_filename,
+                output_filename=output_filename,
+                config=ProblemConfig.model_validate_json(config),
+            )
+        return problems
+
+    def _load_solutions(self, problems: dict[int, Problem]) -> dict[int, Solution]:
+        solutions: dict[int, Solution] = {}
+        rows = self._connection.execute(
+            "SELECT id, problem_id, author, root_dir, language, run_command, files, is_reference "
+            "FROM solutions ORDER BY id"
+        )
+        for solution_id, problem_id, author, root_dir, language, run_command, files, is_ref in rows:
+            problem = problems[problem_id]
+            solution = Solution(problem, author, root_dir, json.loads(files), language, run_command)
+            if is_ref:
+                problem.reference_solution = solution
+            else:
+                problem.solutions.append(solution)
+            solutions[solution_id] = solution
+        return solutions
+
+    def _load_testcases(self, problems: dict[int, Problem]) -> dict[int, TestCase]:
+        testcases: dict[int, TestCase] = {}
+        rows = self._connection.execute(
+            "SELECT id, problem_id, name, input_filename, correct_answer_filename, score "
+            "FROM testcases ORDER BY id"
+        )
+        for testcase_id, problem_id, name, input_filename, correct_answer_filename, score in rows:
+            problem = problems[problem_id]
+            testcase = TestCase(problem, name, input_filename, correct_answer_filename, score)
+            problem.testcases.append(testcase)
+            testcases[testcase_id] = testcase
+        return testcases
+
+    def _load_artifacts(self) -> dict[int, dict[str, str]]:
+        artifacts: dict[int, dict[str, str]] = {}
+        for run_id, kind, path in self._connection.execute(
+            "SELECT run_id, kind, path FROM artifacts"
+        ):
+            artifacts.setdefault(run_id, {})[kind] = path
+        return artifacts
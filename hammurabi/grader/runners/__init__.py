@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+from hammurabi.grader.runners.asyncsubproc import AsyncSubprocessSolutionRunner
 from hammurabi.grader.runners.base import BaseSolutionRunner
+from hammurabi.grader.runners.eventloop import EventLoopSolutionRunner
 from hammurabi.grader.runners.subproc import SubprocessSolutionRunner
 
 __all__ = [
+    "AsyncSubprocessSolutionRunner",
     "BaseSolutionRunner",
+    "EventLoopSolutionRunner",
     "SubprocessSolutionRunner",
     "registered_runners",
 ]
@@ -15,4 +19,6 @@ __all__ = [
 registered_runners: dict[str, type[BaseSolutionRunner]] = {
     "BaseSolutionRunner": BaseSolutionRunner,
     "SubprocessSolutionRunner": SubprocessSolutionRunner,
+    "EventLoopSolutionRunner": EventLoopSolutionRunner,
+    "AsyncSubprocessSolutionRunner": AsyncSubprocessSolutionRunner,
 }
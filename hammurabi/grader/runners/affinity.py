@@ -0,0 +1,190 @@
+"""Pinning solutions to dedicated physical CPU cores."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+# Where Linux exposes the CPU topology.
+CPU_SYSFS_DIR = "/sys/devices/system/cpu"
+
+# Whether the CPU affinity of a thread can be set, which is only the case on Linux.
+CAN_PIN_CPU_CORES = hasattr(os, "sched_setaffinity") and hasattr(os, "sched_getaffinity")
+
+
+def parse_cpu_list(cpu_list: str) -> list[int]:
+    """Parse a kernel CPU list such as `0-3,8,10-11` into a sorted list of CPU numbers."""
+    cpus: set[int] = set()
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return sorted(cpus)
+
+
+def read_physical_cores(
+    allowed_cpus: set[int] | None = None, sysfs_dir: str | Path = CPU_SYSFS_DIR
+) -> list[list[int]]:
+    """
+    Return the logical CPUs of each physical core the grader may run on.
+
+    Logical CPUs that are SMT (hyperthread) siblings share a physical core and
+    end up in the same list.
+
+    Parameters
+    ----------
+    allowed_cpus
+        The logical CPUs the grader may use. Defaults to the affinity of the grader,
+        which reflects `taskset` and the cpuset of its cgroup.
+    sysfs_dir
+        The directory with the CPU topology.
+
+    Returns
+    -------
+    list[list[int]]
+        The allowed logical CPUs of each physical core, sorted, with the cores ordered
+        by their first logical CPU. A CPU without topology information is a core of its own.
+    """
+    if allowed_cpus is None:
+        allowed_cpus = os.sched_getaffinity(0) if CAN_PIN_CPU_CORES else set()
+
+    cores: dict[tuple[int, ...], list[int]] = {}
+    for cpu in sorted(allowed_cpus):
+        siblings = _read_core_siblings(Path(sysfs_dir) / f"cpu{cpu}" / "topology") or [cpu]
+        cores.setdefault(tuple(siblings), []).append(cpu)
+    return sorted(cores.values())
+
+
+class CoreAllocator:
+    """
+    Hands out dedicated physical cores to concurrently running solutions.
+
+    Only the first logical CPU of each physical core is handed out, so a solution
+    never shares a core with another one through its SMT sibling. The first
+    physical core can be reserved for the grader itself and the rest of the system.
+    """
+
+    def __init__(self, physical_cores: list[list[int]]) -> None:
+        self._judge_cpus = physical_cores[0] if physical_cores else []
+        self._cpus = [core[0] for core in physical_cores]
+        self._busy_cpus: set[int] = set()
+        self._lock = threading.Lock()
+
+    def get_judge_cpus(self) -> list[int]:
+        """Return the logical CPUs of the physical core reserved for the grader."""
+        return list(self._judge_cpus)
+
+    def get_core_count(self, reserve_judge_core: bool = True) -> int:
+        """Return the number of physical cores that can be handed out to solutions."""
+        return len(self._cpus) - 1 if reserve_judge_core and self._cpus else len(self._cpus)
+
+    def acquire(self, reserve_judge_core: bool = True) -> int | None:
+        """
+        Return the logical CPU of a free physical core and mark the core busy.
+
+        Returns
+        -------
+        int | None
+            The logical CPU to pin the solution to, or None if all cores are busy,
+            which the grader avoids by running at most `get_core_count` solutions at once.
+        """
+        candidates = self._cpus[1:] if reserve_judge_core else self._cpus
+        with self._lock:
+            for cpu in candidates:
+                if cpu not in self._busy_cpus:
+                    self._busy_cpus.add(cpu)
+                    return cpu
+        return None
+
+    def release(self, cpu: int) -> None:
+        """Mark the physical core of a logical CPU returned by `acquire` free again."""
+        with self._lock:
+            self._busy_cpus.discard(cpu)
+
+
+@functools.cache
+def get_core_allocator() -> CoreAllocator:
+    """Return the core allocator shared by all runners, created when first needed."""
+    return CoreAllocator(read_physical_cores())
+
+
+# The CPU affinity of the grader before it was pinned to the judge core, if it was.
+_grader_cpus: set[int] | None = None
+
+
+@contextlib.contextmanager
+def pinned_to_cpu(cpu: int | None) -> Iterator[None]:
+    """
+    Pin the calling thread to a logical CPU, and restore its affinity on exit.
+
+    The affinity is per thread and inherited by the processes the thread spawns,
+    so a solution spawned in this context runs on `cpu` from its first instruction,
+    along with all of its descendants, even when spawned with `vfork` or `posix_spawn`.
+    If `cpu` is None, the thread runs on the CPUs the grader had before it was pinned
+    to the judge core, so that unpinned solutions don't all share that one core.
+    """
+    cpus = {cpu} if cpu is not None else _grader_cpus
+    if cpus is None or not CAN_PIN_CPU_CORES:
+        yield
+        return
+
+    original_cpus = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, original_cpus)
+
+
+def unpinned() -> contextlib.AbstractContextManager[None]:
+    """Run the calling thread on all CPUs of the grader, even if it's pinned to the judge core."""
+    return pinned_to_cpu(None)
+
+
+def pin_grader_to_judge_core() -> None:
+    """
+    Pin all threads of the grader to the physical core reserved for it.
+
+    Threads started later inherit the affinity, so the grader never competes with
+    the solutions for their cores, or for the SMT siblings of those cores. The work
+    that doesn't belong on the judge core, such as compiling the solutions or running
+    the ones that aren't pinned, is done in the `unpinned` context.
+    """
+    global _grader_cpus  # noqa: PLW0603 - The affinity of the grader is process-wide.
+    judge_cpus = get_core_allocator().get_judge_cpus()
+    if not CAN_PIN_CPU_CORES or not judge_cpus:
+        return
+    if _grader_cpus is None:
+        _grader_cpus = os.sched_getaffinity(0)
+    for thread_id in _get_thread_ids():
+        # A thread may have exited in the meantime.
+        with contextlib.suppress(ProcessLookupError):
+            os.sched_setaffinity(thread_id, judge_cpus)
+
+
+def get_max_parallel_runs(jobs: int, reserve_judge_core: bool = True) -> int:
+    """Return the number of pinned solutions to run at once, capped by the cores to pin them to."""
+    if not CAN_PIN_CPU_CORES:
+        return jobs
+    return max(1, min(jobs, get_core_allocator().get_core_count(reserve_judge_core)))
+
+
+def _get_thread_ids() -> list[int]:
+    try:
+        return [int(entry) for entry in os.listdir("/proc/self/task")]
+    except OSError:
+        # Without /proc, only the calling thread can be pinned.
+        return [0]
+
+
+def _read_core_siblings(topology_dir: Path) -> list[int] | None:
+    # `core_cpus_list` supersedes `thread_siblings_list` since Linux 5.7.
+    for filename in ("core_cpus_list", "thread_siblings_list"):
+        with contextlib.suppress(OSError, ValueError):
+            return parse_cpu_list((topology_dir / filename).read_text())
+    return None
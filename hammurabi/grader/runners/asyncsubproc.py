@@ -0,0 +1,82 @@
+"""Subprocess-based solution runner for asyncio applications."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+
+from hammurabi.exceptions import SubprocessMemoryLimitError
+from hammurabi.exceptions import SubprocessTimeoutError
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.runners.eventloop import EventLoopSolutionRunner
+from hammurabi.grader.runners.eventloop import get_process_waiter
+from hammurabi.grader.runners.subproc import SolutionProcess
+from hammurabi.grader.runners.subproc import get_premature_termination_error
+from hammurabi.grader.runners.subproc import get_time_limits
+
+
+class AsyncSubprocessSolutionRunner(EventLoopSolutionRunner):
+    """
+    Runs solutions in a subprocess, and lets asyncio applications await them.
+
+    `run_async` awaits the exit of the solution on the running asyncio loop, while
+    the shared `ProcessWaiter` reaps the solutions and enforces their deadlines,
+    so any number of concurrent runs take neither a thread nor a child watcher each.
+    `run` behaves like `EventLoopSolutionRunner.run`.
+    """
+
+    async def run_async(self, testrun: TestRun, cmd: Sequence[str]) -> None:
+        """Run the command with time and memory limit enforcement, from an asyncio loop."""
+        time_limit, timeout_sec, cpu_time_limit_sec, wall_time_limit_sec = get_time_limits(testrun)
+        try:
+            await self.run_command_with_time_and_ram_limits_async(
+                testrun, cmd, timeout_sec, cpu_time_limit_sec, wall_time_limit_sec
+            )
+        except (SubprocessTimeoutError, SubprocessMemoryLimitError) as e:
+            raise get_premature_termination_error(e, time_limit) from e
+
+    async def run_command_with_time_and_ram_limits_async(
+        self,
+        testrun: TestRun,
+        cmd: Sequence[str],
+        timeout_sec: float,
+        cpu_time_limit_sec: float | None = None,
+        wall_time_limit_sec: float | None = None,
+    ) -> int | None:
+        """
+        Execute a command in a subprocess with timeout and memory limit enforcement.
+
+        The async counterpart of `run_command_with_time_and_ram_limits`, with the same
+        parameters, return value and exceptions. If the await is cancelled, the
+        process tree is killed.
+        """
+        waiter = get_process_waiter()
+        if waiter is None:
+            # Without `wait4`, fall back to blocking in a worker thread.
+            return await asyncio.to_thread(
+                self.run_command_with_time_and_ram_limits,
+                testrun,
+                cmd,
+                timeout_sec,
+                cpu_time_limit_sec,
+                wall_time_limit_sec,
+            )
+
+        process = SolutionProcess(testrun, cpu_time_limit_sec, wall_time_limit_sec)
+        process.start(cmd)
+        try:
+            process_exit = await waiter.wait_async(
+                process.proc,
+                time.monotonic() + timeout_sec,
+                process.handle_timeout,
+                process.kill_orphans,
+            )
+        except BaseException:
+            process.kill_tree()
+            raise
+        finally:
+            # Removing the cgroup of the run waits until its killed processes are reaped,
+            # which mustn't stall the event loop and the other runs awaited on it.
+            await asyncio.to_thread(process.stop_monitoring)
+        return process.finish(process_exit, timeout_sec)
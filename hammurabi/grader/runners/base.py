@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Sequence
 
 from hammurabi.grader.model import TestRun
@@ -16,3 +17,12 @@ class BaseSolutionRunner:
     def run(self, testrun: TestRun, cmd: Sequence[str]) -> None:
         """Run a solution command for a test run."""
         pass
+
+    async def run_async(self, testrun: TestRun, cmd: Sequence[str]) -> None:
+        """
+        Run a solution command for a test run from an asyncio event loop.
+
+        By default, `run` is called in a worker thread. Runners that can wait for
+        the solution without blocking override this.
+        """
+        await asyncio.to_thread(self.run, testrun, cmd)
@@ -0,0 +1,264 @@
+"""Solution runner that waits for all solution processes from a single event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import selectors
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from hammurabi.grader.runners.subproc import CAN_MEASURE_CPU_TIME
+from hammurabi.grader.runners.subproc import CAN_WAIT_WITHOUT_REAPING
+from hammurabi.grader.runners.subproc import ProcessExit
+from hammurabi.grader.runners.subproc import SubprocessSolutionRunner
+
+# Without pidfds, exited processes are detected by polling `wait4(WNOHANG)`:
+# quickly at first, since most test cases finish fast, then backing off.
+MIN_FALLBACK_POLL_INTERVAL_SECONDS = 0.001
+MAX_FALLBACK_POLL_INTERVAL_SECONDS = 0.02
+
+
+def _is_pidfd_supported() -> bool:
+    """Return True if the platform can wait for processes with pidfds (Linux 5.3+)."""
+    if not hasattr(os, "pidfd_open"):
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return False
+    return True
+
+
+PIDFD_SUPPORTED = _is_pidfd_supported()
+
+
+@dataclass(eq=False)
+class _PendingProcess:
+    pid: int
+    deadline: float | None
+    on_timeout: Callable[[], None] | None
+    # Called from the event loop thread once the process is reaped.
+    on_exit: Callable[[ProcessExit], None]
+    # Called from the event loop thread once the process has exited, before it's reaped.
+    before_reap: Callable[[], None] | None = None
+    pidfd: int | None = None
+    exited: bool = False
+
+
+class ProcessWaiter:
+    """
+    Waits for the exit of many processes from a single event loop thread.
+
+    Each process is waited for with a pidfd, which becomes readable when the
+    process exits, so the loop sleeps in `select` until either a process exits
+    or the nearest deadline expires. Deadlines are handled by the same loop,
+    so their precision doesn't depend on the scheduling of per-run timer threads.
+    On kernels without pidfds, the loop polls the processes with `wait4(WNOHANG)`
+    instead.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[int, _PendingProcess] = {}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        # Writing to this pipe wakes the loop up when a process is added.
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+        os.set_blocking(self._wakeup_read_fd, False)
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ)
+        self._thread: threading.Thread | None = None
+
+    def wait(
+        self,
+        proc: subprocess.Popen,
+        deadline: float | None = None,
+        on_timeout: Callable[[], None] | None = None,
+        before_reap: Callable[[], None] | None = None,
+    ) -> ProcessExit:
+        """
+        Wait for the process to exit and reap it.
+
+        Parameters
+        ----------
+        proc
+            A child process of the grader.
+        deadline
+            The `time.monotonic()` time at which `on_timeout` is called from the
+            event loop if the process is still running.
+        on_timeout
+            Callback that kills the process, which must not block.
+        before_reap
+            Callback called from the event loop once the process has exited, but
+            before it's reaped, which must not block either. Not called on
+            platforms without `waitid(WNOWAIT)`.
+
+        Returns
+        -------
+        ProcessExit
+            The exit of the process. `proc.returncode` is set as well.
+        """
+        exited = threading.Event()
+        process_exits: list[ProcessExit] = []
+
+        def on_exit(process_exit: ProcessExit) -> None:
+            process_exits.append(process_exit)
+            exited.set()
+
+        self._add(_PendingProcess(proc.pid, deadline, on_timeout, on_exit, before_reap))
+        exited.wait()
+        proc.returncode = process_exits[0].returncode
+        return process_exits[0]
+
+    async def wait_async(
+        self,
+        proc: subprocess.Popen,
+        deadline: float | None = None,
+        on_timeout: Callable[[], None] | None = None,
+        before_reap: Callable[[], None] | None = None,
+    ) -> ProcessExit:
+        """
+        Wait for the process to exit and reap it, without blocking the running asyncio loop.
+
+        Any number of processes can be awaited at once, all of them from the single
+        event loop thread of the waiter. See `wait` for the parameters.
+        If the await is cancelled, the process is still reaped once it exits.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ProcessExit] = loop.create_future()
+
+        def on_exit(process_exit: ProcessExit) -> None:
+            # The asyncio loop may be closed by the time a cancelled run is reaped.
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(_set_future_result, future, process_exit)
+
+        self._add(_PendingProcess(proc.pid, deadline, on_timeout, on_exit, before_reap))
+        process_exit = await future
+        proc.returncode = process_exit.returncode
+        return process_exit
+
+    def _add(self, pending: _PendingProcess) -> None:
+        with self._lock:
+            if PIDFD_SUPPORTED:
+                try:
+                    pending.pidfd = os.pidfd_open(pending.pid)
+                    self._selector.register(pending.pidfd, selectors.EVENT_READ, pending)
+                except ProcessLookupError:
+                    # Already exited and reaped by someone else, handled by the loop.
+                    pending.pidfd = None
+            self._pending[pending.pid] = pending
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="process-waiter", daemon=True
+                )
+                self._thread.start()
+        os.write(self._wakeup_write_fd, b"\0")
+
+    def _run(self) -> None:
+        poll_interval = MIN_FALLBACK_POLL_INTERVAL_SECONDS
+        while True:
+            for key, _ in self._selector.select(self._get_select_timeout(poll_interval)):
+                if key.data is None:
+                    with contextlib.suppress(BlockingIOError):
+                        os.read(self._wakeup_read_fd, 4096)
+                    # New processes are polled quickly without pidfds.
+                    poll_interval = MIN_FALLBACK_POLL_INTERVAL_SECONDS
+                else:
+                    self._try_reap(key.data)
+
+            with self._lock:
+                pending_processes = list(self._pending.values())
+            now = time.monotonic()
+            for pending in pending_processes:
+                # Without a pidfd there is no readiness event, so check every process.
+                if pending.pidfd is None:
+                    self._try_reap(pending)
+                if pending.deadline is not None and pending.deadline <= now and not pending.exited:
+                    on_timeout, pending.on_timeout = pending.on_timeout, None
+                    if on_timeout is not None:
+                        # A failing callback must not bring down the loop.
+                        with contextlib.suppress(Exception):
+                            on_timeout()
+
+            poll_interval = min(poll_interval * 2, MAX_FALLBACK_POLL_INTERVAL_SECONDS)
+
+    def _get_select_timeout(self, poll_interval: float) -> float | None:
+        with self._lock:
+            pending_processes = list(self._pending.values())
+        timeouts = [
+            pending.deadline - time.monotonic()
+            for pending in pending_processes
+            if pending.deadline is not None and pending.on_timeout is not None
+        ]
+        if any(pending.pidfd is None for pending in pending_processes):
+            timeouts.append(poll_interval)
+        return max(0.0, min(timeouts)) if timeouts else None
+
+    def _try_reap(self, pending: _PendingProcess) -> None:
+        """Reap the process if it has exited, and wake up its waiter."""
+        try:
+            if pending.before_reap is not None and CAN_WAIT_WITHOUT_REAPING:
+                if os.waitid(os.P_PID, pending.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is None:
+                    return
+                before_reap, pending.before_reap = pending.before_reap, None
+                with contextlib.suppress(Exception):
+                    before_reap()
+            pid, wait_status, rusage = os.wait4(pending.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Someone else has reaped the process already.
+            process_exit = ProcessExit(None, time.monotonic_ns())
+        else:
+            if pid == 0:
+                return
+            process_exit = ProcessExit(
+                os.waitstatus_to_exitcode(wait_status), time.monotonic_ns(), rusage
+            )
+
+        with self._lock:
+            del self._pending[pending.pid]
+            if pending.pidfd is not None:
+                self._selector.unregister(pending.pidfd)
+                os.close(pending.pidfd)
+        pending.exited = True
+        pending.on_exit(process_exit)
+
+
+def _set_future_result(future: asyncio.Future[ProcessExit], process_exit: ProcessExit) -> None:
+    if not future.done():
+        future.set_result(process_exit)
+
+
+# The event loop thread is only started once the first process is waited for.
+_waiter: ProcessWaiter | None = ProcessWaiter() if CAN_MEASURE_CPU_TIME else None
+
+
+def get_process_waiter() -> ProcessWaiter | None:
+    """Return the process waiter shared by all runners, or None if `wait4` isn't available."""
+    return _waiter
+
+
+class EventLoopSolutionRunner(SubprocessSolutionRunner):
+    """
+    Runs solutions in a subprocess, waiting for their exit from a shared event loop.
+
+    Rather than each run waiting in `wait4` while a separate supervisor enforces
+    its deadline, all runs hand their processes over to a single `ProcessWaiter`,
+    which detects the exits with pidfds and enforces the deadlines itself.
+    Falls back to `SubprocessSolutionRunner` on platforms without `wait4`.
+    """
+
+    def wait_for_process(
+        self,
+        proc: subprocess.Popen,
+        deadline: float,
+        on_timeout: Callable[[], None],
+        before_reap: Callable[[], None] | None = None,
+    ) -> ProcessExit:
+        """Wait for the process to exit from the shared event loop."""
+        waiter = get_process_waiter()
+        if waiter is None:
+            return super().wait_for_process(proc, deadline, on_timeout, before_reap)
+        return waiter.wait(proc, deadline, on_timeout, before_reap)
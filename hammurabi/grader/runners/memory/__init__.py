@@ -1,13 +1,15 @@
 """Memory limit enforcement module.
 
 Provides platform-specific memory limiting for subprocess execution:
-- Linux: resource.setrlimit(RLIMIT_AS) via preexec_fn
+- Linux with a delegated cgroup v2: memory.max of a cgroup per run
+- Linux: RLIMIT_AS, applied when the process is spawned
 - Windows: Job Objects with memory limits
 - macOS/fallback: psutil polling
 """
 
 from __future__ import annotations
 
+import contextlib
 import platform
 
 from hammurabi.grader.runners.memory.base import BaseMemoryLimiter
@@ -16,13 +18,16 @@ from hammurabi.grader.runners.memory.fallback import PollingMemoryLimiter
 __all__ = ["create_memory_limiter", "BaseMemoryLimiter"]
 
 
-def create_memory_limiter(memory_limit_mb: int) -> BaseMemoryLimiter:
+def create_memory_limiter(memory_limit_mb: int, use_cgroup: bool = True) -> BaseMemoryLimiter:
     """Create the appropriate memory limiter for the current platform.
 
     Parameters
     ----------
     memory_limit_mb
         Maximum memory allowed in megabytes.
+    use_cgroup
+        Whether to limit resident memory with a cgroup v2 on Linux. Falls back
+        to `RLIMIT_AS` if no delegated cgroup with the memory controller is writable.
 
     Returns
     -------
@@ -31,6 +36,15 @@ def create_memory_limiter(memory_limit_mb: int) -> BaseMemoryLimiter:
     """
     system = platform.system()
 
+    if system == "Linux" and use_cgroup:
+        from hammurabi.grader.runners.memory.cgroup import CgroupMemoryLimiter  # noqa: PLC0415
+        from hammurabi.grader.runners.memory.cgroup import find_delegated_cgroup  # noqa: PLC0415
+
+        cgroup_dir = find_delegated_cgroup()
+        if cgroup_dir is not None:
+            with contextlib.suppress(OSError):
+                return CgroupMemoryLimiter(memory_limit_mb, cgroup_dir)
+
     if system == "Linux":
         from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
 
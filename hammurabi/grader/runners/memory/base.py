@@ -7,12 +7,15 @@ from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
 
+from hammurabi.grader.runners.spawn import SpawnLimits
+
 
 class BaseMemoryLimiter(ABC):
     """Abstract base class for memory limit enforcement.
 
     Platform-specific implementations use different mechanisms:
-    * Linux: `resource.setrlimit(RLIMIT_AS)` via `preexec_fn`
+    * Linux with a delegated cgroup v2: a memory-limited cgroup per run
+    * Linux: `RLIMIT_AS`, applied when the process is spawned
     * macOS/Windows/fallback: `psutil` polling
     """
 
@@ -40,6 +43,19 @@ class BaseMemoryLimiter(ABC):
             A function to set resource limits, or None.
         """
 
+    def get_spawn_limits(self) -> SpawnLimits:
+        """Return the limits to apply to the subprocess between its spawn and `exec`.
+
+        Used for Linux rlimits and cgroups, and applied without a `preexec_fn`,
+        see `hammurabi.grader.runners.spawn`. No limits by default.
+
+        Returns
+        -------
+        SpawnLimits
+            The limits to apply when spawning the subprocess.
+        """
+        return SpawnLimits()
+
     @abstractmethod
     def attach_to_process(self, proc: subprocess.Popen) -> None:
         """Attach memory limiting to a running process.
@@ -70,6 +86,19 @@ class BaseMemoryLimiter(ABC):
     def stop_monitoring(self) -> None:
         """Stop background memory monitoring."""
 
+    def kill_processes(self) -> bool:
+        """Kill every process running under the limit, if the limiter keeps track of them.
+
+        Used for Linux cgroups, which contain all the descendants of the subprocess,
+        including those that have left its process group or session.
+
+        Returns
+        -------
+        bool
+            True if the processes were killed, False if the limiter can't find them.
+        """
+        return False
+
     def get_peak_memory_mb(self) -> int | None:
         """Return peak memory usage observed, if available.
 
@@ -79,3 +108,16 @@ class BaseMemoryLimiter(ABC):
             Peak memory in megabytes, or None if not tracked.
         """
         return self.peak_memory_mb
+
+    def was_limit_exceeded(self) -> bool:
+        """Return True if the kernel killed the process for exceeding the limit.
+
+        Only limiters where the kernel reports such kills can detect them,
+        the others rely on the `on_exceeded` callback of `start_monitoring`.
+
+        Returns
+        -------
+        bool
+            True if the limit was exceeded, False if not or if unknown.
+        """
+        return False
@@ -0,0 +1,219 @@
+"""Linux memory limiter using cgroup v2 memory controllers."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import os
+import signal
+import subprocess
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from hammurabi.grader.runners import spawn
+from hammurabi.grader.runners.memory.base import BaseMemoryLimiter
+from hammurabi.grader.runners.spawn import SpawnLimits
+
+# The cgroup the grader moves itself into, so that its own cgroup can have controllers enabled.
+GRADER_CGROUP_NAME = "hammurabi-grader"
+
+# How long to wait for the processes of a cgroup to exit before removing it.
+CGROUP_REMOVAL_TIMEOUT_SECONDS = 1.0
+
+
+class CgroupMemoryLimiter(BaseMemoryLimiter):
+    """Memory limiter using a dedicated cgroup v2 per solution run.
+
+    Unlike `RLIMIT_AS`, `memory.max` limits the resident memory of the whole
+    process tree, so runtimes that reserve large address spaces up front
+    (JVM, .NET, Node.js) start normally under modest limits. The kernel
+    OOM-kills the solution when it exceeds the limit, which is detected from
+    `memory.events`, and `memory.peak` reports the peak memory usage.
+    """
+
+    def __init__(self, memory_limit_mb: int, parent_cgroup_dir: str | Path) -> None:
+        """Create the cgroup of the run.
+
+        Parameters
+        ----------
+        memory_limit_mb
+            Maximum memory allowed in megabytes.
+        parent_cgroup_dir
+            A delegated cgroup with the memory controller enabled for its children.
+
+        Raises
+        ------
+        OSError
+            If the cgroup can't be created or configured.
+        """
+        super().__init__(memory_limit_mb)
+        self.cgroup_dir = Path(parent_cgroup_dir) / f"run-{uuid.uuid4().hex}"
+        self._oom_killed = False
+
+        self.cgroup_dir.mkdir()
+        try:
+            (self.cgroup_dir / "memory.max").write_text(str(self.memory_limit_bytes))
+            # Swapping would hide memory usage from the limit, so disable it where possible.
+            _write_if_exists(self.cgroup_dir / "memory.swap.max", "0")
+            # Kill the whole process tree on OOM rather than a single process of it.
+            _write_if_exists(self.cgroup_dir / "memory.oom.group", "1")
+        except OSError:
+            self._remove_cgroup()
+            raise
+
+    def get_preexec_fn(self) -> Callable[[], None] | None:
+        """Return preexec_fn that moves the process into the cgroup of the run.
+
+        Returns
+        -------
+        Callable[[], None] | None
+            Function that joins the cgroup before exec.
+        """
+        return spawn.get_preexec_fn(self.get_spawn_limits())
+
+    def get_spawn_limits(self) -> SpawnLimits:
+        """Return the cgroup the subprocess joins before exec.
+
+        Returns
+        -------
+        SpawnLimits
+            The `cgroup.procs` file of the cgroup of the run.
+        """
+        return SpawnLimits(cgroup_procs_filename=str(self.cgroup_dir / "cgroup.procs"))
+
+    def attach_to_process(self, proc: subprocess.Popen) -> None:
+        """No-op - the process joins the cgroup when it's spawned."""
+
+    def start_monitoring(self, proc: subprocess.Popen, on_exceeded: Callable[[], None]) -> None:
+        """No-op - the kernel enforces the limit of the cgroup."""
+
+    def stop_monitoring(self) -> None:
+        """Collect the peak memory and OOM kills of the run, and remove its cgroup.
+
+        Any processes left in the cgroup, such as orphaned children of the
+        solution, are killed.
+        """
+        with contextlib.suppress(OSError, ValueError):
+            peak_bytes = int((self.cgroup_dir / "memory.peak").read_text())
+            self.peak_memory_mb = -(-peak_bytes // (1024 * 1024))
+
+        with contextlib.suppress(OSError, ValueError):
+            self._oom_killed = (
+                _read_flat_keyed_file(self.cgroup_dir / "memory.events").get("oom_kill", 0) > 0
+            )
+
+        self._remove_cgroup()
+
+    def kill_processes(self) -> bool:
+        """Kill every process in the cgroup of the run, with `cgroup.kill` where available.
+
+        Returns
+        -------
+        bool
+            True unless the cgroup couldn't be accessed.
+        """
+        return self._kill_remaining_processes()
+
+    def was_limit_exceeded(self) -> bool:
+        """Return True if a process of the run was OOM-killed by the cgroup."""
+        return self._oom_killed
+
+    def _remove_cgroup(self) -> None:
+        self._kill_remaining_processes()
+        deadline = time.monotonic() + CGROUP_REMOVAL_TIMEOUT_SECONDS
+        while True:
+            try:
+                self.cgroup_dir.rmdir()
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                # The cgroup is busy until the killed processes are reaped.
+                if time.monotonic() > deadline:
+                    return
+                time.sleep(0.01)
+
+    def _kill_remaining_processes(self) -> bool:
+        kill_filename = self.cgroup_dir / "cgroup.kill"
+        try:
+            if kill_filename.exists():
+                kill_filename.write_text("1")
+                return True
+            # `cgroup.kill` is only available since Linux 5.14.
+            for pid in (self.cgroup_dir / "cgroup.procs").read_text().split():
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(int(pid), signal.SIGKILL)
+        except OSError:
+            return False
+        return True
+
+
+@functools.cache
+def find_delegated_cgroup() -> Path | None:
+    """Find a cgroup v2 where the grader can create memory-limited child cgroups.
+
+    The grader's own cgroup is used if it's writable and has the memory
+    controller available, e.g. when started by
+    `systemd-run --user --scope -p Delegate=yes hammurabi grade`.
+    Since a cgroup with processes can't enable controllers for its children,
+    the grader first moves itself into a leaf cgroup of its own.
+
+    Returns
+    -------
+    Path | None
+        The delegated cgroup directory, or None if cgroup v2 memory limits aren't available.
+    """
+    try:
+        cgroup_dir = _get_own_cgroup_dir()
+        if cgroup_dir is None or not os.access(cgroup_dir, os.W_OK):
+            return None
+        if "memory" not in (cgroup_dir / "cgroup.controllers").read_text().split():
+            return None
+
+        if "memory" not in (cgroup_dir / "cgroup.subtree_control").read_text().split():
+            grader_cgroup_dir = cgroup_dir / GRADER_CGROUP_NAME
+            grader_cgroup_dir.mkdir(exist_ok=True)
+            (grader_cgroup_dir / "cgroup.procs").write_text(str(os.getpid()))
+            (cgroup_dir / "cgroup.subtree_control").write_text("+memory")
+    except OSError:
+        return None
+
+    return cgroup_dir
+
+
+def _get_own_cgroup_dir() -> Path | None:
+    """Return the cgroup v2 directory of the current process, if any."""
+    mount_point = None
+    with open("/proc/self/mountinfo", encoding="utf-8") as mountinfo_file:
+        for line in mountinfo_file:
+            # Format: ... mount_point options [optional fields] - fs_type source super_options
+            fields, _, fs_fields = line.partition(" - ")
+            if fs_fields.split()[0] == "cgroup2":
+                mount_point = Path(fields.split()[4])
+                break
+    if mount_point is None:
+        return None
+
+    with open("/proc/self/cgroup", encoding="utf-8") as cgroup_file:
+        for line in cgroup_file:
+            # The cgroup v2 hierarchy has the ID 0 and no controller list.
+            hierarchy_id, _, path = line.rstrip("\n").split(":", 2)
+            if hierarchy_id == "0":
+                return mount_point / path.lstrip("/")
+    return None
+
+
+def _write_if_exists(filename: Path, value: str) -> None:
+    if filename.exists():
+        filename.write_text(value)
+
+
+def _read_flat_keyed_file(filename: Path) -> dict[str, int]:
+    """Read a cgroup file of `key value` lines, such as `memory.events`."""
+    values: dict[str, int] = {}
+    for line in filename.read_text().splitlines():
+        key, _, value = line.partition(" ")
+        values[key] = int(value)
+    return values
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import subprocess
 import sys
 from collections.abc import Callable
 
-from hammurabi.grader.runners.memory.base import BaseMemoryLimiter
+from hammurabi.grader.runners import spawn
+from hammurabi.grader.runners.memory.fallback import PollingMemoryLimiter
+from hammurabi.grader.runners.spawn import SpawnLimits
 
 # The `resource` module is only available on Unix-like systems.
 # Import it conditionally to avoid type checker errors on Windows.
@@ -14,40 +15,38 @@ if sys.platform != "win32":
     import resource
 
 
-class LinuxMemoryLimiter(BaseMemoryLimiter):
+class LinuxMemoryLimiter(PollingMemoryLimiter):
     """Memory limiter using Linux resource limits (`setrlimit`).
 
     Uses `RLIMIT_AS` to limit virtual address space, which is reliably
-    enforced by the kernel.
+    enforced by the kernel: the process receives an `ENOMEM` error from
+    malloc/mmap when it tries to allocate beyond the limit. Polling is only
+    used to track the peak resident memory of the process tree, from the
+    `VmHWM` high-water mark of each process. A run that ends before it is first
+    sampled has no measured peak: an exited process no longer reports `VmHWM`.
     """
 
-    def get_preexec_fn(self) -> Callable[[], None]:
+    ENFORCES_LIMIT = False
+
+    def get_preexec_fn(self) -> Callable[[], None] | None:
         """Return preexec_fn that sets RLIMIT_AS.
 
         Returns
         -------
-        Callable[[], None]
+        Callable[[], None] | None
             Function that sets the memory limit before exec.
         """
-        limit_bytes = self.memory_limit_bytes
-
-        def set_memory_limit() -> None:
-            # `RLIMIT_AS` limits virtual memory (address space).
-            # This is more reliable than `RLIMIT_DATA` for catching `malloc` failures.
-            resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))  # type: ignore[name-defined]
-
-        return set_memory_limit
-
-    def attach_to_process(self, proc: subprocess.Popen) -> None:
-        """No-op on Linux - limits are set via `preexec_fn`."""
+        return spawn.get_preexec_fn(self.get_spawn_limits())
 
-    def start_monitoring(self, proc: subprocess.Popen, on_exceeded: Callable[[], None]) -> None:
-        """No-op on Linux - kernel enforces limits via `setrlimit`.
+    def get_spawn_limits(self) -> SpawnLimits:
+        """Return the `RLIMIT_AS` limit of the subprocess.
 
-        Note: On Linux, the kernel will kill the process with `SIGKILL`
-        when it tries to allocate beyond the limit. The process receives
-        an `ENOMEM` error from malloc/mmap.
+        Returns
+        -------
+        SpawnLimits
+            The memory limit as both the soft and the hard `RLIMIT_AS` limit.
         """
-
-    def stop_monitoring(self) -> None:
-        """No-op on Linux."""
+        # `RLIMIT_AS` limits virtual memory (address space).
+        # This is more reliable than `RLIMIT_DATA` for catching `malloc` failures.
+        limit_bytes = self.memory_limit_bytes
+        return SpawnLimits(rlimits={resource.RLIMIT_AS: (limit_bytes, limit_bytes)})  # type: ignore[name-defined]
@@ -0,0 +1,105 @@
+"""Spawning solution processes with resource limits, without a `preexec_fn`."""
+
+from __future__ import annotations
+
+import os
+import shlex
+import sys
+from collections.abc import Callable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import field
+
+# The `resource` module is only available on Unix-like systems.
+if sys.platform != "win32":
+    import resource
+
+# The shell that applies the limits of a solution process before executing the solution.
+SPAWN_SHELL = "/bin/sh"
+
+# The `ulimit` option of each supported resource limit, and the unit of its value in bytes
+# or seconds. These options are available in every POSIX shell, including dash and busybox.
+ULIMIT_OPTIONS: dict[int, tuple[str, int]] = (
+    {
+        resource.RLIMIT_AS: ("-v", 1024),
+        resource.RLIMIT_CPU: ("-t", 1),
+    }
+    if sys.platform != "win32"
+    else {}
+)
+
+
+@dataclass
+class SpawnLimits:
+    """Limits applied to a solution process between its spawn and the exec of the solution."""
+
+    # Resource limits as (soft, hard) pairs, by their `resource.RLIMIT_*` constant.
+    rlimits: dict[int, tuple[int, int]] = field(default_factory=dict)
+    # The `cgroup.procs` file of the cgroup v2 the process joins.
+    cgroup_procs_filename: str | None = None
+
+    def is_empty(self) -> bool:
+        """Return True if there are no limits to apply."""
+        return not self.rlimits and self.cgroup_procs_filename is None
+
+
+def get_spawn_command(cmd: Sequence[str], limits: SpawnLimits) -> list[str]:
+    """
+    Return the command that runs `cmd` with the limits applied.
+
+    Setting the limits in a `preexec_fn` forces `subprocess` to fork the whole
+    grader and run Python code in the child, which gets slower the more memory
+    the grader uses, and isn't safe while other threads are running. Instead, the
+    limits are applied by a shell that then executes the solution in its place,
+    which lets `subprocess` spawn the process with `vfork` or `posix_spawn`.
+    The limits still apply before the first instruction of the solution runs.
+
+    Parameters
+    ----------
+    cmd
+        The command of the solution.
+    limits
+        The limits to apply.
+
+    Returns
+    -------
+    list[str]
+        `cmd` itself if there are no limits to apply, or the command of the
+        shell that applies the limits and executes `cmd`.
+    """
+    if limits.is_empty():
+        return list(cmd)
+
+    steps = []
+    if limits.cgroup_procs_filename is not None:
+        steps.append(f"echo $$ > {shlex.quote(limits.cgroup_procs_filename)}")
+    for resource_id, (soft_limit, hard_limit) in limits.rlimits.items():
+        option, unit = ULIMIT_OPTIONS[resource_id]
+        # The soft limit goes first, since it may never exceed the hard limit.
+        steps.append(f"ulimit -S {option} {_format_ulimit(soft_limit, unit)}")
+        steps.append(f"ulimit -H {option} {_format_ulimit(hard_limit, unit)}")
+    steps.append('exec "$@"')
+
+    # The arguments after the script are `$0` and `$@` of the shell.
+    return [SPAWN_SHELL, "-c", " && ".join(steps), "hammurabi-spawn", *cmd]
+
+
+def get_preexec_fn(limits: SpawnLimits) -> Callable[[], None] | None:
+    """Return a `preexec_fn` that applies the limits, or None if there are no limits to apply."""
+    if limits.is_empty():
+        return None
+
+    def apply_limits() -> None:
+        if limits.cgroup_procs_filename is not None:
+            with open(limits.cgroup_procs_filename, "w") as procs_file:
+                procs_file.write(str(os.getpid()))
+        for resource_id, rlimit in limits.rlimits.items():
+            resource.setrlimit(resource_id, rlimit)  # type: ignore[name-defined]
+
+    return apply_limits
+
+
+def _format_ulimit(limit: int, unit: int) -> str:
+    if limit == resource.RLIM_INFINITY:  # type: ignore[name-defined]
+        return "unlimited"
+    return str(limit // unit)
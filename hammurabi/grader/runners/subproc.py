@@ -3,9 +3,16 @@
 from __future__ import annotations
 
 import contextlib
+import math
+import os
+import signal
 import subprocess
+import sys
 import threading
+import time
+from collections.abc import Callable
 from collections.abc import Sequence
+from dataclasses import dataclass
 
 import psutil
 
@@ -15,8 +22,33 @@ from hammurabi.exceptions import TestRunPrematureTerminationError
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunMemoryExceededResult
 from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.runners.affinity import CAN_PIN_CPU_CORES
+from hammurabi.grader.runners.affinity import get_core_allocator
+from hammurabi.grader.runners.affinity import pinned_to_cpu
 from hammurabi.grader.runners.base import BaseSolutionRunner
+from hammurabi.grader.runners.memory import BaseMemoryLimiter
 from hammurabi.grader.runners.memory import create_memory_limiter
+from hammurabi.grader.runners.spawn import SpawnLimits
+from hammurabi.grader.runners.spawn import get_spawn_command
+from hammurabi.grader.runners.supervisor import WatchedProcess
+from hammurabi.grader.runners.supervisor import get_process_supervisor
+
+# The `resource` module is only available on Unix-like systems.
+if sys.platform != "win32":
+    import resource
+
+# Whether the CPU time of a finished process tree can be read from `wait4`.
+CAN_MEASURE_CPU_TIME = hasattr(os, "wait4")
+
+# Whether solutions run in a process group of their own, which is killed as a whole.
+CAN_KILL_PROCESS_GROUPS = hasattr(os, "killpg")
+
+# Whether the exit of a process can be awaited without reaping it, see `waitid(WNOWAIT)`.
+CAN_WAIT_WITHOUT_REAPING = hasattr(os, "waitid") and hasattr(os, "WNOWAIT")
+
+# When time limits are enforced on CPU time, a solution that sleeps or blocks
+# is still killed once its wall time exceeds the time limit by this factor.
+CPU_CLOCK_WALL_TIMEOUT_FACTOR = 3.0
 
 
 class SubprocessSolutionRunner(BaseSolutionRunner):
@@ -27,29 +59,28 @@ class SubprocessSolutionRunner(BaseSolutionRunner):
 
     def run(self, testrun: TestRun, cmd: Sequence[str]) -> None:
         """Run the command with time and memory limit enforcement."""
-        config = testrun.solution.problem.config
-        time_limit = config.limits.time.get_for_language(testrun.solution.language)
-        multiplier = config.limits.time_limit_multiplier
-        adjusted_time_limit = time_limit * multiplier
-
+        time_limit, timeout_sec, cpu_time_limit_sec, wall_time_limit_sec = get_time_limits(testrun)
         try:
-            self.run_command_with_time_and_ram_limits(testrun, cmd, adjusted_time_limit)
-        except SubprocessTimeoutError as e:
-            result = TestRunTimeoutResult(adjusted_time_limit)
-            raise TestRunPrematureTerminationError(result) from e
-        except SubprocessMemoryLimitError as e:
-            result = TestRunMemoryExceededResult(
-                memory_limit_mb=e.memory_limit_mb,
-                peak_memory_mb=e.peak_memory_mb,
+            self.run_command_with_time_and_ram_limits(
+                testrun, cmd, timeout_sec, cpu_time_limit_sec, wall_time_limit_sec
             )
-            raise TestRunPrematureTerminationError(result) from e
+        except (SubprocessTimeoutError, SubprocessMemoryLimitError) as e:
+            raise get_premature_termination_error(e, time_limit) from e
 
     def run_command_with_time_and_ram_limits(
-        self, testrun: TestRun, cmd: Sequence[str], timeout_sec: float
+        self,
+        testrun: TestRun,
+        cmd: Sequence[str],
+        timeout_sec: float,
+        cpu_time_limit_sec: float | None = None,
+        wall_time_limit_sec: float | None = None,
     ) -> int | None:
         """
         Execute a command in a subprocess with timeout and memory limit enforcement.
 
+        The wall time and, where `wait4` is available, the user and system CPU time
+        of the process tree are recorded on the test run.
+
         Parameters
         ----------
         testrun
@@ -57,7 +88,13 @@ class SubprocessSolutionRunner(BaseSolutionRunner):
         cmd
             Command to execute.
         timeout_sec
-            Timeout in seconds.
+            Wall time timeout in seconds.
+        cpu_time_limit_sec
+            Optional limit on the user plus system CPU time of the process tree, in seconds.
+        wall_time_limit_sec
+            Optional limit on the wall time of the process, in seconds, checked once it
+            exits. Lets a process that runs a little over the limit finish before
+            `timeout_sec` to measure by how much it exceeded the limit.
 
         Returns
         -------
@@ -67,43 +104,126 @@ class SubprocessSolutionRunner(BaseSolutionRunner):
         Raises
         ------
         SubprocessTimeoutError
-            If the timeout expires before completion.
+            If the timeout expires before completion, or the CPU or wall time limit is exceeded.
         SubprocessMemoryLimitError
             If the memory limit is exceeded.
         """
-        timeout_occurred = threading.Event()
-        memory_exceeded = threading.Event()
-        kill_lock = threading.Lock()
-        process_killed = threading.Event()
+        process = SolutionProcess(testrun, cpu_time_limit_sec, wall_time_limit_sec)
+        process.start(cmd)
+        try:
+            process_exit = self.wait_for_process(
+                process.proc,
+                time.monotonic() + timeout_sec,
+                process.handle_timeout,
+                process.kill_orphans,
+            )
+        except BaseException:
+            # The solution runs in its own session, so it doesn't get the terminal's Ctrl+C.
+            process.kill_tree()
+            raise
+        finally:
+            process.stop_monitoring()
+        return process.finish(process_exit, timeout_sec)
+
+    def wait_for_process(
+        self,
+        proc: subprocess.Popen,
+        deadline: float,
+        on_timeout: Callable[[], None],
+        before_reap: Callable[[], None] | None = None,
+    ) -> ProcessExit:
+        """
+        Wait for the process to exit and reap it.
+
+        Parameters
+        ----------
+        proc
+            The solution process.
+        deadline
+            The `time.monotonic()` time at which `on_timeout` is called if the
+            process is still running.
+        on_timeout
+            Callback that kills the process tree.
+        before_reap
+            Optional callback called once the process has exited, but before it's
+            reaped, so its pid can't have been reused yet. Not called on platforms
+            without `waitid(WNOWAIT)`.
+
+        Returns
+        -------
+        ProcessExit
+            The exit of the process. `proc.returncode` is set as well.
+        """
+        # The shared supervisor enforces the deadline while this thread blocks in `wait4`.
+        supervisor = get_process_supervisor()
+        watched_process = WatchedProcess(proc.pid, deadline=deadline, on_timeout=on_timeout)
+        supervisor.watch(watched_process)
+        try:
+            return _wait_for_process(proc, before_reap)
+        finally:
+            supervisor.unwatch(watched_process)
+
+
+@dataclass
+class ProcessExit:
+    """The exit of a reaped solution process."""
+
+    returncode: int | None
+    # The `time.monotonic_ns()` time at which the process was reaped.
+    end_time_ns: int
+    # The resource usage returned by `wait4`, which covers the process and all of
+    # its descendants that it has waited for. None where `wait4` isn't available.
+    rusage: resource.struct_rusage | None = None
+
 
+class SolutionProcess:
+    """
+    A solution process running with the time and memory limits of a test run.
+
+    Separates starting the process and evaluating its exit from waiting for it,
+    so that runners can wait for the process in different ways.
+    """
+
+    proc: subprocess.Popen
+
+    def __init__(
+        self,
+        testrun: TestRun,
+        cpu_time_limit_sec: float | None = None,
+        wall_time_limit_sec: float | None = None,
+    ) -> None:
+        self.testrun = testrun
+        self.cpu_time_limit_sec = cpu_time_limit_sec
+        self.wall_time_limit_sec = wall_time_limit_sec
         # Get memory limit from testrun (default 512 MB)
-        memory_limit_mb = testrun.memory_limit or 512
-        memory_limiter = create_memory_limiter(memory_limit_mb)
+        self.memory_limit_mb = testrun.memory_limit or 512
+        self.memory_limiter = create_memory_limiter(
+            self.memory_limit_mb, testrun.solution.problem.config.limits.use_memory_cgroup
+        )
+        self.timeout_occurred = threading.Event()
+        self.memory_exceeded = threading.Event()
+        self._kill_lock = threading.Lock()
+        self._process_killed = threading.Event()
+        self._start_time_ns = 0
+        self._cpu: int | None = None
 
-        def do_kill_process(process: psutil.Process) -> None:
-            with contextlib.suppress(psutil.NoSuchProcess):
-                process.kill()
-
-        def kill_process_tree() -> None:
-            # Use lock to prevent concurrent termination attempts.
-            with kill_lock:
-                if process_killed.is_set():
-                    return
-                process_killed.set()
-                with contextlib.suppress(psutil.NoSuchProcess):
-                    process = psutil.Process(proc.pid)
-                    for child_process in process.children(recursive=True):
-                        do_kill_process(child_process)
-                    do_kill_process(process)
-
-        def timeout_handler() -> None:
-            timeout_occurred.set()
-            kill_process_tree()
-
-        def memory_handler() -> None:
-            memory_exceeded.set()
-            kill_process_tree()
+    def start(self, cmd: Sequence[str]) -> None:
+        """
+        Start the process and the enforcement of its memory limit.
 
+        If the process can't be started, the resources held for it, such as the
+        cgroup of the run and its CPU core, are released before the error is raised.
+        """
+        try:
+            self._start(cmd)
+        except BaseException:
+            if hasattr(self, "proc"):
+                self.kill_tree()
+            self.stop_monitoring()
+            raise
+
+    def _start(self, cmd: Sequence[str]) -> None:
+        testrun = self.testrun
         assert testrun.stdout_filename is not None
         assert testrun.stderr_filename is not None
         with (
@@ -112,55 +232,315 @@ class SubprocessSolutionRunner(BaseSolutionRunner):
         ):
             testrun.record_lean_start_time()
 
-            # Use `preexec_fn` for Linux memory limits.
-            # Note: `preexec_fn` runs in the child after `fork` but before `exec`,
-            # and our threading only starts after `Popen` returns, so this is safe.
-            preexec_fn = memory_limiter.get_preexec_fn()
-
-            proc = subprocess.Popen(
-                cmd,
-                shell=False,
-                cwd=testrun.solution.root_dir,
-                stdout=stdout,
-                stderr=stderr,
-                preexec_fn=preexec_fn,  # noqa: PLW1509
+            # Linux memory and CPU time limits are applied without a `preexec_fn`,
+            # so that the process can be spawned with `vfork` or `posix_spawn`.
+            spawn_limits = _get_spawn_limits(self.memory_limiter, self.cpu_time_limit_sec)
+
+            # The process tree inherits the CPU affinity of the thread that spawns it.
+            # Without a core of its own, it runs on all CPUs of the grader.
+            self._acquire_cpu()
+            with pinned_to_cpu(self._cpu):
+                # The CPU time from `wait4` includes the spawn and the shell that applies
+                # the limits, so the wall clock starts before the spawn to cover them too.
+                self._start_time_ns = time.monotonic_ns()
+                self.proc = subprocess.Popen(
+                    get_spawn_command(cmd, spawn_limits),
+                    shell=False,
+                    cwd=testrun.work_dir or testrun.solution.root_dir,
+                    stdout=stdout,
+                    stderr=stderr,
+                    # The solution leads a new session and process group, so that its
+                    # whole process tree can be killed at once, even while it keeps forking.
+                    start_new_session=CAN_KILL_PROCESS_GROUPS,
+                )
+
+        # Attach Windows Job Object if applicable.
+        self.memory_limiter.attach_to_process(self.proc)
+
+        # Start memory monitoring (for polling-based enforcement).
+        self.memory_limiter.start_monitoring(self.proc, self.handle_memory_exceeded)
+
+    def kill_tree(self) -> None:
+        """Kill the process and all of its descendants, unless it has been reaped."""
+        # Use lock to prevent concurrent termination attempts.
+        with self._kill_lock:
+            if self._process_killed.is_set():
+                return
+            self._process_killed.set()
+            # A cgroup also holds the descendants that have left the process group.
+            if self.memory_limiter.kill_processes():
+                return
+            if CAN_KILL_PROCESS_GROUPS:
+                _kill_process_group(self.proc.pid)
+                return
+            with contextlib.suppress(psutil.NoSuchProcess):
+                process = psutil.Process(self.proc.pid)
+                for child_process in process.children(recursive=True):
+                    _kill_process(child_process)
+                _kill_process(process)
+
+    def kill_orphans(self) -> None:
+        """
+        Kill the processes that the solution has left running in its process group.
+
+        Must be called after the process has exited, but before it's reaped: the
+        exited process keeps its pid, which is also the id of its process group,
+        from being reused. Otherwise, orphaned children would keep competing for
+        the CPU with the test runs that follow. The orphans in a cgroup are killed
+        by the memory limiter when it stops monitoring.
+        """
+        if CAN_KILL_PROCESS_GROUPS:
+            _kill_process_group(self.proc.pid)
+
+    def handle_timeout(self) -> None:
+        """Kill the process tree because its deadline has expired."""
+        self.timeout_occurred.set()
+        self.kill_tree()
+
+    def handle_memory_exceeded(self) -> None:
+        """Kill the process tree because it has exceeded its memory limit."""
+        self.memory_exceeded.set()
+        self.kill_tree()
+
+    def stop_monitoring(self) -> None:
+        """Stop enforcing the limits, once the process has been reaped or abandoned."""
+        # The process is reaped, so its pid may be reused: never kill it from now on.
+        with self._kill_lock:
+            self._process_killed.set()
+        self.memory_limiter.stop_monitoring()
+        self._release_cpu()
+
+    def _acquire_cpu(self) -> None:
+        """Allocate a dedicated physical core to the process tree, if pinning is enabled."""
+        limits = self.testrun.solution.problem.config.limits
+        if not limits.pin_cpu_cores or not CAN_PIN_CPU_CORES:
+            return
+        # If all cores are busy, e.g. with more jobs than cores, the run is not pinned.
+        self._cpu = get_core_allocator().acquire(limits.reserve_judge_core)
+        self.testrun.cpu_core = self._cpu
+
+    def _release_cpu(self) -> None:
+        if self._cpu is not None:
+            get_core_allocator().release(self._cpu)
+            self._cpu = None
+
+    def finish(self, process_exit: ProcessExit, timeout_sec: float) -> int | None:
+        """
+        Record the resource usage of the reaped process and check it against the limits.
+
+        Returns
+        -------
+        int | None
+            Exit code on natural completion.
+
+        Raises
+        ------
+        SubprocessTimeoutError
+            If the timeout expired before completion, or the CPU or wall time limit was exceeded.
+        SubprocessMemoryLimitError
+            If the memory limit was exceeded.
+        """
+        testrun = self.testrun
+        proc = self.proc
+        _record_process_exit(testrun, self._start_time_ns, process_exit)
+        _record_peak_memory(testrun, self.memory_limiter, process_exit.rusage)
+
+        # Check for memory exceeded (check first since it may have triggered).
+        if self.memory_exceeded.is_set() or self.memory_limiter.was_limit_exceeded():
+            raise SubprocessMemoryLimitError(
+                message=f"Process #{proc.pid} killed: memory limit exceeded",
+                memory_limit_mb=self.memory_limit_mb,
+                peak_memory_mb=testrun.peak_memory_mb,
             )
 
-            # Attach Windows Job Object if applicable.
-            memory_limiter.attach_to_process(proc)
+        if self.timeout_occurred.is_set():
+            # Process killed by timer -> raise an exception.
+            testrun.data["killed_at_limit"] = True
+            raise SubprocessTimeoutError(
+                message=f"Process #{proc.pid} killed after {timeout_sec} seconds",
+                timeout=timeout_sec,
+                exit_code=proc.returncode,
+            )
 
-            # Start memory monitoring (for polling-based enforcement).
-            memory_limiter.start_monitoring(proc, memory_handler)
+        if _is_killed_by_cpu_time_limit(proc.returncode, self.cpu_time_limit_sec):
+            testrun.data["killed_at_limit"] = True
+        _check_cpu_time_limit(testrun, proc, self.cpu_time_limit_sec)
+        _check_wall_time_limit(testrun, proc, self.wall_time_limit_sec)
 
-            # Start timeout timer.
-            timer = threading.Timer(timeout_sec, timeout_handler)
-            timer.daemon = True
-            timer.start()
+        # Process completed naturally -> return the exit code.
+        return proc.returncode
 
-            try:
-                proc.communicate()
-            finally:
-                # Ensure cleanup always runs even if communicate() raises
-                timer.cancel()
-                memory_limiter.stop_monitoring()
 
-            testrun.record_lean_end_time()
+def get_time_limits(testrun: TestRun) -> tuple[float, float, float | None, float | None]:
+    """
+    Return the time limits of a test run.
 
-            # Check for memory exceeded (check first since it may have triggered).
-            if memory_exceeded.is_set():
-                raise SubprocessMemoryLimitError(
-                    message=f"Process #{proc.pid} killed: memory limit exceeded",
-                    memory_limit_mb=memory_limit_mb,
-                    peak_memory_mb=memory_limiter.get_peak_memory_mb(),
-                )
+    If borderline timeouts are re-run, a solution limited on wall time is only
+    killed `borderline_band` past its limit, and the limit is checked once it exits,
+    so that a run that exceeds the limit by a small margin can be told apart.
+
+    Returns
+    -------
+    tuple[float, float, float | None, float | None]
+        The adjusted time limit, the wall time timeout, the CPU time limit, and the
+        wall time limit checked after exit, in seconds.
+    """
+    limits = testrun.solution.problem.config.limits
+    time_limit = limits.time.get_for_language(testrun.solution.language)
+    adjusted_time_limit = time_limit * limits.time_limit_multiplier
+
+    # CPU time can't be measured everywhere, so fall back to wall time if needed.
+    if limits.time_limit_clock == "cpu" and CAN_MEASURE_CPU_TIME:
+        return (
+            adjusted_time_limit,
+            adjusted_time_limit * CPU_CLOCK_WALL_TIMEOUT_FACTOR,
+            adjusted_time_limit,
+            None,
+        )
+    if limits.borderline_reruns > 0:
+        return (
+            adjusted_time_limit,
+            adjusted_time_limit * (1 + limits.borderline_band),
+            None,
+            adjusted_time_limit,
+        )
+    return adjusted_time_limit, adjusted_time_limit, None, None
+
+
+def get_premature_termination_error(
+    error: SubprocessTimeoutError | SubprocessMemoryLimitError, time_limit: float
+) -> TestRunPrematureTerminationError:
+    """Convert a limit violation of a solution process into the result of its test run."""
+    if isinstance(error, SubprocessTimeoutError):
+        return TestRunPrematureTerminationError(TestRunTimeoutResult(time_limit))
+    return TestRunPrematureTerminationError(
+        TestRunMemoryExceededResult(
+            memory_limit_mb=error.memory_limit_mb,
+            peak_memory_mb=error.peak_memory_mb,
+        )
+    )
+
+
+def _kill_process(process: psutil.Process) -> None:
+    with contextlib.suppress(psutil.NoSuchProcess):
+        process.kill()
+
+
+def _kill_process_group(pgid: int) -> None:
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pgid, signal.SIGKILL)
+
+
+def _wait_for_process(
+    proc: subprocess.Popen, before_reap: Callable[[], None] | None = None
+) -> ProcessExit:
+    """Block until the process exits, call `before_reap`, and reap it."""
+    if CAN_MEASURE_CPU_TIME:
+        try:
+            if before_reap is not None and CAN_WAIT_WITHOUT_REAPING:
+                os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+                before_reap()
+            _, wait_status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            # Someone else has reaped the process already.
+            proc.wait()
+        else:
+            proc.returncode = os.waitstatus_to_exitcode(wait_status)
+            return ProcessExit(proc.returncode, time.monotonic_ns(), rusage)
+    else:
+        proc.wait()
+    return ProcessExit(proc.returncode, time.monotonic_ns())
+
+
+def _record_process_exit(testrun: TestRun, start_time_ns: int, process_exit: ProcessExit) -> None:
+    """Record the wall time and the CPU time of the process on the test run."""
+    testrun.wall_time_ns = process_exit.end_time_ns - start_time_ns
+    testrun.record_lean_end_time()
+    rusage = process_exit.rusage
+    if rusage is not None:
+        testrun.cpu_user_time_ns = _seconds_to_nanoseconds(rusage.ru_utime)
+        testrun.cpu_system_time_ns = _seconds_to_nanoseconds(rusage.ru_stime)
+
+
+def _record_peak_memory(
+    testrun: TestRun, memory_limiter: BaseMemoryLimiter, rusage: resource.struct_rusage | None
+) -> None:
+    """Record the peak memory of the process tree, as observed by the limiter or `wait4`."""
+    peaks = [memory_limiter.get_peak_memory_mb()]
+    if rusage is not None:
+        # A child inherits the memory high-water mark of the grader when it's forked,
+        # so `ru_maxrss` only reflects the solution if it exceeds the grader's own peak.
+        own_rusage = resource.getrusage(resource.RUSAGE_SELF)
+        if rusage.ru_maxrss > own_rusage.ru_maxrss:
+            peaks.append(_maxrss_to_megabytes(rusage.ru_maxrss))
+
+    observed_peaks = [peak for peak in peaks if peak is not None]
+    testrun.peak_memory_mb = max(observed_peaks) if observed_peaks else None
+
+
+def _maxrss_to_megabytes(maxrss: int) -> int:
+    # `ru_maxrss` is in bytes on macOS and in kilobytes elsewhere.
+    maxrss_bytes = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return math.ceil(maxrss_bytes / (1024 * 1024))
+
+
+def _check_cpu_time_limit(
+    testrun: TestRun, proc: subprocess.Popen, cpu_time_limit_sec: float | None
+) -> None:
+    """Raise `SubprocessTimeoutError` if the process tree used more CPU time than allowed."""
+    if cpu_time_limit_sec is None:
+        return
+    cpu_time_ms = testrun.get_cpu_time_milliseconds()
+    if cpu_time_ms is not None and cpu_time_ms > cpu_time_limit_sec * 1000:
+        raise SubprocessTimeoutError(
+            message=(
+                f"Process #{proc.pid} used {cpu_time_ms:.0f} ms of CPU time, "
+                f"exceeding the limit of {cpu_time_limit_sec} seconds"
+            ),
+            timeout=cpu_time_limit_sec,
+            exit_code=proc.returncode,
+        )
+
+
+def _is_killed_by_cpu_time_limit(returncode: int | None, cpu_time_limit_sec: float | None) -> bool:
+    """Return True if the process was killed by its `RLIMIT_CPU` limit (see `_get_spawn_limits`)."""
+    if cpu_time_limit_sec is None or returncode is None:
+        return False
+    # The soft limit sends `SIGXCPU`, and the hard limit `SIGKILL` if the process survives it.
+    return returncode in (-signal.SIGXCPU, -signal.SIGKILL)
+
+
+def _check_wall_time_limit(
+    testrun: TestRun, proc: subprocess.Popen, wall_time_limit_sec: float | None
+) -> None:
+    """Raise `SubprocessTimeoutError` if the process ran for longer than allowed."""
+    if wall_time_limit_sec is None:
+        return
+    wall_time_ms = testrun.get_wall_time_milliseconds()
+    if wall_time_ms is not None and wall_time_ms > wall_time_limit_sec * 1000:
+        raise SubprocessTimeoutError(
+            message=(
+                f"Process #{proc.pid} ran for {wall_time_ms:.0f} ms, "
+                f"exceeding the limit of {wall_time_limit_sec} seconds"
+            ),
+            timeout=wall_time_limit_sec,
+            exit_code=proc.returncode,
+        )
+
+
+def _get_spawn_limits(
+    memory_limiter: BaseMemoryLimiter, cpu_time_limit_sec: float | None
+) -> SpawnLimits:
+    """Combine the memory limiter's spawn limits with an optional `RLIMIT_CPU` limit."""
+    spawn_limits = memory_limiter.get_spawn_limits()
+    if cpu_time_limit_sec is not None:
+        # `RLIMIT_CPU` has a granularity of one second: the soft limit sends `SIGXCPU`,
+        # the hard limit a second later sends `SIGKILL`. The exact limit is checked after exit.
+        soft_limit = math.ceil(cpu_time_limit_sec)
+        spawn_limits.rlimits[resource.RLIMIT_CPU] = (soft_limit, soft_limit + 1)  # type: ignore[name-defined]
+    return spawn_limits
 
-            if timeout_occurred.is_set():
-                # Process killed by timer -> raise an exception.
-                raise SubprocessTimeoutError(
-                    message=f"Process #{proc.pid} killed after {timeout_sec} seconds",
-                    timeout=timeout_sec,
-                    exit_code=proc.returncode,
-                )
 
-            # Process completed naturally -> return the exit code.
-            return proc.returncode
+def _seconds_to_nanoseconds(seconds: float) -> int:
+    # `rusage` times have a microsecond resolution.
+    return round(seconds * 1_000_000) * 1000
@@ -0,0 +1,225 @@
+"""Centralized supervision of the deadlines and memory usage of running solutions."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+
+import psutil
+
+# Memory is sampled often while a run is young or close to its limit,
+# since short runs and fast allocations would otherwise go unnoticed...
+MIN_MEMORY_POLL_INTERVAL_SECONDS = 0.01
+# ...and less often for long runs that are well within their limits.
+MAX_MEMORY_POLL_INTERVAL_SECONDS = 0.1
+
+# How long a run is considered young.
+YOUNG_RUN_SECONDS = 1.0
+
+# The fraction of the memory limit above which a run is sampled at the highest rate.
+NEAR_MEMORY_LIMIT_RATIO = 0.75
+
+
+@dataclass(eq=False)
+class WatchedProcess:
+    """A process tree supervised by the `ProcessSupervisor`."""
+
+    pid: int
+    # Absolute `time.monotonic()` deadline, after which `on_timeout` is called.
+    deadline: float | None = None
+    on_timeout: Callable[[], None] | None = None
+    # Limit on the total resident memory of the process tree,
+    # above which `on_memory_exceeded` is called.
+    memory_limit_bytes: int | None = None
+    on_memory_exceeded: Callable[[], None] | None = None
+    # Track the peak memory of the process tree even if there is no limit to enforce.
+    track_memory: bool = False
+    # The peak memory observed so far: the larger of the total resident memory
+    # of the tree and the memory high-water mark of any of its processes.
+    peak_memory_bytes: int | None = None
+    start_time: float = field(default_factory=time.monotonic)
+    _last_memory_bytes: int = field(default=0, repr=False)
+    _fired: bool = field(default=False, repr=False)
+
+    def is_memory_watched(self) -> bool:
+        """Return True if the memory of the process tree needs to be sampled."""
+        return self.track_memory or self.memory_limit_bytes is not None
+
+
+class ProcessSupervisor:
+    """
+    Supervises all running solutions from a single background thread.
+
+    Each tick, the thread fires the callbacks of the expired deadlines and, if any
+    supervised run needs it, samples the memory of all supervised process trees in
+    one pass over the process table. The thread sleeps until the next deadline or
+    the next memory sample, whichever comes first, and memory is sampled more
+    often for young runs and runs close to their memory limit.
+
+    Callbacks are called from the supervisor thread, at most once per process,
+    and must not block.
+    """
+
+    def __init__(self) -> None:
+        self._watches: set[WatchedProcess] = set()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, watched_process: WatchedProcess) -> None:
+        """Start supervising a process tree."""
+        with self._condition:
+            self._watches.add(watched_process)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="process-supervisor", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def unwatch(self, watched_process: WatchedProcess) -> None:
+        """Stop supervising a process tree."""
+        with self._condition:
+            self._watches.discard(watched_process)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._watches:
+                    self._condition.wait()
+                watches = list(self._watches)
+
+            now = time.monotonic()
+            for watched_process in watches:
+                if watched_process.deadline is not None and watched_process.deadline <= now:
+                    _fire(watched_process, watched_process.on_timeout)
+
+            memory_watches = [w for w in watches if w.is_memory_watched() and not w._fired]
+            if memory_watches:
+                _sample_memory(memory_watches)
+
+            with self._condition:
+                self._condition.wait(self._get_sleep_time(watches, memory_watches))
+
+    @staticmethod
+    def _get_sleep_time(
+        watches: list[WatchedProcess], memory_watches: list[WatchedProcess]
+    ) -> float | None:
+        now = time.monotonic()
+        wake_times = [w.deadline for w in watches if w.deadline is not None and not w._fired]
+        if memory_watches:
+            wake_times.append(now + _get_memory_poll_interval(memory_watches, now))
+        if not wake_times:
+            return None
+        return max(0.0, min(wake_times) - now)
+
+
+# The supervisor thread is only started once the first process is watched.
+_supervisor = ProcessSupervisor()
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """Return the process supervisor shared by all runners."""
+    return _supervisor
+
+
+def _fire(watched_process: WatchedProcess, callback: Callable[[], None] | None) -> None:
+    if watched_process._fired or callback is None:
+        return
+    watched_process._fired = True
+    # A failing callback must not bring down the supervision of the other runs.
+    with contextlib.suppress(Exception):
+        callback()
+
+
+def _get_memory_poll_interval(memory_watches: list[WatchedProcess], now: float) -> float:
+    for watched_process in memory_watches:
+        if now - watched_process.start_time < YOUNG_RUN_SECONDS:
+            return MIN_MEMORY_POLL_INTERVAL_SECONDS
+        limit = watched_process.memory_limit_bytes
+        if (
+            limit is not None
+            and watched_process._last_memory_bytes > limit * NEAR_MEMORY_LIMIT_RATIO
+        ):
+            return MIN_MEMORY_POLL_INTERVAL_SECONDS
+    return MAX_MEMORY_POLL_INTERVAL_SECONDS
+
+
+def _sample_memory(memory_watches: list[WatchedProcess]) -> None:
+    """Sample the memory of the supervised process trees and enforce their limits."""
+    children_by_parent: dict[int, list[int]] = {}
+    for pid, parent_pid in _iter_parent_pids():
+        children_by_parent.setdefault(parent_pid, []).append(pid)
+
+    for watched_process in memory_watches:
+        tree_pids = _get_tree_pids(watched_process.pid, children_by_parent)
+        total_bytes = 0
+        peak_bytes = 0
+        for pid in tree_pids:
+            memory = _read_memory(pid)
+            if memory is not None:
+                total_bytes += memory[0]
+                peak_bytes = max(peak_bytes, memory[1])
+
+        watched_process._last_memory_bytes = total_bytes
+        peak_bytes = max(peak_bytes, total_bytes, watched_process.peak_memory_bytes or 0)
+        if peak_bytes > 0:
+            watched_process.peak_memory_bytes = peak_bytes
+
+        limit = watched_process.memory_limit_bytes
+        if limit is not None and total_bytes > limit:
+            _fire(watched_process, watched_process.on_memory_exceeded)
+
+
+def _get_tree_pids(root_pid: int, children_by_parent: dict[int, list[int]]) -> list[int]:
+    tree_pids = [root_pid]
+    for pid in tree_pids:
+        tree_pids.extend(children_by_parent.get(pid, []))
+    return tree_pids
+
+
+def _iter_parent_pids() -> Iterable[tuple[int, int]]:
+    """Yield the (pid, parent pid) pairs of all processes, in one pass over the process table."""
+    if sys.platform != "linux":
+        for process in psutil.process_iter(["ppid"]):
+            if process.info["ppid"] is not None:
+                yield process.pid, process.info["ppid"]
+        return
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        with contextlib.suppress(OSError, ValueError, IndexError):
+            with open(f"/proc/{entry}/stat", "rb") as stat_file:
+                stat = stat_file.read()
+            # The command name may contain spaces and parentheses, so parse from the last ')'.
+            yield int(entry), int(stat[stat.rindex(b")") + 2 :].split()[1])
+
+
+def _read_memory(pid: int) -> tuple[int, int] | None:
+    """Return the resident memory and the memory high-water mark of a process, in bytes."""
+    if sys.platform != "linux":
+        try:
+            memory_info = psutil.Process(pid).memory_info()
+        except psutil.Error:
+            return None
+        # Only Windows reports the peak working set.
+        return memory_info.rss, getattr(memory_info, "peak_wset", memory_info.rss)
+
+    rss_kb = peak_kb = 0
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                elif line.startswith("VmHWM:"):
+                    peak_kb = int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return rss_kb * 1024, peak_kb * 1024
@@ -0,0 +1,78 @@
+"""Conversion of test run outcomes to and from JSON-compatible dictionaries."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunResult
+
+# The TestRun fields that describe the outcome of a run, as opposed to its identity.
+TESTRUN_OUTCOME_FIELDS = [
+    "memory_limit",
+    "time_limit",
+    "judge_start_time",
+    "judge_end_time",
+    "lean_start_time",
+    "lean_end_time",
+    "wall_time_ns",
+    "cpu_user_time_ns",
+    "cpu_system_time_ns",
+    "peak_memory_mb",
+    "cpu_core",
+]
+
+
+def get_result_types() -> dict[str, type[TestRunResult]]:
+    """Return all known test run result classes by name."""
+    result_types: dict[str, type[TestRunResult]] = {}
+    pending = list(TestRunResult.__subclasses__())
+    while pending:
+        result_type = pending.pop()
+        result_types[result_type.__name__] = result_type
+        pending.extend(result_type.__subclasses__())
+    return result_types
+
+
+def result_to_dict(result: TestRunResult) -> dict[str, Any]:
+    """Convert a test run result to a dictionary."""
+    return {"type": type(result).__name__, **dataclasses.asdict(result)}
+
+
+def result_from_dict(data: dict[str, Any]) -> TestRunResult:
+    """
+    Re-create a test run result from a dictionary created by `result_to_dict`.
+
+    Raises
+    ------
+    ValueError
+        If the result type is unknown.
+    """
+    result_type = get_result_types().get(data["type"])
+    if result_type is None:
+        raise ValueError(f"Unknown test run result type '{data['type']}'")
+
+    init_values = {
+        result_field.name: data[result_field.name]
+        for result_field in dataclasses.fields(result_type)
+        if result_field.init and result_field.name in data
+    }
+    return result_type(**init_values)
+
+
+def testrun_outcome_to_dict(testrun: TestRun) -> dict[str, Any]:
+    """Convert the outcome of a test run (result, limits, timings and data) to a dictionary."""
+    outcome: dict[str, Any] = {name: getattr(testrun, name) for name in TESTRUN_OUTCOME_FIELDS}
+    outcome["result"] = result_to_dict(testrun.result) if testrun.result is not None else None
+    outcome["data"] = dict(testrun.data)
+    return outcome
+
+
+def apply_testrun_outcome(testrun: TestRun, outcome: dict[str, Any]) -> None:
+    """Restore the outcome of a test run from a dictionary created by `testrun_outcome_to_dict`."""
+    for name in TESTRUN_OUTCOME_FIELDS:
+        setattr(testrun, name, outcome.get(name))
+    result = outcome.get("result")
+    testrun.result = result_from_dict(result) if result is not None else None
+    testrun.data.update(outcome.get("data") or {})
@@ -0,0 +1,102 @@
+"""Statistics of the time measurements of test runs."""
+
+from __future__ import annotations
+
+import math
+import statistics
+from typing import Any
+
+from hammurabi.grader.model import JUDGE_PHASES
+from hammurabi.grader.model import TestRun
+
+# The confidence level of the interval reported for the median time.
+MEDIAN_CONFIDENCE = 0.95
+
+
+def summarize_time_samples(
+    samples_ns: list[int], confidence: float = MEDIAN_CONFIDENCE
+) -> dict[str, Any]:
+    """
+    Return robust statistics of the time samples of a test run.
+
+    Parameters
+    ----------
+    samples_ns
+        The times of the runs of the solution, in nanoseconds. Must not be empty.
+    confidence
+        The confidence level of the interval of the median.
+
+    Returns
+    -------
+    dict[str, Any]
+        The samples, their median, median absolute deviation (MAD) and minimum,
+        and a confidence interval of the median, in nanoseconds, along with the
+        confidence level of the interval.
+    """
+    ordered_samples = sorted(samples_ns)
+    median = statistics.median(ordered_samples)
+    ci_low, ci_high = get_median_confidence_interval(ordered_samples, confidence)
+    return {
+        "samples_ns": list(samples_ns),
+        "median_ns": round(median),
+        "mad_ns": round(statistics.median(abs(sample - median) for sample in ordered_samples)),
+        "min_ns": ordered_samples[0],
+        "ci_low_ns": ci_low,
+        "ci_high_ns": ci_high,
+        "confidence": confidence,
+    }
+
+
+def get_median_confidence_interval(
+    ordered_samples: list[int], confidence: float = MEDIAN_CONFIDENCE
+) -> tuple[int, int]:
+    """
+    Return a confidence interval of the median of sorted samples.
+
+    The interval from the k-th smallest to the k-th largest sample contains the
+    median with a probability given by the binomial distribution, whatever the
+    distribution of the samples. The narrowest such interval that reaches the
+    confidence level is returned, or the whole range of the samples if there are
+    too few of them to reach it.
+    """
+    sample_count = len(ordered_samples)
+
+    def get_coverage(k: int) -> float:
+        outside = sum(math.comb(sample_count, i) for i in range(k))
+        return 1 - 2 * outside / 2**sample_count
+
+    k = 1
+    while k + 1 <= (sample_count + 1) // 2 and get_coverage(k + 1) >= confidence:
+        k += 1
+    return ordered_samples[k - 1], ordered_samples[sample_count - k]
+
+
+def get_percentile(ordered_values: list[int], fraction: float) -> int:
+    """Return the nearest-rank percentile of sorted values, with the fraction between 0 and 1."""
+    rank = max(math.ceil(fraction * len(ordered_values)), 1)
+    return ordered_values[rank - 1]
+
+
+def summarize_phase_times(testruns: list[TestRun]) -> dict[str, tuple[int, int]]:
+    """
+    Return the median and 95th percentile time of each judging phase of the test runs.
+
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        The median and 95th percentile time in nanoseconds, by phase, in the order
+        of `JUDGE_PHASES`. Phases that none of the test runs went through are left out.
+    """
+    summary: dict[str, tuple[int, int]] = {}
+    for phase in JUDGE_PHASES:
+        ordered_times_ns = sorted(
+            time_ns
+            for testrun in testruns
+            if (time_ns := testrun.get_phase_time_ns(phase)) is not None
+        )
+        if ordered_times_ns:
+            summary[phase] = (
+                get_percentile(ordered_times_ns, 0.5),
+                get_percentile(ordered_times_ns, 0.95),
+            )
+    return summary
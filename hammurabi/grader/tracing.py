@@ -0,0 +1,114 @@
+"""Spans of a grading run in the Trace Event Format, for viewing it in a trace viewer."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+
+class Tracer:
+    """
+    Collects the spans of a grading run and writes them as a trace file.
+
+    Each thread that records a span gets a track of its own, named after the thread,
+    so the compile and run workers show up side by side. The file can be opened in
+    chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self) -> None:
+        self._start_ns = time.monotonic_ns()
+        self._events: list[dict[str, Any]] = []
+        self._thread_names: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """Record the block as a span on the track of the calling thread."""
+        start_ns = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start_ns, time.monotonic_ns(), args)
+
+    def add_span(
+        self, name: str, category: str, start_ns: int, end_ns: int, args: dict[str, Any]
+    ) -> None:
+        """Record a span of the calling thread between two `time.monotonic_ns` timestamps."""
+        thread_id = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self._start_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread_id,
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._thread_names.setdefault(thread_id, threading.current_thread().name)
+
+    def get_events(self) -> list[dict[str, Any]]:
+        """Return the trace events: the names of the tracks, followed by the spans."""
+        with self._lock:
+            thread_name_events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+                for thread_id, thread_name in self._thread_names.items()
+            ]
+            return thread_name_events + list(self._events)
+
+    def write(self, filename: str | Path) -> None:
+        """Write the trace to a JSON file in the Trace Event Format."""
+        with open(filename, "w") as trace_file:
+            json.dump({"traceEvents": self.get_events(), "displayTimeUnit": "ms"}, trace_file)
+
+
+# The tracer of the grading run in progress, if it's being traced.
+_active_tracer: Tracer | None = None
+
+
+@contextlib.contextmanager
+def tracing_to(filename: str | None) -> Iterator[Tracer | None]:
+    """
+    Trace the spans recorded within the block, and write them to a file on exit.
+
+    If the filename is None, nothing is traced. The trace is written even if the
+    block is interrupted, so it covers the part of the grading run that finished.
+    """
+    global _active_tracer  # noqa: PLW0603 - The grading run in progress is process-wide.
+    if filename is None:
+        yield None
+        return
+
+    tracer = Tracer()
+    _active_tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _active_tracer = None
+        tracer.write(filename)
+
+
+@contextlib.contextmanager
+def span(name: str, category: str, **args: Any) -> Iterator[None]:
+    """Record the block as a span of the grading run, if it's being traced."""
+    tracer = _active_tracer
+    if tracer is None:
+        yield
+        return
+
+    with tracer.span(name, category, **args):
+        yield
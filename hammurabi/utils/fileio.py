@@ -1,6 +1,19 @@
 """File I/O utilities."""
 
+import hashlib
+import os
 import re
+import shutil
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+# The `fcntl` module is only available on Unix-like systems.
+if sys.platform != "win32":
+    import fcntl
+
+# The `FICLONE` ioctl request code from `linux/fs.h`.
+LINUX_FICLONE = 0x40049409
 
 
 def read_entire_file(filename: str) -> str:
@@ -41,3 +54,106 @@ def grep_value_from_file(filename: str, regex_pattern: str, group_num: int = 0)
                 return match.group(group_num)
 
     return None
+
+
+def hash_file(filename: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    hasher = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def walk_files(root_dir: str | Path) -> Iterator[Path]:
+    """Yield all regular files under a directory, skipping symlinks."""
+    for current_dir, _dirnames, filenames in os.walk(root_dir):
+        for filename in filenames:
+            file_path = Path(current_dir) / filename
+            if not file_path.is_symlink():
+                yield file_path
+
+
+def clone_file(source: str | Path, target: str | Path, allow_hard_link: bool = True) -> None:
+    """
+    Make `target` a cheap replica of the `source` file.
+
+    The cheapest mechanism the filesystem supports is used: a copy-on-write reflink,
+    then a hard link, and finally a regular copy. Note that a hard-linked target
+    shares its content with the source, so it must be treated as read-only.
+
+    Parameters
+    ----------
+    source
+        Path to the existing file.
+    target
+        Path of the replica to create. Must not exist yet.
+    allow_hard_link
+        Set to False if the replica must be independent of the source file.
+    """
+    if _try_reflink(source, target):
+        return
+
+    if allow_hard_link:
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(source, target)
+
+
+def clone_tree(
+    source_dir: str | Path, target_dir: str | Path, allow_hard_link: bool = True
+) -> None:
+    """
+    Replicate a directory tree using `clone_file` for every file.
+
+    Parameters
+    ----------
+    source_dir
+        The directory to replicate.
+    target_dir
+        The directory to create. Its parent directories are created as needed.
+    allow_hard_link
+        Set to False if the replicated files must be independent of the source files.
+    """
+    source_path = Path(source_dir)
+    target_path = Path(target_dir)
+    target_path.mkdir(parents=True, exist_ok=True)
+
+    for current_dir, dirnames, filenames in os.walk(source_path):
+        relative_dir = Path(current_dir).relative_to(source_path)
+        for dirname in dirnames:
+            (target_path / relative_dir / dirname).mkdir(exist_ok=True)
+        for filename in filenames:
+            clone_file(
+                Path(current_dir) / filename,
+                target_path / relative_dir / filename,
+                allow_hard_link=allow_hard_link,
+            )
+
+
+def _try_reflink(source: str | Path, target: str | Path) -> bool:
+    """Try to create a copy-on-write clone of a file. Return True on success."""
+    if sys.platform != "linux":
+        return False
+
+    try:
+        with open(source, "rb") as source_file, open(target, "xb") as target_file:
+            try:
+                fcntl.ioctl(target_file.fileno(), LINUX_FICLONE, source_file.fileno())
+            except OSError:
+                reflinked = False
+            else:
+                reflinked = True
+    except OSError:
+        return False
+
+    if not reflinked:
+        os.unlink(target)
+        return False
+
+    shutil.copystat(source, target)
+    return True
@@ -0,0 +1,226 @@
+"""Tests for the base solution adapter."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from hammurabi.exceptions import TestRunPrematureTerminationError
+from hammurabi.grader.adapters.base import BaseSolutionAdapter
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCompilationErrorResult
+from hammurabi.grader.model import TestRunInternalErrorResult
+
+
+class CountingCompilerAdapter(BaseSolutionAdapter):
+    """Adapter whose 'compiler' appends a line to a file on every invocation."""
+
+    counter_filename: str
+    compiler_exit_code: int = 0
+    compiler_executable: str = sys.executable
+
+    def get_preferred_extensions(self) -> list[str]:
+        return [".src"]
+
+    def get_compile_command_line(self, testrun: TestRun) -> list[str]:
+        script = (
+            f"open({self.counter_filename!r}, 'a').write('compiled\\n'); "
+            f"print('compiler says hi'); "
+            f"raise SystemExit({self.compiler_exit_code})"
+        )
+        return [self.compiler_executable, "-c", script]
+
+    def get_run_command_line(self, testrun: TestRun) -> list[str]:
+        script = "open('problem.out', 'w').write(open('problem.in').read())"
+        return [sys.executable, "-c", script]
+
+
+@pytest.fixture
+def problem(tmp_path: Path) -> Problem:
+    """Create a problem with three test cases."""
+    problem = Problem(name="problem", root_dir=str(tmp_path))
+    problem.config = ProblemConfig()
+    problem.config.report_output_dir = str(tmp_path / "reports")
+    problem.input_filename = "problem.in"
+    problem.output_filename = "problem.out"
+
+    testcase_dir = tmp_path / "testcases"
+    testcase_dir.mkdir()
+    for name in ["01", "02", "03"]:
+        (testcase_dir / f"{name}.in").write_text(name)
+        problem.testcases.append(
+            TestCase(problem, name, str(testcase_dir / f"{name}.in"), str(tmp_path / "x.out"))
+        )
+    return problem
+
+
+@pytest.fixture
+def adapter(problem: Problem, tmp_path: Path) -> CountingCompilerAdapter:
+    """Create an adapter for a single-file solution."""
+    solution_dir = tmp_path / "solutions" / "alice"
+    solution_dir.mkdir(parents=True)
+    source_file = solution_dir / "problem.src"
+    source_file.write_text("source")
+
+    solution = Solution(problem, "alice", str(solution_dir), files=[str(source_file)])
+    adapter = CountingCompilerAdapter(solution)
+    adapter.counter_filename = str(tmp_path / "compile_count.txt")
+    adapter.prepare()
+    return adapter
+
+
+def compile_count(adapter: CountingCompilerAdapter) -> int:
+    path = Path(adapter.counter_filename)
+    return len(path.read_text().splitlines()) if path.exists() else 0
+
+
+class TestCompilationMemoization:
+    """Tests for compiling a solution only once."""
+
+    def test_successful_compilation_runs_once(self, adapter, problem):
+        for testcase in problem.testcases:
+            testrun = adapter.create_testrun(testcase)
+            adapter.run(testrun)
+            assert testrun.answer_filename is not None
+            assert Path(testrun.answer_filename).read_text() == testcase.name
+
+        assert compile_count(adapter) == 1
+
+    def test_compilation_error_is_replayed_without_recompiling(self, adapter, problem):
+        adapter.compiler_exit_code = 1
+
+        results = []
+        for testcase in problem.testcases:
+            testrun = adapter.create_testrun(testcase)
+            with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+                adapter.run(testrun)
+            results.append(exc_info.value.result)
+
+        assert compile_count(adapter) == 1
+        assert all(isinstance(result, TestRunCompilationErrorResult) for result in results)
+        assert all("compiler says hi" in (result.message or "") for result in results)
+
+    def test_missing_compiler_is_replayed_without_recompiling(
+        self, adapter, problem, tmp_path, monkeypatch
+    ):
+        adapter.compiler_executable = str(tmp_path / "missing-compiler")
+        compiler_calls = []
+        original_call = subprocess.call
+
+        def counting_call(*args, **kwargs):
+            compiler_calls.append(args)
+            return original_call(*args, **kwargs)
+
+        monkeypatch.setattr(subprocess, "call", counting_call)
+
+        with pytest.raises(FileNotFoundError):
+            adapter.run(adapter.create_testrun(problem.testcases[0]))
+        results = []
+        for testcase in problem.testcases[1:]:
+            with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+                adapter.run(adapter.create_testrun(testcase))
+            results.append(exc_info.value.result)
+
+        assert len(compiler_calls) == 1
+        assert all(isinstance(result, TestRunInternalErrorResult) for result in results)
+        assert all("FileNotFoundError" in (result.exception_info or "") for result in results)
+
+    def test_replayed_compilation_errors_are_separate_objects(self, adapter, problem):
+        adapter.compiler_exit_code = 1
+
+        results = []
+        for testcase in problem.testcases[:2]:
+            with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+                adapter.run(adapter.create_testrun(testcase))
+            results.append(exc_info.value.result)
+
+        assert results[0] is not results[1]
+
+    def test_all_testruns_point_to_the_single_compiler_log(self, adapter, problem):
+        adapter.compiler_exit_code = 1
+
+        testruns = [adapter.create_testrun(testcase) for testcase in problem.testcases]
+        for testrun in testruns:
+            with pytest.raises(TestRunPrematureTerminationError):
+                adapter.run(testrun)
+
+        log_filenames = {testrun.compiler_output_filename for testrun in testruns}
+        assert len(log_filenames) == 1
+        log_filename = log_filenames.pop()
+        assert log_filename is not None
+        assert Path(log_filename).exists()
+
+
+class TestSolutionDigest:
+    def test_digest_is_none_before_compilation(self, adapter: CountingCompilerAdapter):
+        assert adapter.get_solution_digest() is None
+
+    def test_digest_covers_compiled_artifacts(self, adapter: CountingCompilerAdapter):
+        testcase = adapter._require_solution().problem.testcases[0]
+        adapter.precompile(testcase)
+        digest = adapter.get_solution_digest()
+
+        other = CountingCompilerAdapter(adapter.solution)
+        other.counter_filename = adapter.counter_filename
+        root_dir = Path(adapter._require_solution().root_dir or "")
+        (root_dir / "problem.bin").write_bytes(b"artifact")
+        other.precompile(testcase)
+
+        assert digest is not None
+        assert other.get_solution_digest() not in (None, digest)
+
+    def test_digest_ignores_problem_input_and_output(self, adapter: CountingCompilerAdapter):
+        testcase = adapter._require_solution().problem.testcases[0]
+        adapter.precompile(testcase)
+        digest = adapter.get_solution_digest()
+
+        other = CountingCompilerAdapter(adapter.solution)
+        other.counter_filename = adapter.counter_filename
+        root_dir = Path(adapter._require_solution().root_dir or "")
+        (root_dir / "problem.in").write_text("stale input")
+        (root_dir / "problem.out").write_text("stale output")
+        other.precompile(testcase)
+
+        assert other.get_solution_digest() == digest
+
+
+class TestWorkDir:
+    """Tests for the private working directory of a test run."""
+
+    def test_writes_in_work_dir_do_not_reach_original_files(
+        self, adapter: CountingCompilerAdapter, problem: Problem
+    ):
+        testcase = problem.testcases[0]
+        testrun = adapter.create_testrun(testcase)
+        solution_root_dir = adapter.solution.root_dir
+        assert solution_root_dir is not None
+
+        adapter.create_work_dir(testrun)
+        adapter.supply_testcase(testrun)
+        work_dir = adapter.get_work_dir(testrun)
+        (work_dir / "problem.in").write_text("overwritten")
+        (work_dir / "problem.src").write_text("overwritten")
+
+        assert Path(testcase.input_filename).read_text() == "01"
+        assert (Path(solution_root_dir) / "problem.src").read_text() == "source"
+        adapter.remove_work_dir(testrun)
+
+
+class TestCreateTestrun:
+    def test_later_attempts_keep_their_own_output_files(
+        self, adapter: CountingCompilerAdapter, problem: Problem
+    ):
+        first = adapter.create_testrun(problem.testcases[0])
+        second = adapter.create_testrun(problem.testcases[0], attempt=2)
+
+        assert Path(first.answer_filename or "").name == "01.out"
+        assert Path(second.answer_filename or "").name == "01.attempt2.out"
+        assert Path(second.stdout_filename or "").name == "01.attempt2.stdout"
+        assert second.compiler_output_filename == first.compiler_output_filename
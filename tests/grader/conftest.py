@@ -4,11 +4,19 @@ from __future__ import annotations
 
 import platform
 import shutil
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 import pytest
 import yaml
 
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+
 
 def generate_hammurabi_environment(
     tmpdir: pytest.TempdirFactory, template_problem_dir: str
@@ -65,3 +73,62 @@ def grader_language_test_environment(tmpdir: pytest.TempdirFactory) -> tuple[str
 def grader_verification_test_environment(tmpdir: pytest.TempdirFactory) -> tuple[str, str, str]:
     """Create test environment for verification tests."""
     return generate_hammurabi_environment(tmpdir, "fixtures/problems_for_verification_tests")
+
+
+@pytest.fixture
+def problem(tmp_path: Path) -> Problem:
+    """Create a problem with two test cases, worth 10 and 20 points, in a temporary directory."""
+    problem = Problem(name="problem", root_dir=str(tmp_path))
+    problem.config = ProblemConfig()
+    for index, name in enumerate(["01", "02"], start=1):
+        problem.testcases.append(
+            TestCase(
+                problem,
+                name,
+                str(tmp_path / f"{name}.in"),
+                str(tmp_path / f"{name}.out"),
+                score=index * 10,
+            )
+        )
+    return problem
+
+
+@pytest.fixture
+def make_testrun(tmp_path: Path) -> Callable[..., TestRun]:
+    """
+    Return a factory of test runs of a problem.
+
+    The factory takes the problem, the author of the solution and the index of
+    the test case, and creates a solution of that author unless one is passed
+    as `solution`. The output files of the run are placed in a temporary report
+    directory of the author. Other keyword arguments are set on the test run.
+    """
+
+    def make(
+        problem: Problem,
+        author: str = "alice",
+        testcase_index: int = 0,
+        *,
+        solution: Solution | None = None,
+        language: str | None = None,
+        **fields: Any,
+    ) -> TestRun:
+        if solution is None:
+            solution_dir = tmp_path / "solutions" / author
+            solution_dir.mkdir(parents=True, exist_ok=True)
+            solution = Solution(problem, author, str(solution_dir), language=language)
+        testcase = problem.testcases[testcase_index]
+        output_dir = tmp_path / "reports" / solution.author
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return TestRun(
+            solution=solution,
+            testcase=testcase,
+            output_dir=str(output_dir),
+            answer_filename=str(output_dir / f"{testcase.name}.out"),
+            compiler_output_filename=None,
+            stdout_filename=str(output_dir / f"{testcase.name}.stdout"),
+            stderr_filename=str(output_dir / f"{testcase.name}.stderr"),
+            **fields,
+        )
+
+    return make
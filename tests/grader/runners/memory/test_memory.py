@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import os
 import platform
+import shutil
 import subprocess
 import sys
 import threading
@@ -19,10 +21,14 @@ from hammurabi.grader.model import Solution
 from hammurabi.grader.model import TestCase
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunMemoryExceededResult
+from hammurabi.grader.runners import subproc
 from hammurabi.grader.runners.memory import BaseMemoryLimiter
+from hammurabi.grader.runners.memory import cgroup
 from hammurabi.grader.runners.memory import create_memory_limiter
+from hammurabi.grader.runners.memory.cgroup import CgroupMemoryLimiter
 from hammurabi.grader.runners.memory.fallback import PollingMemoryLimiter
 from hammurabi.grader.runners.subproc import SubprocessSolutionRunner
+from hammurabi.grader.runners.supervisor import get_process_supervisor
 
 
 @pytest.fixture
@@ -100,6 +106,44 @@ class TestCreateMemoryLimiter:
         """Should create LinuxMemoryLimiter on Linux."""
         monkeypatch.setattr(platform, "system", lambda: "Linux")
 
+        limiter = create_memory_limiter(512, use_cgroup=False)
+
+        from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
+
+        assert isinstance(limiter, LinuxMemoryLimiter)
+
+    def test_creates_cgroup_limiter_with_delegated_cgroup(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ):
+        """Should create CgroupMemoryLimiter on Linux when a delegated cgroup is available."""
+        monkeypatch.setattr(platform, "system", lambda: "Linux")
+        monkeypatch.setattr(cgroup, "find_delegated_cgroup", lambda: tmp_path)
+
+        limiter = create_memory_limiter(512)
+
+        assert isinstance(limiter, CgroupMemoryLimiter)
+        assert limiter.cgroup_dir.parent == tmp_path
+
+    def test_falls_back_to_linux_limiter_without_delegated_cgroup(
+        self, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Should fall back to LinuxMemoryLimiter when no delegated cgroup is available."""
+        monkeypatch.setattr(platform, "system", lambda: "Linux")
+        monkeypatch.setattr(cgroup, "find_delegated_cgroup", lambda: None)
+
+        limiter = create_memory_limiter(512)
+
+        from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
+
+        assert isinstance(limiter, LinuxMemoryLimiter)
+
+    def test_falls_back_to_linux_limiter_if_cgroup_creation_fails(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ):
+        """Should fall back to LinuxMemoryLimiter when the cgroup of the run can't be created."""
+        monkeypatch.setattr(platform, "system", lambda: "Linux")
+        monkeypatch.setattr(cgroup, "find_delegated_cgroup", lambda: tmp_path / "missing")
+
         limiter = create_memory_limiter(512)
 
         from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
@@ -196,8 +240,8 @@ class TestPollingMemoryLimiter:
 
         assert callback_called.is_set(), "Memory exceeded callback was not called"
 
-    def test_stop_monitoring_stops_thread(self):
-        """stop_monitoring should stop the monitoring thread."""
+    def test_stop_monitoring_stops_supervision(self):
+        """stop_monitoring should remove the process from the supervisor."""
         limiter = PollingMemoryLimiter(1024)
 
         proc = subprocess.Popen(
@@ -208,16 +252,18 @@ class TestPollingMemoryLimiter:
 
         limiter.start_monitoring(proc, lambda: None)
 
-        # Monitoring thread should be running
-        assert limiter._monitor_thread is not None
-        assert limiter._monitor_thread.is_alive()
+        # The process should be supervised
+        watched_process = limiter._watched_process
+        assert watched_process is not None
+        assert watched_process in get_process_supervisor()._watches
 
         limiter.stop_monitoring()
         proc.kill()
         proc.wait()
 
-        # Thread should have stopped
-        assert limiter._monitor_thread is None or not limiter._monitor_thread.is_alive()
+        # The process should no longer be supervised
+        assert limiter._watched_process is None
+        assert watched_process not in get_process_supervisor()._watches
 
     def test_get_peak_memory_mb_returns_tracked_value(self):
         """get_peak_memory_mb should return the tracked peak memory."""
@@ -256,18 +302,30 @@ class TestLinuxMemoryLimiter:
         # Should not raise
         limiter.attach_to_process(mock_proc)
 
-    def test_start_monitoring_is_noop(self):
-        """start_monitoring should be a no-op on Linux."""
+    @pytest.mark.skipif(platform.system() != "Linux", reason="Linux-only test")
+    def test_start_monitoring_tracks_peak_memory(self):
+        """start_monitoring should track the peak resident memory of the process."""
         from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
 
-        limiter = LinuxMemoryLimiter(512)
-        mock_proc = mock.MagicMock(spec=subprocess.Popen)
+        limiter = LinuxMemoryLimiter(1024)
+        callback_called = threading.Event()
 
-        # Should not raise
-        limiter.start_monitoring(mock_proc, lambda: None)
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "x = bytearray(64 * 1024 * 1024); import time; time.sleep(0.3)"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        limiter.start_monitoring(proc, callback_called.set)
+        proc.wait()
+        limiter.stop_monitoring()
 
-    def test_stop_monitoring_is_noop(self):
-        """stop_monitoring should be a no-op on Linux."""
+        assert limiter.peak_memory_mb is not None
+        assert limiter.peak_memory_mb >= 64
+        assert not callback_called.is_set()
+
+    def test_stop_monitoring_without_start_is_safe(self):
+        """stop_monitoring should be safe to call without starting."""
         from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
 
         limiter = LinuxMemoryLimiter(512)
@@ -277,21 +335,96 @@ class TestLinuxMemoryLimiter:
 
     def test_preexec_fn_sets_rlimit(self):
         """preexec_fn should set RLIMIT_AS on Linux."""
-        import resource  # noqa: PLC0415
-
         from hammurabi.grader.runners.memory.linux import LinuxMemoryLimiter  # noqa: PLC0415
 
         limiter = LinuxMemoryLimiter(512)
         preexec_fn = limiter.get_preexec_fn()
 
-        # Call the preexec_fn
-        preexec_fn()
+        # Call the preexec_fn in a child, so the limit doesn't leak into the test process
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import resource; print(resource.getrlimit(resource.RLIMIT_AS))",
+            ],
+            capture_output=True,
+            text=True,
+            preexec_fn=preexec_fn,  # noqa: PLW1509
+            check=True,
+        )
 
         # Check that limit was set
-        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
         expected = 512 * 1024 * 1024
-        assert soft == expected
-        assert hard == expected
+        assert proc.stdout.strip() == f"({expected}, {expected})"
+
+
+class TestCgroupMemoryLimiter:
+    """Tests for the CgroupMemoryLimiter class, using a directory in place of a cgroup."""
+
+    @pytest.fixture(autouse=True)
+    def no_removal_wait(self, monkeypatch: pytest.MonkeyPatch):
+        # A plain directory with files can't be removed like a cgroup, so don't wait for it.
+        monkeypatch.setattr(cgroup, "CGROUP_REMOVAL_TIMEOUT_SECONDS", 0)
+
+    def test_creates_cgroup_with_memory_limit(self, tmp_path: Path):
+        """Should create the cgroup of the run and set memory.max."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+
+        assert limiter.cgroup_dir.parent == tmp_path
+        assert (limiter.cgroup_dir / "memory.max").read_text() == str(64 * 1024 * 1024)
+
+    def test_preexec_fn_joins_cgroup(self, tmp_path: Path):
+        """preexec_fn should write the pid of the process to cgroup.procs."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+
+        limiter.get_preexec_fn()()
+
+        assert (limiter.cgroup_dir / "cgroup.procs").read_text() == str(os.getpid())
+
+    def test_stop_monitoring_reads_peak_memory(self, tmp_path: Path):
+        """stop_monitoring should report memory.peak, rounded up to megabytes."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+        (limiter.cgroup_dir / "memory.peak").write_text(f"{10 * 1024 * 1024 + 1}\n")
+
+        limiter.stop_monitoring()
+
+        assert limiter.get_peak_memory_mb() == 11
+        assert not limiter.was_limit_exceeded()
+
+    def test_stop_monitoring_detects_oom_kill(self, tmp_path: Path):
+        """stop_monitoring should detect OOM kills from memory.events."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+        (limiter.cgroup_dir / "memory.events").write_text(
+            "low 0\nhigh 0\nmax 12\noom 1\noom_kill 1\noom_group_kill 0\n"
+        )
+
+        limiter.stop_monitoring()
+
+        assert limiter.was_limit_exceeded()
+
+    def test_stop_monitoring_removes_empty_cgroup(self, tmp_path: Path):
+        """stop_monitoring should remove the cgroup of the run."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+        (limiter.cgroup_dir / "memory.max").unlink()
+
+        limiter.stop_monitoring()
+
+        assert not limiter.cgroup_dir.exists()
+
+    def test_kill_processes_writes_cgroup_kill(self, tmp_path: Path):
+        """kill_processes should kill the whole cgroup through cgroup.kill."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+        (limiter.cgroup_dir / "cgroup.kill").write_text("0")
+
+        assert limiter.kill_processes()
+        assert (limiter.cgroup_dir / "cgroup.kill").read_text() == "1"
+
+    def test_kill_processes_fails_without_cgroup(self, tmp_path: Path):
+        """kill_processes should return False if the cgroup can't be accessed."""
+        limiter = CgroupMemoryLimiter(64, tmp_path)
+        shutil.rmtree(limiter.cgroup_dir)
+
+        assert not limiter.kill_processes()
 
 
 class TestWindowsMemoryLimiter:
@@ -367,6 +500,43 @@ class TestMemoryLimitIntegration:
         assert isinstance(exc_info.value.result, TestRunMemoryExceededResult)
         assert exc_info.value.result.memory_limit_mb == 5
 
+    def test_runner_records_peak_memory(self, sample_testrun: TestRun, tmp_path: Path):
+        """Runner should record the peak memory of the solution on the test run."""
+        runner = SubprocessSolutionRunner()
+        sample_testrun.memory_limit = 1024
+        cmd = [
+            sys.executable,
+            "-c",
+            "x = bytearray(256 * 1024 * 1024); import time; time.sleep(0.2)",
+        ]
+
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=10.0)
+
+        assert sample_testrun.peak_memory_mb is not None
+        assert sample_testrun.peak_memory_mb >= 256
+
+    def test_kernel_reported_limit_exceeded_raises_premature_termination(
+        self, sample_testrun: TestRun, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Should report memory exceeded when the limiter detects a kernel OOM kill."""
+
+        class OomKilledLimiter(PollingMemoryLimiter):
+            def was_limit_exceeded(self) -> bool:
+                return True
+
+        monkeypatch.setattr(
+            subproc, "create_memory_limiter", lambda mb, use_cgroup: OomKilledLimiter(mb)
+        )
+        runner = SubprocessSolutionRunner()
+        sample_testrun.memory_limit = 64
+        cmd = [sys.executable, "-c", "pass"]
+
+        with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+            runner.run(sample_testrun, cmd)
+
+        assert isinstance(exc_info.value.result, TestRunMemoryExceededResult)
+        assert exc_info.value.result.memory_limit_mb == 64
+
     def test_subprocess_memory_limit_error_contains_limit_info(self):
         """SubprocessMemoryLimitError should contain limit information."""
         error = SubprocessMemoryLimitError(
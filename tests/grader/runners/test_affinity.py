@@ -0,0 +1,162 @@
+"""Tests for the CPU affinity module."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from hammurabi.grader.runners import affinity
+from hammurabi.grader.runners.affinity import CAN_PIN_CPU_CORES
+from hammurabi.grader.runners.affinity import CoreAllocator
+from hammurabi.grader.runners.affinity import get_core_allocator
+from hammurabi.grader.runners.affinity import get_max_parallel_runs
+from hammurabi.grader.runners.affinity import parse_cpu_list
+from hammurabi.grader.runners.affinity import pin_grader_to_judge_core
+from hammurabi.grader.runners.affinity import pinned_to_cpu
+from hammurabi.grader.runners.affinity import read_physical_cores
+from hammurabi.grader.runners.affinity import unpinned
+
+
+def write_topology(sysfs_dir: Path, siblings_by_cpu: dict[int, str]) -> None:
+    for cpu, siblings in siblings_by_cpu.items():
+        topology_dir = sysfs_dir / f"cpu{cpu}" / "topology"
+        topology_dir.mkdir(parents=True)
+        (topology_dir / "thread_siblings_list").write_text(f"{siblings}\n")
+
+
+@pytest.mark.parametrize(
+    ("cpu_list", "expected"),
+    [
+        ("0", [0]),
+        ("0-3", [0, 1, 2, 3]),
+        ("0,4\n", [0, 4]),
+        ("8-9,0-1,4", [0, 1, 4, 8, 9]),
+        ("", []),
+    ],
+)
+def test_parse_cpu_list(cpu_list: str, expected: list[int]):
+    assert parse_cpu_list(cpu_list) == expected
+
+
+def test_read_physical_cores_groups_smt_siblings(tmp_path: Path):
+    # Two physical cores with two hyperthreads each, numbered the way Intel does.
+    write_topology(tmp_path, {0: "0,2", 1: "1,3", 2: "0,2", 3: "1,3"})
+
+    assert read_physical_cores({0, 1, 2, 3}, tmp_path) == [[0, 2], [1, 3]]
+
+
+def test_read_physical_cores_skips_disallowed_cpus(tmp_path: Path):
+    write_topology(tmp_path, {0: "0-1", 1: "0-1", 2: "2-3", 3: "2-3"})
+
+    assert read_physical_cores({1, 2, 3}, tmp_path) == [[1], [2, 3]]
+
+
+def test_read_physical_cores_without_topology(tmp_path: Path):
+    assert read_physical_cores({0, 1}, tmp_path) == [[0], [1]]
+
+
+def test_allocator_hands_out_one_cpu_per_physical_core():
+    allocator = CoreAllocator([[0, 4], [1, 5], [2, 6]])
+
+    assert allocator.acquire(reserve_judge_core=False) == 0
+    assert allocator.acquire(reserve_judge_core=False) == 1
+    assert allocator.acquire(reserve_judge_core=False) == 2
+    assert allocator.acquire(reserve_judge_core=False) is None
+
+
+def test_allocator_reserves_judge_core():
+    allocator = CoreAllocator([[0, 4], [1, 5], [2, 6]])
+
+    assert allocator.acquire() == 1
+    assert allocator.acquire() == 2
+    assert allocator.acquire() is None
+
+
+def test_allocator_reuses_released_core():
+    allocator = CoreAllocator([[0], [1]])
+    cpu = allocator.acquire(reserve_judge_core=False)
+    allocator.acquire(reserve_judge_core=False)
+
+    assert cpu is not None
+    allocator.release(cpu)
+
+    assert allocator.acquire(reserve_judge_core=False) == cpu
+
+
+@pytest.mark.skipif(not CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+def test_pinned_to_cpu_is_inherited_by_spawned_process():
+    original_cpus = os.sched_getaffinity(0)
+    cpu = max(original_cpus)
+    cmd = [sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"]
+
+    with pinned_to_cpu(cpu):
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == f"[{cpu}]"
+    assert os.sched_getaffinity(0) == original_cpus
+
+
+def test_allocator_reports_judge_cpus_and_core_count():
+    allocator = CoreAllocator([[0, 4], [1, 5], [2, 6]])
+
+    assert allocator.get_judge_cpus() == [0, 4]
+    assert allocator.get_core_count() == 2
+    assert allocator.get_core_count(reserve_judge_core=False) == 3
+
+
+@pytest.mark.skipif(not CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+def test_max_parallel_runs_is_capped_by_core_count():
+    core_count = get_core_allocator().get_core_count(reserve_judge_core=False)
+
+    assert get_max_parallel_runs(core_count + 8, reserve_judge_core=False) == core_count
+    assert get_max_parallel_runs(1, reserve_judge_core=False) == 1
+    # There is always room for one run, even if the judge core is the only one.
+    assert get_max_parallel_runs(4, reserve_judge_core=True) >= 1
+
+
+@pytest.mark.skipif(not CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+def test_pin_grader_to_judge_core_pins_all_threads(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(affinity, "_grader_cpus", None)
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait, daemon=True)
+    thread.start()
+    original_cpus = {
+        int(thread_id): os.sched_getaffinity(int(thread_id))
+        for thread_id in os.listdir("/proc/self/task")
+    }
+    try:
+        pin_grader_to_judge_core()
+
+        judge_cpus = set(get_core_allocator().get_judge_cpus())
+        assert os.sched_getaffinity(0) == judge_cpus
+        assert thread.native_id is not None
+        assert os.sched_getaffinity(thread.native_id) == judge_cpus
+    finally:
+        for thread_id, cpus in original_cpus.items():
+            with contextlib.suppress(ProcessLookupError):
+                os.sched_setaffinity(thread_id, cpus)
+        release.set()
+        thread.join()
+
+
+@pytest.mark.skipif(not CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+def test_unpinned_restores_cpus_of_grader_pinned_to_judge_core(monkeypatch: pytest.MonkeyPatch):
+    original_cpus = os.sched_getaffinity(0)
+    monkeypatch.setattr(affinity, "_grader_cpus", None)
+    try:
+        pin_grader_to_judge_core()
+        judge_cpus = os.sched_getaffinity(0)
+
+        with unpinned():
+            assert os.sched_getaffinity(0) == original_cpus
+        with pinned_to_cpu(None):
+            assert os.sched_getaffinity(0) == original_cpus
+        assert os.sched_getaffinity(0) == judge_cpus
+    finally:
+        os.sched_setaffinity(0, original_cpus)
@@ -0,0 +1,169 @@
+"""Tests for the asyncio subprocess solution runner module."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import psutil
+import pytest
+
+from hammurabi.exceptions import SubprocessTimeoutError
+from hammurabi.exceptions import TestRunPrematureTerminationError
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.runners import registered_runners
+from hammurabi.grader.runners.asyncsubproc import AsyncSubprocessSolutionRunner
+from hammurabi.grader.runners.subproc import SolutionProcess
+
+
+def create_testrun(tmp_path: Path, name: str = "01") -> TestRun:
+    """Create a test run whose output files are named after the test case."""
+    problem = Problem(name="test_problem", root_dir="/tmp/test")
+    problem.config = ProblemConfig()
+    solution = Solution(
+        problem=problem, author="test_author", root_dir=str(tmp_path), language="python"
+    )
+    testcase = TestCase(
+        problem=problem,
+        name=name,
+        input_filename=str(tmp_path / f"{name}.in"),
+        correct_answer_filename=str(tmp_path / f"{name}.out"),
+        score=10,
+    )
+    return TestRun(
+        solution=solution,
+        testcase=testcase,
+        output_dir=str(tmp_path),
+        answer_filename=str(tmp_path / f"{name}.answer"),
+        compiler_output_filename=None,
+        stdout_filename=str(tmp_path / f"{name}.stdout"),
+        stderr_filename=str(tmp_path / f"{name}.stderr"),
+    )
+
+
+def test_async_runner_is_registered():
+    assert registered_runners["AsyncSubprocessSolutionRunner"] is AsyncSubprocessSolutionRunner
+
+
+def test_returns_exit_code_and_records_times(tmp_path: Path):
+    runner = AsyncSubprocessSolutionRunner()
+    testrun = create_testrun(tmp_path)
+    cmd = [sys.executable, "-c", "print('hello'); import sys; sys.exit(2)"]
+
+    exit_code = asyncio.run(
+        runner.run_command_with_time_and_ram_limits_async(testrun, cmd, timeout_sec=5.0)
+    )
+
+    assert exit_code == 2
+    assert "hello" in Path(testrun.stdout_filename or "").read_text()
+    assert testrun.wall_time_ns is not None
+    assert testrun.lean_end_time is not None
+
+
+def test_runs_many_solutions_concurrently(tmp_path: Path):
+    runner = AsyncSubprocessSolutionRunner()
+    testruns = [create_testrun(tmp_path, f"{i:02}") for i in range(10)]
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+
+    async def run_all() -> list[int | None]:
+        return await asyncio.gather(
+            *(
+                runner.run_command_with_time_and_ram_limits_async(testrun, cmd, timeout_sec=10.0)
+                for testrun in testruns
+            )
+        )
+
+    start_time = time.monotonic()
+    exit_codes = asyncio.run(run_all())
+
+    assert exit_codes == [0] * len(testruns)
+    # Run one after another, the solutions would take at least 5 seconds.
+    assert time.monotonic() - start_time < 4.0
+
+
+def test_run_async_reports_timeout(tmp_path: Path):
+    runner = AsyncSubprocessSolutionRunner()
+    testrun = create_testrun(tmp_path)
+    testrun.solution.problem.config.limits.time.python = 0.2
+    cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+
+    with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+        asyncio.run(runner.run_async(testrun, cmd))
+
+    assert isinstance(exc_info.value.result, TestRunTimeoutResult)
+    assert isinstance(exc_info.value.__cause__, SubprocessTimeoutError)
+
+
+def test_cancellation_kills_the_process(tmp_path: Path):
+    runner = AsyncSubprocessSolutionRunner()
+    testrun = create_testrun(tmp_path)
+    cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+
+    async def run_and_cancel() -> None:
+        task = asyncio.create_task(
+            runner.run_command_with_time_and_ram_limits_async(testrun, cmd, timeout_sec=10.0)
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    children_before = set(psutil.Process().children())
+    start_time = time.monotonic()
+    asyncio.run(run_and_cancel())
+
+    assert time.monotonic() - start_time < 5.0
+    deadline = time.monotonic() + 5.0
+    while get_running_children() - children_before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not get_running_children() - children_before
+
+
+def test_cleanup_after_cancellation_runs_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    runner = AsyncSubprocessSolutionRunner()
+    testrun = create_testrun(tmp_path)
+    cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+    cleanup_threads: list[threading.Thread] = []
+    original_stop_monitoring = SolutionProcess.stop_monitoring
+
+    def recording_stop_monitoring(self: SolutionProcess) -> None:
+        cleanup_threads.append(threading.current_thread())
+        original_stop_monitoring(self)
+
+    monkeypatch.setattr(SolutionProcess, "stop_monitoring", recording_stop_monitoring)
+
+    async def run_and_cancel() -> threading.Thread:
+        task = asyncio.create_task(
+            runner.run_command_with_time_and_ram_limits_async(testrun, cmd, timeout_sec=10.0)
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run_and_cancel())
+
+    assert len(cleanup_threads) == 1
+    assert cleanup_threads[0] is not loop_thread
+
+
+def get_running_children() -> set[psutil.Process]:
+    children = set()
+    for child in psutil.Process().children():
+        try:
+            if child.status() != psutil.STATUS_ZOMBIE:
+                children.add(child)
+        except psutil.NoSuchProcess:
+            pass
+    return children
@@ -0,0 +1,118 @@
+"""Tests for the event loop solution runner module."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from hammurabi.exceptions import SubprocessTimeoutError
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.runners import eventloop
+from hammurabi.grader.runners import registered_runners
+from hammurabi.grader.runners.eventloop import EventLoopSolutionRunner
+from hammurabi.grader.runners.eventloop import ProcessWaiter
+from hammurabi.grader.runners.subproc import CAN_MEASURE_CPU_TIME
+
+pytestmark = pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="requires os.wait4")
+
+
+@pytest.fixture
+def sample_testrun(problem: Problem, make_testrun: Callable[..., TestRun]) -> TestRun:
+    """Create a sample test run for testing."""
+    return make_testrun(problem, language="python")
+
+
+@pytest.fixture(params=[True, False], ids=["pidfd", "polling"])
+def waiter(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> ProcessWaiter:
+    """Create a process waiter, with and without pidfd support."""
+    if request.param and not eventloop.PIDFD_SUPPORTED:
+        pytest.skip("pidfd_open is not supported")
+    monkeypatch.setattr(eventloop, "PIDFD_SUPPORTED", request.param)
+    return ProcessWaiter()
+
+
+def test_event_loop_runner_is_registered():
+    assert registered_runners["EventLoopSolutionRunner"] is EventLoopSolutionRunner
+
+
+def test_wait_returns_exit_code(waiter: ProcessWaiter):
+    proc = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(3)"])
+
+    process_exit = waiter.wait(proc)
+
+    assert process_exit.returncode == 3
+    assert proc.returncode == 3
+    assert process_exit.rusage is not None
+
+
+def test_wait_for_many_processes_concurrently(waiter: ProcessWaiter):
+    procs = [
+        subprocess.Popen([sys.executable, "-c", f"import sys; sys.exit({i})"]) for i in range(8)
+    ]
+    exit_codes: dict[int, int | None] = {}
+
+    def wait(i: int) -> None:
+        exit_codes[i] = waiter.wait(procs[i]).returncode
+
+    threads = [threading.Thread(target=wait, args=(i,)) for i in range(len(procs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10.0)
+
+    assert exit_codes == {i: i for i in range(len(procs))}
+
+
+def test_deadline_fires_timeout_callback_once(waiter: ProcessWaiter):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(10)"])
+    calls = []
+
+    def on_timeout() -> None:
+        calls.append(time.monotonic())
+        proc.kill()
+
+    start_time = time.monotonic()
+    process_exit = waiter.wait(proc, start_time + 0.2, on_timeout)
+
+    assert calls == [pytest.approx(start_time + 0.2, abs=0.1)]
+    assert process_exit.returncode is not None
+    assert process_exit.returncode < 0
+
+
+def test_process_reaped_elsewhere_does_not_hang(waiter: ProcessWaiter):
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+
+    process_exit = waiter.wait(proc)
+
+    assert process_exit.rusage is None
+
+
+def test_runner_returns_exit_code(sample_testrun: TestRun):
+    runner = EventLoopSolutionRunner()
+    cmd = [sys.executable, "-c", "print('hello'); import sys; sys.exit(2)"]
+
+    exit_code = runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+    assert exit_code == 2
+    assert "hello" in Path(sample_testrun.stdout_filename).read_text()
+    assert sample_testrun.wall_time_ns is not None
+    assert sample_testrun.cpu_user_time_ns is not None
+
+
+def test_runner_raises_on_timeout(sample_testrun: TestRun):
+    runner = EventLoopSolutionRunner()
+    cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+
+    start_time = time.monotonic()
+    with pytest.raises(SubprocessTimeoutError):
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=0.2)
+
+    assert time.monotonic() - start_time < 5.0
@@ -0,0 +1,89 @@
+"""Tests for the spawn module."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from hammurabi.grader.runners.spawn import SpawnLimits
+from hammurabi.grader.runners.spawn import get_preexec_fn
+from hammurabi.grader.runners.spawn import get_spawn_command
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+PRINT_LIMITS_CODE = (
+    "import resource; "
+    "print(resource.getrlimit(resource.RLIMIT_AS), resource.getrlimit(resource.RLIMIT_CPU))"
+)
+
+
+def test_command_without_limits_is_unchanged():
+    cmd = [sys.executable, "-c", "pass"]
+
+    assert get_spawn_command(cmd, SpawnLimits()) == cmd
+    assert get_preexec_fn(SpawnLimits()) is None
+
+
+def test_spawn_command_applies_rlimits():
+    import resource  # noqa: PLC0415
+
+    limits = SpawnLimits(
+        rlimits={
+            resource.RLIMIT_AS: (512 * 1024 * 1024, 512 * 1024 * 1024),
+            resource.RLIMIT_CPU: (2, 3),
+        }
+    )
+    cmd = [sys.executable, "-c", PRINT_LIMITS_CODE]
+
+    output = subprocess.run(
+        get_spawn_command(cmd, limits), capture_output=True, text=True, check=True
+    ).stdout
+
+    expected_as = 512 * 1024 * 1024
+    assert output.strip() == f"({expected_as}, {expected_as}) (2, 3)"
+
+
+def test_spawn_command_preserves_arguments(tmp_path: Path):
+    import resource  # noqa: PLC0415
+
+    limits = SpawnLimits(rlimits={resource.RLIMIT_CPU: (5, 6)})
+    arguments = ["with space", "$HOME", "'quoted'", '"double"', ""]
+    cmd = [sys.executable, "-c", "import sys; print(sys.argv[1:])", *arguments]
+
+    output = subprocess.run(
+        get_spawn_command(cmd, limits), capture_output=True, text=True, check=True, cwd=tmp_path
+    ).stdout
+
+    assert output.strip() == str(arguments)
+
+
+def test_spawn_command_joins_cgroup(tmp_path: Path):
+    procs_filename = tmp_path / "cgroup with space" / "cgroup.procs"
+    procs_filename.parent.mkdir()
+    limits = SpawnLimits(cgroup_procs_filename=str(procs_filename))
+
+    proc = subprocess.Popen(get_spawn_command([sys.executable, "-c", "pass"], limits))
+    proc.wait()
+
+    # The shell executes the solution in its place, so the pid doesn't change.
+    assert proc.returncode == 0
+    assert procs_filename.read_text().strip() == str(proc.pid)
+
+
+def test_preexec_fn_applies_the_same_limits():
+    import resource  # noqa: PLC0415
+
+    limits = SpawnLimits(rlimits={resource.RLIMIT_CPU: (2, 3)})
+
+    output = subprocess.run(
+        [sys.executable, "-c", PRINT_LIMITS_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+        preexec_fn=get_preexec_fn(limits),  # noqa: PLW1509
+    ).stdout
+
+    assert output.strip().endswith("(2, 3)")
@@ -3,18 +3,28 @@
 from __future__ import annotations
 
 import sys
+import time
 from pathlib import Path
 
+import psutil
 import pytest
 
 from hammurabi.exceptions import SubprocessTimeoutError
 from hammurabi.exceptions import TestRunPrematureTerminationError
+from hammurabi.grader import reruns
 from hammurabi.grader.config import ProblemConfig
 from hammurabi.grader.model import Problem
 from hammurabi.grader.model import Solution
 from hammurabi.grader.model import TestCase
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.runners import subproc
+from hammurabi.grader.runners.affinity import CAN_PIN_CPU_CORES
+from hammurabi.grader.runners.affinity import get_core_allocator
+from hammurabi.grader.runners.eventloop import EventLoopSolutionRunner
+from hammurabi.grader.runners.memory.fallback import PollingMemoryLimiter
+from hammurabi.grader.runners.subproc import CAN_KILL_PROCESS_GROUPS
+from hammurabi.grader.runners.subproc import CAN_MEASURE_CPU_TIME
 from hammurabi.grader.runners.subproc import SubprocessSolutionRunner
 
 
@@ -219,6 +229,21 @@ class TestSubprocessTimeoutBehavior:
         # Test passes if no orphan processes are left hanging
         # (verified by the test completing without hanging)
 
+    @pytest.mark.parametrize("runner_class", [SubprocessSolutionRunner, EventLoopSolutionRunner])
+    def test_timeout_kills_grandchild_processes(
+        self, sample_testrun: TestRun, tmp_path: Path, runner_class: type
+    ):
+        """Should kill the whole process tree of the solution when the timeout occurs."""
+        pid_filename = tmp_path / "grandchild.pid"
+        cmd = [sys.executable, "-c", spawn_sleeping_child_script(pid_filename, exit=False)]
+
+        with pytest.raises(SubprocessTimeoutError):
+            runner_class().run_command_with_time_and_ram_limits(
+                sample_testrun, cmd, timeout_sec=1.0
+            )
+
+        assert wait_until_gone(int(pid_filename.read_text()))
+
     def test_fast_command_does_not_trigger_timeout(self, sample_testrun: TestRun, tmp_path: Path):
         """Fast command should complete before timeout."""
         runner = SubprocessSolutionRunner()
@@ -241,6 +266,186 @@ class TestSubprocessTimeoutBehavior:
         # Should be at least 100ms (the sleep time)
         assert elapsed >= 100
 
+    @pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="wait4 is not available")
+    def test_cpu_and_wall_times_are_recorded(self, sample_testrun: TestRun, tmp_path: Path):
+        """CPU time of a busy process and wall time of the run should be recorded."""
+        runner = SubprocessSolutionRunner()
+        cmd = [
+            sys.executable,
+            "-c",
+            "import time\nt = time.time()\nwhile time.time() - t < 0.2: pass",
+        ]
+
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+        assert sample_testrun.wall_time_ns is not None
+        assert sample_testrun.wall_time_ns >= 200_000_000
+        cpu_time = sample_testrun.get_cpu_time_milliseconds()
+        assert cpu_time is not None
+        assert cpu_time >= 100
+
+    @pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="wait4 is not available")
+    def test_cpu_time_of_short_run_does_not_exceed_wall_time(
+        self, sample_testrun: TestRun, tmp_path: Path
+    ):
+        """The wall time should cover the spawn overhead that the CPU time includes."""
+        runner = SubprocessSolutionRunner()
+        cmd = [sys.executable, "-c", "pass"]
+
+        # The CPU time limit makes the solution start through the shell that applies it.
+        runner.run_command_with_time_and_ram_limits(
+            sample_testrun, cmd, timeout_sec=5.0, cpu_time_limit_sec=5.0
+        )
+
+        assert sample_testrun.wall_time_ns is not None
+        assert sample_testrun.cpu_user_time_ns is not None
+        assert sample_testrun.cpu_system_time_ns is not None
+        cpu_time_ns = sample_testrun.cpu_user_time_ns + sample_testrun.cpu_system_time_ns
+        assert cpu_time_ns <= sample_testrun.wall_time_ns
+
+    @pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="wait4 is not available")
+    def test_sleeping_process_uses_little_cpu_time(self, sample_testrun: TestRun, tmp_path: Path):
+        """A sleeping process should not accumulate CPU time."""
+        runner = SubprocessSolutionRunner()
+        cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+        cpu_time = sample_testrun.get_cpu_time_milliseconds()
+        assert cpu_time is not None
+        assert cpu_time < 300
+
+    @pytest.mark.skipif(not CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+    def test_process_tree_is_pinned_to_a_core(self, sample_testrun: TestRun, tmp_path: Path):
+        """With core pinning enabled, the solution should run on the core recorded on the run."""
+        limits = sample_testrun.solution.problem.config.limits
+        limits.pin_cpu_cores = True
+        limits.reserve_judge_core = False
+        runner = SubprocessSolutionRunner()
+        cmd = [sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"]
+
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+        assert sample_testrun.cpu_core is not None
+        assert Path(tmp_path / "stdout.txt").read_text().strip() == f"[{sample_testrun.cpu_core}]"
+        # The core is free again for the next run.
+        assert get_core_allocator().acquire(reserve_judge_core=False) == sample_testrun.cpu_core
+        get_core_allocator().release(sample_testrun.cpu_core)
+
+    def test_process_is_not_pinned_by_default(self, sample_testrun: TestRun, tmp_path: Path):
+        """Without core pinning, no core should be recorded on the run."""
+        runner = SubprocessSolutionRunner()
+        cmd = [sys.executable, "-c", "pass"]
+
+        runner.run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+        assert sample_testrun.cpu_core is None
+
+
+@pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="wait4 is not available")
+class TestCpuTimeLimit:
+    """Tests for enforcing time limits on CPU time."""
+
+    def test_cpu_time_limit_exceeded_raises(self, sample_testrun: TestRun, tmp_path: Path):
+        """Should raise SubprocessTimeoutError when the CPU time limit is exceeded."""
+        runner = SubprocessSolutionRunner()
+        cmd = [
+            sys.executable,
+            "-c",
+            "import time\nt = time.time()\nwhile time.time() - t < 0.5: pass",
+        ]
+
+        with pytest.raises(SubprocessTimeoutError) as exc_info:
+            runner.run_command_with_time_and_ram_limits(
+                sample_testrun, cmd, timeout_sec=5.0, cpu_time_limit_sec=0.1
+            )
+
+        assert exc_info.value.timeout == 0.1
+        assert "CPU time" in str(exc_info.value)
+
+    def test_run_with_cpu_clock_allows_sleeping(self, sample_testrun: TestRun, tmp_path: Path):
+        """With the CPU clock, sleeping past the time limit should not be a timeout."""
+        runner = SubprocessSolutionRunner()
+        limits = sample_testrun.solution.problem.config.limits
+        limits.time.python = 0.2
+        limits.time_limit_clock = "cpu"
+
+        cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+        runner.run(sample_testrun, cmd)
+
+    def test_run_with_cpu_clock_kills_blocked_process(
+        self, sample_testrun: TestRun, tmp_path: Path
+    ):
+        """With the CPU clock, a blocked process should still be killed by the wall timeout."""
+        runner = SubprocessSolutionRunner()
+        limits = sample_testrun.solution.problem.config.limits
+        limits.time.python = 0.1
+        limits.time_limit_clock = "cpu"
+
+        cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+
+        with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+            runner.run(sample_testrun, cmd)
+
+        assert isinstance(exc_info.value.result, TestRunTimeoutResult)
+        assert exc_info.value.result.timeout == 0.1
+
+
+class TestBorderlineTimeouts:
+    """Tests for the time limits of test runs whose borderline timeouts are re-run."""
+
+    def test_wall_clock_timeout_leaves_room_for_borderline_runs(self, sample_testrun: TestRun):
+        """With re-runs, the wall timeout should end the borderline band past the limit."""
+        limits = sample_testrun.solution.problem.config.limits
+        limits.time.python = 2.0
+        limits.borderline_reruns = 1
+        limits.borderline_band = 0.25
+
+        assert subproc.get_time_limits(sample_testrun) == (2.0, 2.5, None, 2.0)
+
+    def test_run_slightly_over_limit_is_timeout_with_its_time(
+        self, sample_testrun: TestRun, tmp_path: Path
+    ):
+        """A run that finishes within the band past the limit should time out, timed in full."""
+        runner = SubprocessSolutionRunner()
+        limits = sample_testrun.solution.problem.config.limits
+        limits.time.python = 0.2
+        limits.borderline_reruns = 1
+        limits.borderline_band = 10.0
+
+        cmd = [sys.executable, "-c", "import time; time.sleep(0.4)"]
+
+        with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+            runner.run(sample_testrun, cmd)
+
+        assert isinstance(exc_info.value.result, TestRunTimeoutResult)
+        assert exc_info.value.result.timeout == 0.2
+        assert sample_testrun.wall_time_ns is not None
+        assert sample_testrun.wall_time_ns >= 400_000_000
+
+    @pytest.mark.skipif(not CAN_MEASURE_CPU_TIME, reason="wait4 is not available")
+    def test_run_killed_by_cpu_time_limit_is_not_borderline(
+        self, sample_testrun: TestRun, tmp_path: Path
+    ):
+        """With the CPU clock, a busy loop killed right at the limit should not be re-run."""
+        runner = SubprocessSolutionRunner()
+        limits = sample_testrun.solution.problem.config.limits
+        limits.time.python = 1.0
+        limits.time_limit_clock = "cpu"
+        limits.borderline_reruns = 1
+        limits.borderline_band = 0.1
+
+        cmd = [sys.executable, "-c", "while True: pass"]
+
+        with pytest.raises(TestRunPrematureTerminationError) as exc_info:
+            runner.run(sample_testrun, cmd)
+
+        sample_testrun.result = exc_info.value.result
+        assert isinstance(sample_testrun.result, TestRunTimeoutResult)
+        assert sample_testrun.data["killed_at_limit"]
+        assert not reruns.is_borderline(sample_testrun)
+
 
 class TestCommandExecution:
     """Tests for command execution details."""
@@ -272,3 +477,73 @@ class TestCommandExecution:
         stdout_content = Path(sample_testrun.stdout_filename).read_text()
         assert "arg1" in stdout_content
         assert "arg2" in stdout_content
+
+
+@pytest.mark.skipif(not CAN_KILL_PROCESS_GROUPS, reason="process groups are not available")
+class TestOrphanCleanup:
+    """Tests for killing the processes a solution leaves running after it exits."""
+
+    @pytest.mark.parametrize("runner_class", [SubprocessSolutionRunner, EventLoopSolutionRunner])
+    def test_orphaned_children_are_killed_after_exit(
+        self, sample_testrun: TestRun, tmp_path: Path, runner_class: type
+    ):
+        """A child left running by a solution that exited normally should be killed."""
+        pid_filename = tmp_path / "orphan.pid"
+        cmd = [sys.executable, "-c", spawn_sleeping_child_script(pid_filename, exit=True)]
+
+        exit_code = runner_class().run_command_with_time_and_ram_limits(
+            sample_testrun, cmd, timeout_sec=5.0
+        )
+
+        assert exit_code == 0
+        assert wait_until_gone(int(pid_filename.read_text()))
+
+
+class RecordingMemoryLimiter(PollingMemoryLimiter):
+    """Memory limiter that records whether it has been cleaned up."""
+
+    stopped = False
+
+    def stop_monitoring(self) -> None:
+        super().stop_monitoring()
+        self.stopped = True
+
+
+@pytest.mark.parametrize("runner_class", [SubprocessSolutionRunner, EventLoopSolutionRunner])
+def test_limiter_is_cleaned_up_if_process_cannot_start(
+    runner_class: type[SubprocessSolutionRunner],
+    sample_testrun: TestRun,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """A run whose command can't be started should not leak its limiter, e.g. its cgroup."""
+    limiter = RecordingMemoryLimiter(512)
+    monkeypatch.setattr(subproc, "create_memory_limiter", lambda *args: limiter)
+    cmd = ["/nonexistent/interpreter", "solution.py"]
+
+    with pytest.raises(FileNotFoundError):
+        runner_class().run_command_with_time_and_ram_limits(sample_testrun, cmd, timeout_sec=5.0)
+
+    assert limiter.stopped
+
+
+def spawn_sleeping_child_script(pid_filename: Path, exit: bool) -> str:
+    """Return a script that starts a sleeping child, then either exits or sleeps too."""
+    return (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(100)'])\n"
+        f"open({str(pid_filename)!r}, 'w').write(str(child.pid))\n"
+        + ("" if exit else "time.sleep(100)\n")
+    )
+
+
+def wait_until_gone(pid: int, timeout_sec: float = 5.0) -> bool:
+    """Return True once the process has exited, or False if it's still running after a while."""
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        try:
+            if psutil.Process(pid).status() == psutil.STATUS_ZOMBIE:
+                return True
+        except psutil.NoSuchProcess:
+            return True
+        time.sleep(0.01)
+    return False
@@ -0,0 +1,136 @@
+"""Tests for the process supervisor module."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from hammurabi.grader.runners import supervisor as supervisor_module
+from hammurabi.grader.runners.supervisor import ProcessSupervisor
+from hammurabi.grader.runners.supervisor import WatchedProcess
+from hammurabi.grader.runners.supervisor import get_process_supervisor
+
+
+@pytest.fixture
+def sleeping_process() -> Iterator[subprocess.Popen]:
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(10)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def test_get_process_supervisor_returns_shared_instance():
+    assert get_process_supervisor() is get_process_supervisor()
+
+
+def test_deadline_fires_timeout_callback(sleeping_process: subprocess.Popen):
+    supervisor = ProcessSupervisor()
+    timed_out = threading.Event()
+    start_time = time.monotonic()
+    watched_process = WatchedProcess(
+        sleeping_process.pid, deadline=start_time + 0.1, on_timeout=timed_out.set
+    )
+
+    supervisor.watch(watched_process)
+    assert timed_out.wait(timeout=5.0)
+    supervisor.unwatch(watched_process)
+
+    assert time.monotonic() - start_time >= 0.1
+
+
+def test_timeout_callback_fires_once(sleeping_process: subprocess.Popen):
+    supervisor = ProcessSupervisor()
+    calls = []
+    watched_process = WatchedProcess(
+        sleeping_process.pid, deadline=time.monotonic(), on_timeout=lambda: calls.append(1)
+    )
+
+    supervisor.watch(watched_process)
+    time.sleep(0.2)
+    supervisor.unwatch(watched_process)
+
+    assert calls == [1]
+
+
+def test_unwatched_process_does_not_time_out(sleeping_process: subprocess.Popen):
+    supervisor = ProcessSupervisor()
+    timed_out = threading.Event()
+    watched_process = WatchedProcess(
+        sleeping_process.pid, deadline=time.monotonic() + 0.1, on_timeout=timed_out.set
+    )
+
+    supervisor.watch(watched_process)
+    supervisor.unwatch(watched_process)
+
+    assert not timed_out.wait(timeout=0.3)
+
+
+def test_memory_limit_fires_callback():
+    supervisor = ProcessSupervisor()
+    exceeded = threading.Event()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "x = bytearray(64 * 1024 * 1024); import time; time.sleep(10)"]
+    )
+    watched_process = WatchedProcess(
+        proc.pid, memory_limit_bytes=16 * 1024 * 1024, on_memory_exceeded=exceeded.set
+    )
+
+    try:
+        supervisor.watch(watched_process)
+        assert exceeded.wait(timeout=5.0)
+    finally:
+        supervisor.unwatch(watched_process)
+        proc.kill()
+        proc.wait()
+
+    assert watched_process.peak_memory_bytes is not None
+    assert watched_process.peak_memory_bytes > 16 * 1024 * 1024
+
+
+def test_tracks_peak_memory_of_process_tree():
+    supervisor = ProcessSupervisor()
+    child_code = "x = bytearray(32 * 1024 * 1024); import time; time.sleep(0.5)"
+    parent_code = f"import subprocess, sys; subprocess.run([sys.executable, '-c', {child_code!r}])"
+    proc = subprocess.Popen([sys.executable, "-c", parent_code])
+    watched_process = WatchedProcess(proc.pid, track_memory=True)
+
+    supervisor.watch(watched_process)
+    proc.wait()
+    supervisor.unwatch(watched_process)
+
+    assert watched_process.peak_memory_bytes is not None
+    assert watched_process.peak_memory_bytes > 32 * 1024 * 1024
+
+
+def test_memory_is_polled_faster_for_young_runs():
+    now = time.monotonic()
+    young = WatchedProcess(1, track_memory=True, start_time=now)
+    old = WatchedProcess(2, track_memory=True, start_time=now - 60)
+
+    assert supervisor_module._get_memory_poll_interval([old, young], now) == (
+        supervisor_module.MIN_MEMORY_POLL_INTERVAL_SECONDS
+    )
+    assert supervisor_module._get_memory_poll_interval([old], now) == (
+        supervisor_module.MAX_MEMORY_POLL_INTERVAL_SECONDS
+    )
+
+
+def test_memory_is_polled_faster_near_the_limit():
+    now = time.monotonic()
+    watched_process = WatchedProcess(1, memory_limit_bytes=100, start_time=now - 60)
+    watched_process._last_memory_bytes = 90
+
+    assert supervisor_module._get_memory_poll_interval([watched_process], now) == (
+        supervisor_module.MIN_MEMORY_POLL_INTERVAL_SECONDS
+    )
+
+
+def test_get_tree_pids_includes_all_descendants():
+    children_by_parent = {1: [2, 3], 3: [4], 5: [6]}
+
+    assert sorted(supervisor_module._get_tree_pids(1, children_by_parent)) == [1, 2, 3, 4]
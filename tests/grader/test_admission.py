@@ -0,0 +1,163 @@
+"""Tests for the admission control of concurrent solution runs."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from hammurabi.grader.admission import AdmissionController
+from hammurabi.grader.admission import get_concurrency_cap
+from hammurabi.grader.admission import get_default_memory_budget_mb
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+
+# The test runs reserve the default memory limit of a problem, 512 MB, unless given their own.
+
+
+def start_admitted(
+    controller: AdmissionController, testrun: TestRun, release: threading.Event
+) -> tuple[threading.Thread, threading.Event]:
+    """Start a thread that holds an admission until `release` is set."""
+    admitted = threading.Event()
+
+    def run() -> None:
+        with controller.admit(testrun):
+            admitted.set()
+            release.wait()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, admitted
+
+
+def test_default_memory_budget_is_a_fraction_of_available_memory():
+    full_budget = get_default_memory_budget_mb(1.0)
+
+    assert full_budget > 0
+    assert get_default_memory_budget_mb(0.5) <= full_budget
+
+
+def test_concurrency_cap_is_read_from_runner_params(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    problem.config.runner.params = {"max_concurrent_runs": {"java": 2}}
+
+    assert get_concurrency_cap(make_testrun(problem, language="java")) == 2
+    assert get_concurrency_cap(make_testrun(problem, language="python")) is None
+
+
+def test_runs_within_budget_are_admitted_together(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    controller = AdmissionController(memory_budget_mb=1024)
+    release = threading.Event()
+
+    first, first_admitted = start_admitted(controller, make_testrun(problem), release)
+    second, second_admitted = start_admitted(controller, make_testrun(problem), release)
+
+    assert first_admitted.wait(5)
+    assert second_admitted.wait(5)
+    release.set()
+    first.join()
+    second.join()
+
+
+def test_run_exceeding_budget_waits_for_running_ones(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    controller = AdmissionController(memory_budget_mb=800)
+    release = threading.Event()
+
+    first, first_admitted = start_admitted(controller, make_testrun(problem), release)
+    assert first_admitted.wait(5)
+    second, second_admitted = start_admitted(controller, make_testrun(problem), release)
+
+    assert not second_admitted.wait(0.2)
+    release.set()
+    assert second_admitted.wait(5)
+    first.join()
+    second.join()
+
+
+def test_run_larger_than_budget_is_admitted_alone(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    controller = AdmissionController(memory_budget_mb=100)
+
+    with controller.admit(make_testrun(problem, memory_limit=512)):
+        pass
+
+
+def test_language_cap_holds_back_runs_of_that_language_only(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    problem.config.runner.params = {"max_concurrent_runs": {"java": 1}}
+    controller = AdmissionController(memory_budget_mb=10_000)
+    release = threading.Event()
+
+    first, first_admitted = start_admitted(
+        controller, make_testrun(problem, language="java"), release
+    )
+    assert first_admitted.wait(5)
+    java, java_admitted = start_admitted(
+        controller, make_testrun(problem, language="java"), release
+    )
+    python, python_admitted = start_admitted(
+        controller, make_testrun(problem, language="python"), release
+    )
+
+    assert python_admitted.wait(5)
+    assert not java_admitted.is_set()
+    release.set()
+    assert java_admitted.wait(5)
+    for thread in (first, java, python):
+        thread.join()
+
+
+def test_async_admission_waits_without_blocking_the_loop(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    controller = AdmissionController(memory_budget_mb=800)
+    order: list[str] = []
+
+    async def hold(name: str, seconds: float) -> None:
+        async with controller.admit_async(make_testrun(problem)):
+            order.append(f"{name} start")
+            await asyncio.sleep(seconds)
+            order.append(f"{name} end")
+
+    async def main() -> None:
+        await asyncio.gather(hold("first", 0.1), hold("second", 0))
+
+    started = time.monotonic()
+    asyncio.run(main())
+
+    assert order == ["first start", "first end", "second start", "second end"]
+    assert time.monotonic() - started < 5
+
+
+def test_cancelled_async_admission_does_not_leak(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    controller = AdmissionController(memory_budget_mb=800)
+
+    async def main() -> None:
+        async with controller.admit_async(make_testrun(problem)):
+            waiting = asyncio.create_task(_admit_and_exit(controller, make_testrun(problem)))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        # The budget is free again.
+        await asyncio.wait_for(_admit_and_exit(controller, make_testrun(problem)), 5)
+
+    asyncio.run(main())
+
+
+async def _admit_and_exit(controller: AdmissionController, testrun: TestRun) -> None:
+    async with controller.admit_async(testrun):
+        pass
@@ -0,0 +1,180 @@
+"""Tests for the persistent build cache."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from hammurabi.grader.adapters.base import BaseSolutionAdapter
+from hammurabi.grader.buildcache import BuildCache
+from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestCase
+from hammurabi.grader.model import TestRun
+
+
+@pytest.fixture
+def solution_dir(tmp_path: Path) -> Path:
+    """Create a solution directory with a single source file."""
+    solution_dir = tmp_path / "solution"
+    solution_dir.mkdir()
+    (solution_dir / "main.c").write_text("int main() { return 0; }")
+    return solution_dir
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> BuildCache:
+    """Create an empty build cache."""
+    return BuildCache(tmp_path / "cache", max_size_bytes=1024 * 1024)
+
+
+def compute_key(cache: BuildCache, solution_dir: Path, cmd: list[str] | None = None) -> str:
+    sources = [str(solution_dir / "main.c")]
+    return cache.compute_key(str(solution_dir), sources, cmd or ["cc", "-O2"], {})
+
+
+class TestComputeKey:
+    def test_key_is_stable(self, cache: BuildCache, solution_dir: Path):
+        assert compute_key(cache, solution_dir) == compute_key(cache, solution_dir)
+
+    def test_key_changes_with_source_content(self, cache: BuildCache, solution_dir: Path):
+        key_before = compute_key(cache, solution_dir)
+        (solution_dir / "main.c").write_text("int main() { return 1; }")
+
+        assert compute_key(cache, solution_dir) != key_before
+
+    def test_key_changes_with_compile_flags(self, cache: BuildCache, solution_dir: Path):
+        assert compute_key(cache, solution_dir, ["cc", "-O2"]) != compute_key(
+            cache, solution_dir, ["cc", "-O3"]
+        )
+
+    def test_key_does_not_depend_on_solution_location(self, cache: BuildCache, tmp_path: Path):
+        keys = []
+        for name in ["first", "second"]:
+            solution_dir = tmp_path / name
+            solution_dir.mkdir()
+            (solution_dir / "main.c").write_text("int main() { return 0; }")
+            cmd = ["cc", str(solution_dir / "main.c")]
+            keys.append(compute_key(cache, solution_dir, cmd))
+
+        assert keys[0] == keys[1]
+
+    def test_key_ignores_irrelevant_environment(self, cache: BuildCache, solution_dir: Path):
+        sources = [str(solution_dir / "main.c")]
+        key1 = cache.compute_key(str(solution_dir), sources, ["cc"], {"SHLVL": "1"})
+        key2 = cache.compute_key(str(solution_dir), sources, ["cc"], {"SHLVL": "2"})
+        key3 = cache.compute_key(str(solution_dir), sources, ["cc"], {"CPATH": "/opt"})
+
+        assert key1 == key2
+        assert key1 != key3
+
+
+class TestStoreAndRestore:
+    def test_restore_misses_on_empty_cache(
+        self, cache: BuildCache, solution_dir: Path, tmp_path: Path
+    ):
+        log = tmp_path / "compiler.log"
+
+        assert cache.restore("ab" * 32, str(solution_dir), str(log)) is False
+
+    def test_roundtrip_restores_artifacts_and_compiler_output(
+        self, cache: BuildCache, solution_dir: Path, tmp_path: Path
+    ):
+        (solution_dir / "main").write_bytes(b"binary")
+        (solution_dir / "main").chmod(0o755)
+        (solution_dir / "pkg").mkdir()
+        (solution_dir / "pkg" / "Helper.class").write_bytes(b"class")
+        log = tmp_path / "compiler.log"
+        log.write_text("warning: unused variable")
+        key = compute_key(cache, solution_dir)
+
+        cache.store(key, str(solution_dir), str(log), exclude=["main.c"])
+
+        fresh_dir = tmp_path / "fresh"
+        fresh_dir.mkdir()
+        restored_log = tmp_path / "restored.log"
+        assert cache.restore(key, str(fresh_dir), str(restored_log)) is True
+        assert (fresh_dir / "main").read_bytes() == b"binary"
+        assert os.access(fresh_dir / "main", os.X_OK)
+        assert (fresh_dir / "pkg" / "Helper.class").read_bytes() == b"class"
+        assert not (fresh_dir / "main.c").exists()
+        assert restored_log.read_text() == "warning: unused variable"
+
+    def test_cached_artifacts_are_independent_of_the_solution(
+        self, cache: BuildCache, solution_dir: Path, tmp_path: Path
+    ):
+        (solution_dir / "main").write_bytes(b"binary")
+        log = tmp_path / "compiler.log"
+        log.write_text("")
+        key = compute_key(cache, solution_dir)
+        cache.store(key, str(solution_dir), str(log), exclude=["main.c"])
+
+        # Overwriting the artifact in place must not corrupt the cache entry.
+        with open(solution_dir / "main", "wb") as f:
+            f.write(b"changed")
+
+        fresh_dir = tmp_path / "fresh"
+        fresh_dir.mkdir()
+        cache.restore(key, str(fresh_dir), str(tmp_path / "restored.log"))
+        assert (fresh_dir / "main").read_bytes() == b"binary"
+
+    def test_eviction_removes_least_recently_used_entries(self, tmp_path: Path):
+        cache = BuildCache(tmp_path / "cache", max_size_bytes=2500)
+        log = tmp_path / "compiler.log"
+        log.write_text("")
+        keys = []
+        for index in range(3):
+            solution_dir = tmp_path / f"solution{index}"
+            solution_dir.mkdir()
+            (solution_dir / "main").write_bytes(b"x" * 1000)
+            key = f"{index:02d}" * 32
+            cache.store(key, str(solution_dir), str(log))
+            os.utime(cache.cache_dir / key[:2] / key / "manifest.json", (index, index))
+            keys.append(key)
+
+        cache.evict()
+
+        fresh_dir = tmp_path / "fresh"
+        fresh_dir.mkdir()
+        restored_log = str(tmp_path / "restored.log")
+        assert cache.restore(keys[0], str(fresh_dir), restored_log) is False
+        assert cache.restore(keys[1], str(fresh_dir), restored_log) is True
+        assert cache.restore(keys[2], str(fresh_dir), restored_log) is True
+
+
+class ArtifactWritingAdapter(BaseSolutionAdapter):
+    """Adapter whose 'compiler' writes an artifact and counts its invocations."""
+
+    def get_compile_command_line(self, testrun: TestRun) -> list[str]:
+        script = (
+            "open('program.bin', 'w').write('compiled'); "
+            "open('../compile_count.txt', 'a').write('x')"
+        )
+        return [sys.executable, "-c", script]
+
+
+class TestAdapterIntegration:
+    def test_second_grading_run_restores_from_cache(self, tmp_path: Path, solution_dir: Path):
+        problem = Problem(name="main", root_dir=str(tmp_path))
+        problem.config = ProblemConfig()
+        problem.config.build_cache.enabled = True
+        problem.config.build_cache_dir = str(tmp_path / "cache")
+        problem.config.report_output_dir = str(tmp_path / "reports")
+        testcase = TestCase(problem, "01", str(tmp_path / "01.in"), str(tmp_path / "01.out"))
+        solution = Solution(problem, "alice", str(solution_dir), [str(solution_dir / "main.c")])
+
+        for _ in range(2):
+            # Simulate a fresh checkout of the solution for every grading run.
+            (solution_dir / "program.bin").unlink(missing_ok=True)
+            adapter = ArtifactWritingAdapter(solution)
+            adapter.prepare()
+            adapter.compile(adapter.create_testrun(testcase))
+
+            assert adapter.is_compiled
+            assert (solution_dir / "program.bin").read_text() == "compiled"
+
+        assert (tmp_path / "compile_count.txt").read_text() == "x"
@@ -3,29 +3,54 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
 import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
 from hammurabi.exceptions import VerifierCreationError
 from hammurabi.grader import adapters
+from hammurabi.grader import discovery
+from hammurabi.grader import grader
 from hammurabi.grader.adapters.base import BaseSolutionAdapter
+from hammurabi.grader.admission import AdmissionController
 from hammurabi.grader.config import GraderConfig
 from hammurabi.grader.config import ProblemConfig
+from hammurabi.grader.grader import GradingSession
+from hammurabi.grader.grader import _apply_locations_to_config
 from hammurabi.grader.grader import _create_adapter
 from hammurabi.grader.grader import _create_verifier
 from hammurabi.grader.grader import _fill_testruns_for_missing_solutions
 from hammurabi.grader.grader import _generate_reports
 from hammurabi.grader.grader import _get_scope
+from hammurabi.grader.grader import _judge_scope
 from hammurabi.grader.grader import _read_config
+from hammurabi.grader.grader import grade_async
 from hammurabi.grader.grader import judge_solution
+from hammurabi.grader.journal import Journal
+from hammurabi.grader.metrics import GraderMetrics
+from hammurabi.grader.model import JUDGE_PHASES
+from hammurabi.grader.model import GraderJobScope
 from hammurabi.grader.model import Problem
 from hammurabi.grader.model import Solution
 from hammurabi.grader.model import TestCase
 from hammurabi.grader.model import TestRun
 from hammurabi.grader.model import TestRunCorrectAnswerResult
 from hammurabi.grader.model import TestRunSolutionMissingResult
+from hammurabi.grader.resultcache import ResultCache
+from hammurabi.grader.resultstore import ResultStore
+from hammurabi.grader.runners import affinity
+from hammurabi.grader.runners import subproc
+from hammurabi.grader.runners.affinity import CoreAllocator
 
 
 @pytest.fixture
@@ -62,6 +87,21 @@ def sample_testcase(sample_problem: Problem) -> TestCase:
     )
 
 
+@pytest.fixture
+def python_hworld_problem(tmp_path: Path) -> Problem:
+    """Discover the 'hworld' fixture problem with only its Python solution."""
+    source_dir = Path(__file__).parent / "fixtures" / "problems_for_language_tests" / "hworld"
+    problem_root = tmp_path / "problems"
+    shutil.copytree(source_dir, problem_root / "hworld")
+
+    config = GraderConfig()
+    config.problem_root_dir = str(problem_root)
+    config.report_output_dir = str(tmp_path / "reports")
+    problem = discovery.discover_problems(config)[0]
+    problem.solutions = [s for s in problem.solutions if s.author == "peter-python"]
+    return problem
+
+
 @pytest.fixture
 def sample_testrun(sample_solution: Solution, sample_testcase: TestCase) -> TestRun:
     """Create a sample test run for testing."""
@@ -112,6 +152,31 @@ class TestReadConfig:
             _read_config(args)
 
 
+class TestApplyLocationsToConfig:
+    """Tests for the _apply_locations_to_config function."""
+
+    def test_resume_reuses_report_directory(self, tmp_path: Path):
+        """Resuming should keep the existing report directory and its contents."""
+        report_dir = tmp_path / "reports" / "testrun"
+        report_dir.mkdir(parents=True)
+        (report_dir / "journal.jsonl").write_text("")
+        config = GraderConfig()
+        config.locations.report_root = str(tmp_path / "reports")
+
+        _apply_locations_to_config(config, resume_dir=str(report_dir))
+
+        assert config.report_output_dir == str(report_dir.resolve())
+        assert (report_dir / "journal.jsonl").exists()
+
+    def test_resume_requires_journal(self, tmp_path: Path):
+        """Resuming from a directory without a journal should fail."""
+        config = GraderConfig()
+        config.locations.report_root = str(tmp_path / "reports")
+
+        with pytest.raises(OSError, match="Cannot resume grading"):
+            _apply_locations_to_config(config, resume_dir=str(tmp_path))
+
+
 class TestGetScope:
     """Tests for the _get_scope function."""
 
@@ -334,6 +399,30 @@ class TestFillTestrunsForMissingSolutions:
         assert result == []
 
 
+class CountingAdmissionController(AdmissionController):
+    """Admission controller that records the largest number of runs admitted at once."""
+
+    def __init__(self, memory_budget_mb: int) -> None:
+        super().__init__(memory_budget_mb)
+        self.active = 0
+        self.max_active = 0
+        self._counter_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def admit(self, testrun: TestRun) -> Iterator[None]:
+        with super().admit(testrun):
+            with self._counter_lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            # Keep the run admitted long enough for the other workers to try to start.
+            time.sleep(0.05)
+            try:
+                yield
+            finally:
+                with self._counter_lock:
+                    self.active -= 1
+
+
 class TestJudgeSolution:
     """Tests for the judge_solution function."""
 
@@ -358,16 +447,384 @@ class TestJudgeSolution:
 
         assert isinstance(result, list)
 
+    def test_parallel_jobs_return_testruns_in_testcase_order(self, python_hworld_problem: Problem):
+        """Parallel judging should preserve the order of the test cases."""
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases
+
+        result = judge_solution(solution, testcases, GradingSession(jobs=4))
+
+        assert [testrun.testcase.name for testrun in result] == [tc.name for tc in testcases]
+        assert all(testrun.result is not None for testrun in result)
+        assert all(testrun.result.status_code == "C" for testrun in result)
+
+    def test_parallel_jobs_respect_admission_budget(self, python_hworld_problem: Problem):
+        """Runs whose memory limits don't fit into the budget together should run one by one."""
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases
+        memory_limit = python_hworld_problem.config.limits.memory
+        admission = CountingAdmissionController(memory_budget_mb=memory_limit * 3 // 2)
+
+        result = judge_solution(solution, testcases, GradingSession(jobs=4, admission=admission))
+
+        assert all(testrun.result.status_code == "C" for testrun in result)
+        assert admission.max_active == 1
+
+    def test_borderline_testruns_are_rerun(self, python_hworld_problem: Problem):
+        """A run close to the time limit should be re-run, and all attempts recorded."""
+        solution = python_hworld_problem.solutions[0]
+        limits = python_hworld_problem.config.limits
+        # Every run of the solution lands in the band below or just above the limit.
+        limits.time.python = 0.05
+        limits.borderline_band = 10.0
+        limits.borderline_reruns = 2
+
+        [testrun] = judge_solution(solution, python_hworld_problem.testcases[:1])
+
+        attempts = testrun.data["attempts"]
+        assert len(attempts) == 3
+        assert testrun.data["min_time_ns"] == testrun.wall_time_ns
+        assert testrun.data["min_time_ns"] <= testrun.data["median_time_ns"]
+        assert testrun.result is not None
+        assert testrun.result.status_code == min(attempts, key=lambda a: a["time_ns"])["result"]
+        # Only the output of the attempt that decides the outcome is kept.
+        assert testrun.stdout_filename is not None
+        stdout_path = Path(testrun.stdout_filename)
+        assert [p.name for p in stdout_path.parent.glob("01*.stdout")] == [stdout_path.name]
+
+    def test_testruns_record_phase_times(self, python_hworld_problem: Problem):
+        """Every phase of judging a test run should be timed, and nested within its run."""
+        solution = python_hworld_problem.solutions[0]
+
+        [testrun] = judge_solution(
+            solution,
+            python_hworld_problem.testcases[:1],
+            GradingSession(admission=AdmissionController(memory_budget_mb=4096)),
+        )
+
+        phase_times_ns = testrun.data["phase_times_ns"]
+        assert set(phase_times_ns) == set(JUDGE_PHASES)
+        assert phase_times_ns["judge"] >= phase_times_ns["run"] + phase_times_ns["verify"]
+        assert phase_times_ns["run"] >= (
+            phase_times_ns["work_dir"]
+            + phase_times_ns["supply_testcase"]
+            + phase_times_ns["execute"]
+            + phase_times_ns["collect_output"]
+        )
+
+    def test_traced_testruns_record_compile_run_and_verify_spans(
+        self, python_hworld_problem: Problem, tmp_path: Path
+    ):
+        """A traced grading run should have spans of compiling, running and verifying."""
+        solution = python_hworld_problem.solutions[0]
+        trace_path = tmp_path / "trace.json"
+
+        with grader.tracing.tracing_to(str(trace_path)):
+            judge_solution(solution, python_hworld_problem.testcases[:2], GradingSession(jobs=2))
+
+        events = json.loads(trace_path.read_text())["traceEvents"]
+        span_names = sorted(event["name"] for event in events if event["ph"] == "X")
+        assert span_names == [
+            "compile hworld/peter-python",
+            "run hworld/peter-python/01",
+            "run hworld/peter-python/02",
+            "verify hworld/peter-python/01",
+            "verify hworld/peter-python/02",
+        ]
+
+    def test_judged_testruns_are_recorded_in_metrics(self, python_hworld_problem: Problem):
+        """The metrics should count the test runs and their latencies, with none left queued."""
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases[:2]
+        metrics = GraderMetrics()
+        scope = GraderJobScope({python_hworld_problem: {solution: testcases}})
+
+        _judge_scope(scope, [], GradingSession(jobs=2, metrics=metrics))
+
+        assert metrics.testruns.get("C", "python") == 2
+        assert metrics.run_duration.get_count("python") == 2
+        assert metrics.compile_duration.get_count("python") == 1
+        assert metrics.queued_testruns.get() == 0
+        assert metrics.active_testruns.get() == 0
+
+    def test_repeated_testruns_record_time_samples(self, python_hworld_problem: Problem):
+        """With repeat, a correct run should be measured again and the repetitions cleaned up."""
+        solution = python_hworld_problem.solutions[0]
+
+        [testrun] = judge_solution(
+            solution, python_hworld_problem.testcases[:1], GradingSession(repeat=3)
+        )
+
+        assert testrun.result is not None
+        assert testrun.result.status_code == "C"
+        repeat = testrun.data["repeat"]
+        assert len(repeat["samples_ns"]) == 3
+        assert repeat["samples_ns"][0] == testrun.wall_time_ns
+        assert repeat["ci_low_ns"] == repeat["min_ns"] <= repeat["median_ns"]
+        assert testrun.answer_filename is not None
+        output_dir = Path(testrun.answer_filename).parent
+        assert not [path for path in output_dir.iterdir() if ".attempt" in path.name]
+
+    def test_testruns_do_not_touch_solution_directory(self, python_hworld_problem: Problem):
+        """Solutions should run in a private working directory, not in their root directory."""
+        solution = python_hworld_problem.solutions[0]
+        assert solution.root_dir is not None
+        files_before = sorted(Path(solution.root_dir).iterdir())
+
+        result = judge_solution(solution, python_hworld_problem.testcases[:2])
+
+        assert all(testrun.result.status_code == "C" for testrun in result)
+        assert all(testrun.work_dir != solution.root_dir for testrun in result)
+        assert sorted(Path(solution.root_dir).iterdir()) == files_before
+
+    def test_parallel_jobs_clean_up_working_directories(self, python_hworld_problem: Problem):
+        """Parallel test runs should not leave their working directories behind."""
+        solution = python_hworld_problem.solutions[0]
+
+        result = judge_solution(solution, python_hworld_problem.testcases, GradingSession(jobs=3))
+
+        assert all(testrun.work_dir is not None for testrun in result)
+        assert not any(Path(testrun.work_dir).exists() for testrun in result)
+        assert solution.root_dir is not None
+        assert not (Path(solution.root_dir) / "hworld.in").exists()
+
+    def test_result_cache_reruns_only_changed_testcases(
+        self, python_hworld_problem: Problem, tmp_path: Path
+    ):
+        """With a result cache, only test runs whose inputs changed should be executed."""
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases[:3]
+        session = GradingSession(result_cache=ResultCache(tmp_path / "results"))
+
+        first = judge_solution(solution, testcases, session)
+        Path(testcases[1].input_filename).write_text("changed input")
+        second = judge_solution(solution, testcases, session)
+
+        assert not any(testrun.data.get("cached") for testrun in first)
+        assert [bool(testrun.data.get("cached")) for testrun in second] == [True, False, True]
+        assert second[0].result == first[0].result
+        assert second[0].get_lean_elapsed_milliseconds() == first[0].get_lean_elapsed_milliseconds()
+        assert Path(second[0].answer_filename or "").exists()
+
+    def test_journaled_testruns_are_restored_instead_of_executed(
+        self, python_hworld_problem: Problem, tmp_path: Path
+    ):
+        """Resuming with a journal should only execute the test runs it doesn't contain."""
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases[:3]
+        journal_path = tmp_path / "journal.jsonl"
+
+        interrupted = judge_solution(
+            solution, testcases[:2], GradingSession(journal=Journal(journal_path))
+        )
+        resumed = judge_solution(solution, testcases, GradingSession(journal=Journal(journal_path)))
+
+        assert [bool(testrun.data.get("resumed")) for testrun in resumed] == [True, True, False]
+        assert resumed[0].result == interrupted[0].result
+        assert resumed[1].judge_start_time == interrupted[1].judge_start_time
+        assert len(Journal(journal_path)) == 3
+
+
+class MarkerCompilingPythonAdapter(adapters.registered_adapters["python"]):  # type: ignore[misc]
+    """Python adapter with a 'compile' step that leaves a marker file in the solution directory."""
+
+    def get_compile_command_line(self, testrun: TestRun) -> list[str]:
+        return [sys.executable, "-c", "open('compiled.marker', 'w').close()"]
+
+
+class TestJudgeScope:
+    """Tests for the _judge_scope function."""
+
+    @pytest.fixture
+    def two_solution_scope(self, python_hworld_problem: Problem) -> GraderJobScope:
+        """Build a scope with two copies of the Python solution."""
+        peter = python_hworld_problem.solutions[0]
+        assert peter.root_dir is not None
+        paul_root_dir = Path(peter.root_dir).parent / "paul-python"
+        shutil.copytree(peter.root_dir, paul_root_dir)
+        paul = Solution(
+            python_hworld_problem,
+            "paul-python",
+            str(paul_root_dir),
+            [str(paul_root_dir / Path(f).name) for f in peter.files],
+            language=peter.language,
+        )
+        testcases = python_hworld_problem.testcases[:2]
+        return GraderJobScope({python_hworld_problem: {peter: testcases, paul: testcases}})
+
+    def test_judges_all_solutions_in_order(self, two_solution_scope: GraderJobScope):
+        """Test runs should be grouped by solution, in the order of the scope."""
+        testruns: list[TestRun] = []
+
+        _judge_scope(two_solution_scope, testruns, GradingSession(compile_jobs=2))
+
+        assert [(tr.solution.author, tr.testcase.name) for tr in testruns] == [
+            ("peter-python", "01"),
+            ("peter-python", "02"),
+            ("paul-python", "01"),
+            ("paul-python", "02"),
+        ]
+        assert all(tr.result is not None and tr.result.status_code == "C" for tr in testruns)
+
+    def test_next_solution_compiles_while_current_one_runs(
+        self, two_solution_scope: GraderJobScope, monkeypatch: pytest.MonkeyPatch
+    ):
+        """The compile stage should run ahead of the solution being judged."""
+        monkeypatch.setattr(grader, "_create_adapter", MarkerCompilingPythonAdapter)
+        solutions = list(next(iter(two_solution_scope.tasks.values())))
+        next_solution_marker = Path(solutions[1].root_dir or "") / "compiled.marker"
+        compiled_ahead: list[bool] = []
+        original_judge_solution = grader.judge_solution
+
+        def judge_solution_and_wait_for_next(*args, **kwargs):
+            if not compiled_ahead:
+                deadline = time.monotonic() + 10
+                while not next_solution_marker.exists() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                compiled_ahead.append(next_solution_marker.exists())
+            return original_judge_solution(*args, **kwargs)
+
+        monkeypatch.setattr(grader, "judge_solution", judge_solution_and_wait_for_next)
+        testruns: list[TestRun] = []
+
+        _judge_scope(two_solution_scope, testruns, GradingSession(compile_jobs=1))
+
+        assert compiled_ahead == [True]
+        assert len(testruns) == 4
+
+    @pytest.mark.skipif(not affinity.CAN_PIN_CPU_CORES, reason="sched_setaffinity is not available")
+    def test_unpinned_problem_runs_on_all_cpus_of_pinned_grader(
+        self, python_hworld_problem: Problem, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Only the solutions of problems with pinning should be confined to a single core."""
+        problem_root = tmp_path / "problems"
+        shutil.copytree(problem_root / "hworld", problem_root / "hworld-pinned")
+        config = GraderConfig()
+        config.problem_root_dir = str(problem_root)
+        config.report_output_dir = str(tmp_path / "reports")
+        pinned_problem = next(
+            p for p in discovery.discover_problems(config) if p.name == "hworld-pinned"
+        )
+        pinned_problem.solutions = [
+            s for s in pinned_problem.solutions if s.author == "peter-python"
+        ]
+        pinned_problem.config.limits.pin_cpu_cores = True
+
+        # Simulate a grader with four single-CPU cores, whose threads inherit its affinity.
+        all_cpus = {0, 1, 2, 3}
+        inherited_cpus = [all_cpus]
+        cpus_by_thread: dict[int, set[int]] = {}
+
+        def get_affinity(thread_id: int) -> set[int]:
+            return set(
+                cpus_by_thread.get(thread_id or threading.get_native_id(), inherited_cpus[0])
+            )
+
+        def set_affinity(thread_id: int, cpus: set[int]) -> None:
+            if thread_id not in (0, threading.get_native_id()):
+                inherited_cpus[0] = set(cpus)
+            cpus_by_thread[thread_id or threading.get_native_id()] = set(cpus)
+
+        spawned_cpus: list[tuple[str, set[int]]] = []
+
+        class RecordingPopen(subprocess.Popen):
+            def __init__(self, args, *popen_args, **kwargs):
+                spawned_cpus.append((" ".join(map(str, args)), get_affinity(0)))
+                super().__init__(args, *popen_args, **kwargs)
+
+        allocator = CoreAllocator([[0], [1], [2], [3]])
+        monkeypatch.setattr(affinity, "get_core_allocator", lambda: allocator)
+        monkeypatch.setattr(subproc, "get_core_allocator", lambda: allocator)
+        monkeypatch.setattr(affinity, "_grader_cpus", None)
+        monkeypatch.setattr(os, "sched_getaffinity", get_affinity)
+        monkeypatch.setattr(os, "sched_setaffinity", set_affinity)
+        monkeypatch.setattr(subprocess, "Popen", RecordingPopen)
+        testcases = python_hworld_problem.testcases[:1]
+        scope = GraderJobScope(
+            {
+                python_hworld_problem: {python_hworld_problem.solutions[0]: testcases},
+                pinned_problem: {pinned_problem.solutions[0]: testcases},
+            }
+        )
+
+        grader._pin_grader(list(scope.tasks))
+        _judge_scope(scope, [], GradingSession(jobs=2))
+
+        assert get_affinity(0) == {0}
+        assert [cpus for cmd, cpus in spawned_cpus if "hworld-pinned" in cmd] == [{1}]
+        assert [cpus for cmd, cpus in spawned_cpus if "hworld-pinned" not in cmd] == [all_cpus]
+
+
+class TestGradeAsync:
+    """Tests for the grade_async function."""
+
+    @staticmethod
+    async def collect(scope: GraderJobScope, session: GradingSession) -> list[TestRun]:
+        return [testrun async for testrun in grade_async(scope, session)]
+
+    def test_yields_all_testruns(self, python_hworld_problem: Problem, tmp_path: Path):
+        """Every test run of the scope should be yielded once and written to the result store."""
+        python_hworld_problem.config.runner.name = "AsyncSubprocessSolutionRunner"
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases
+        scope = GraderJobScope({python_hworld_problem: {solution: testcases}})
+        result_store = ResultStore(tmp_path / "testruns.db")
+        session = GradingSession(jobs=4, result_store=result_store)
+
+        testruns = asyncio.run(self.collect(scope, session))
+
+        assert sorted(tr.testcase.name for tr in testruns) == sorted(tc.name for tc in testcases)
+        assert all(tr.result is not None and tr.result.status_code == "C" for tr in testruns)
+        assert len(result_store.load_testruns()) == len(testcases)
+        result_store.close()
+
+    def test_stopping_early_cancels_remaining_testruns(self, python_hworld_problem: Problem):
+        """Closing the iterator should cancel the test runs that haven't finished."""
+        python_hworld_problem.config.runner.name = "AsyncSubprocessSolutionRunner"
+        solution = python_hworld_problem.solutions[0]
+        testcases = python_hworld_problem.testcases
+        scope = GraderJobScope({python_hworld_problem: {solution: testcases}})
+
+        async def take_first() -> TestRun:
+            testruns = grade_async(scope, GradingSession(jobs=1))
+            testrun = await anext(testruns)
+            await testruns.aclose()
+            return testrun
+
+        testrun = asyncio.run(take_first())
+
+        assert testrun.result is not None
+        assert testrun.result.status_code == "C"
+
 
 class TestGenerateReports:
     """Tests for the _generate_reports function."""
 
-    def test_creates_pickle_file(self, tmp_path: Path, sample_testrun: TestRun):
-        """Should create pickle file."""
+    @staticmethod
+    def generate_reports(config: GraderConfig, testruns: list[TestRun]) -> None:
+        """Store the test runs in a result store and generate the reports from it."""
+        with contextlib.closing(
+            ResultStore(Path(config.report_output_dir) / "testruns.db")
+        ) as result_store:
+            result_store.add_testruns(testruns)
+            _generate_reports(config, result_store)
+
+    def test_does_not_create_pickle_file_by_default(self, tmp_path: Path, sample_testrun: TestRun):
+        """The pickle export should be opt-in."""
         config = GraderConfig()
         config.report_output_dir = str(tmp_path)
 
-        _generate_reports(config, [sample_testrun])
+        self.generate_reports(config, [sample_testrun])
+
+        assert not (tmp_path / "testruns.pickle").exists()
+
+    def test_creates_pickle_file_when_enabled(self, tmp_path: Path, sample_testrun: TestRun):
+        """Should create pickle file when the export is enabled."""
+        config = GraderConfig()
+        config.report_output_dir = str(tmp_path)
+        config.reporting.export_pickle = True
+
+        self.generate_reports(config, [sample_testrun])
 
         assert (tmp_path / "testruns.pickle").exists()
 
@@ -376,7 +833,7 @@ class TestGenerateReports:
         config = GraderConfig()
         config.report_output_dir = str(tmp_path)
 
-        _generate_reports(config, [sample_testrun])
+        self.generate_reports(config, [sample_testrun])
 
         assert (tmp_path / "testruns.csv").exists()
 
@@ -385,20 +842,30 @@ class TestGenerateReports:
         config = GraderConfig()
         config.report_output_dir = str(tmp_path)
 
-        _generate_reports(config, [sample_testrun])
+        self.generate_reports(config, [sample_testrun])
 
         assert (tmp_path / "report-full.html").exists()
         assert (tmp_path / "report-matrix.html").exists()
         assert (tmp_path / "report-heatmap.html").exists()
 
+    def test_reports_are_generated_from_result_store(self, tmp_path: Path, sample_testrun: TestRun):
+        """Reports should include the test runs stored by earlier batches."""
+        config = GraderConfig()
+        config.report_output_dir = str(tmp_path)
+
+        self.generate_reports(config, [sample_testrun])
+
+        csv_content = (tmp_path / "testruns.csv").read_text()
+        assert "test_author" in csv_content
+
     def test_handles_empty_testruns_list(self, tmp_path: Path):
         """Should handle empty testruns list gracefully."""
         config = GraderConfig()
         config.report_output_dir = str(tmp_path)
 
         # Should not raise an exception
-        _generate_reports(config, [])
+        self.generate_reports(config, [])
 
         # Files should still be created (possibly empty)
-        assert (tmp_path / "testruns.pickle").exists()
+        assert (tmp_path / "testruns.db").exists()
         assert (tmp_path / "testruns.csv").exists()
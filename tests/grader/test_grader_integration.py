@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-import pickle
+import contextlib
 import subprocess
 from pathlib import Path
 
+from hammurabi.grader.resultstore import ResultStore
+
 
 class TestGraderIntegration:
     """Integration tests that run the full grading process."""
@@ -21,11 +23,11 @@ class TestGraderIntegration:
 
         assert exitcode == 0, "Grader terminated with non-zero exit code."
 
-        testrun_pickle_file = Path(report_dir_path) / "testrun" / "testruns.pickle"
-        assert testrun_pickle_file.exists(), "Pickled testrun file not found."
+        result_store_file = Path(report_dir_path) / "testrun" / "testruns.db"
+        assert result_store_file.exists(), "Result store not found."
 
-        with open(testrun_pickle_file, "rb") as pickle_file:
-            testruns = pickle.load(pickle_file)
+        with contextlib.closing(ResultStore(result_store_file)) as result_store:
+            testruns = result_store.load_testruns()
 
         expected_testrun_length = 70
         assert len(testruns) == expected_testrun_length, (
@@ -56,11 +58,11 @@ class TestGraderIntegration:
 
         assert exitcode == 0, "Grader terminated with non-zero exit code."
 
-        testrun_pickle_file = Path(report_dir_path) / "testrun" / "testruns.pickle"
-        assert testrun_pickle_file.exists(), "Pickled testrun file not found."
+        result_store_file = Path(report_dir_path) / "testrun" / "testruns.db"
+        assert result_store_file.exists(), "Result store not found."
 
-        with open(testrun_pickle_file, "rb") as pickle_file:
-            testruns = pickle.load(pickle_file)
+        with contextlib.closing(ResultStore(result_store_file)) as result_store:
+            testruns = result_store.load_testruns()
 
         expected_results_for_author = {
             "charlie-cpp-w": "W",
@@ -0,0 +1,84 @@
+"""Tests for the journal of finished test runs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+from hammurabi.grader.journal import Journal
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunTimeoutResult
+
+
+def test_new_journal_is_empty(tmp_path: Path):
+    journal = Journal(tmp_path / "journal.jsonl")
+
+    assert len(journal) == 0
+
+
+def test_appended_testruns_survive_reopening(
+    problem: Problem, make_testrun: Callable[..., TestRun], tmp_path: Path
+):
+    testrun = make_testrun(problem, "alice", 0)
+    testrun.result = TestRunTimeoutResult(timeout=1.0)
+    testrun.judge_start_time, testrun.judge_end_time = 100, 1300
+    Journal(tmp_path / "journal.jsonl").append(testrun)
+
+    journal = Journal(tmp_path / "journal.jsonl")
+    restored = make_testrun(problem, "alice", 0)
+
+    assert len(journal) == 1
+    assert journal.contains(problem.testcases[0], "alice")
+    assert not journal.contains(problem.testcases[1], "alice")
+    assert not journal.contains(problem.testcases[0], "bob")
+    assert journal.restore(restored) is True
+    assert restored.result == testrun.result
+    assert restored.get_judge_elapsed_milliseconds() == 1200
+
+
+def test_restore_returns_false_for_unknown_testrun(
+    problem: Problem, make_testrun: Callable[..., TestRun], tmp_path: Path
+):
+    journal = Journal(tmp_path / "journal.jsonl")
+
+    assert journal.restore(make_testrun(problem, "alice", 1)) is False
+
+
+def test_incomplete_last_line_is_ignored(
+    problem: Problem, make_testrun: Callable[..., TestRun], tmp_path: Path
+):
+    journal_path = tmp_path / "journal.jsonl"
+    testrun = make_testrun(problem, "alice", 0)
+    testrun.result = TestRunCorrectAnswerResult(score=1)
+    Journal(journal_path).append(testrun)
+    with open(journal_path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"problem": "problem", "author": "bob", "test')
+
+    journal = Journal(journal_path)
+
+    assert len(journal) == 1
+    assert not journal.contains(problem.testcases[0], "bob")
+
+
+def test_resuming_twice_after_crash_mid_write_keeps_all_entries(
+    problem: Problem, make_testrun: Callable[..., TestRun], tmp_path: Path
+):
+    journal_path = tmp_path / "journal.jsonl"
+    first_testrun = make_testrun(problem, "alice", 0)
+    first_testrun.result = TestRunCorrectAnswerResult(score=1)
+    Journal(journal_path).append(first_testrun)
+    with open(journal_path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"problem": "problem", "author": "bob", "test')
+
+    resumed = Journal(journal_path)
+    for author in ["bob", "carol"]:
+        testrun = make_testrun(problem, author, 0)
+        testrun.result = TestRunCorrectAnswerResult(score=1)
+        resumed.append(testrun)
+
+    journal = Journal(journal_path)
+
+    assert len(journal) == 3
+    assert all(journal.contains(problem.testcases[0], a) for a in ["alice", "bob", "carol"])
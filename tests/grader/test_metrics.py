@@ -0,0 +1,84 @@
+"""Tests for the Prometheus metrics of the grading runs."""
+
+from __future__ import annotations
+
+import urllib.request
+from collections.abc import Callable
+from pathlib import Path
+
+from hammurabi.grader.metrics import Counter
+from hammurabi.grader.metrics import GraderMetrics
+from hammurabi.grader.metrics import Histogram
+from hammurabi.grader.metrics import MetricsExporter
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunWrongAnswerResult
+
+
+def test_counter_renders_labeled_values():
+    counter = Counter("testruns_total", "Test runs.", ("status", "language"))
+    counter.inc("C", "python")
+    counter.inc("C", "python")
+    counter.inc("W", 'c"')
+
+    assert counter.render() == [
+        "# HELP testruns_total Test runs.",
+        "# TYPE testruns_total counter",
+        'testruns_total{status="C",language="python"} 2',
+        'testruns_total{status="W",language="c\\""} 1',
+    ]
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("run_seconds", "Run time.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(2.5)
+
+    assert histogram.render()[2:] == [
+        'run_seconds_bucket{le="0.1"} 1',
+        'run_seconds_bucket{le="1"} 2',
+        'run_seconds_bucket{le="+Inf"} 3',
+        "run_seconds_sum 3.05",
+        "run_seconds_count 3",
+    ]
+
+
+def test_observe_testrun_skips_timings_of_cached_testrun(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+):
+    metrics = GraderMetrics()
+    testrun = make_testrun(problem, language="python", result=TestRunCorrectAnswerResult())
+    testrun.wall_time_ns = 20_000_000
+    cached_testrun = make_testrun(problem, language="python", result=TestRunWrongAnswerResult())
+    cached_testrun.data["cached"] = True
+
+    metrics.observe_testrun(testrun)
+    metrics.observe_testrun(cached_testrun)
+
+    assert metrics.testruns.get("C", "python") == 1
+    assert metrics.testruns.get("W", "python") == 1
+    assert metrics.run_duration.get_count("python") == 1
+    assert metrics.judge_overhead.get_count() == 1
+
+
+def test_exporter_writes_textfile_and_serves_metrics(tmp_path: Path):
+    metrics = GraderMetrics()
+    textfile = tmp_path / "textfile" / "hammurabi.prom"
+    exporter = MetricsExporter(metrics, textfile=textfile, write_interval=60, http_port=0)
+
+    exporter.start()
+    try:
+        assert "hammurabi_queued_testruns 0" in textfile.read_text()
+        metrics.queued_testruns.inc(amount=5)
+        address = exporter.get_http_address()
+        assert address is not None
+        with urllib.request.urlopen(f"http://{address[0]}:{address[1]}/metrics") as response:
+            assert "hammurabi_queued_testruns 5" in response.read().decode()
+    finally:
+        exporter.stop()
+
+    # The final metrics are written when the exporter stops.
+    assert "hammurabi_queued_testruns 5" in textfile.read_text()
+    assert [path.name for path in textfile.parent.iterdir()] == ["hammurabi.prom"]
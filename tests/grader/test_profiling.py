@@ -0,0 +1,27 @@
+"""Tests for the profiles of the grader."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+from pathlib import Path
+
+from hammurabi.grader.profiling import write_profile
+
+
+def busy_function() -> int:
+    return sum(i * i for i in range(10_000))
+
+
+def test_write_profile_writes_stats_and_hotspots(tmp_path: Path):
+    with cProfile.Profile() as profiler:
+        busy_function()
+
+    profile_path, hotspots_path = write_profile(profiler, tmp_path, hotspot_count=5)
+
+    # The dump loads back as a profile.
+    pstats.Stats(str(profile_path))
+    hotspots = hotspots_path.read_text()
+    assert "busy_function" in hotspots
+    assert "internal time" in hotspots
+    assert "cumulative time" in hotspots
@@ -30,6 +30,7 @@ from hammurabi.grader.reporting import format_timestamp
 from hammurabi.grader.reporting import format_timestamp_micro
 from hammurabi.grader.reporting import generate_testrun_log_csv
 from hammurabi.grader.reporting import get_contextual_style_by_result
+from hammurabi.grader.reporting import get_heatmap_time_milliseconds
 from hammurabi.grader.reporting import get_jinja_environment
 from hammurabi.grader.reporting import heat_color_for_percentile
 from hammurabi.grader.reporting import is_correct_answer
@@ -315,6 +316,22 @@ class TestAdjustTimeForLanguage:
         assert result == 40.0
 
 
+class TestGetHeatmapTimeMilliseconds:
+    """Tests for get_heatmap_time_milliseconds function."""
+
+    def test_single_run_uses_solution_time(self, sample_testrun: TestRun):
+        """A test run measured once should be shown with its solution time."""
+        assert get_heatmap_time_milliseconds(sample_testrun) == (
+            sample_testrun.get_lean_elapsed_milliseconds()
+        )
+
+    def test_repeated_run_uses_median_sample(self, sample_testrun: TestRun):
+        """A test run measured repeatedly should be shown with the median of its samples."""
+        sample_testrun.data["repeat"] = {"median_ns": 12_500_000}
+
+        assert get_heatmap_time_milliseconds(sample_testrun) == 12.5
+
+
 class TestPercentile:
     """Tests for percentile function."""
 
@@ -466,6 +483,100 @@ class TestGenerateTestrunLogCsv:
         assert rows[0]["solution_author"] == "test_author"
         assert rows[0]["result_status"] == "C"
 
+    def test_csv_contains_wall_and_cpu_times(self, tmp_path: Path, sample_testrun: TestRun):
+        """CSV file should contain the wall and CPU times in milliseconds."""
+        sample_testrun.wall_time_ns = 12_345_678
+        sample_testrun.cpu_user_time_ns = 10_000_000
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["wall_time"] == "12.346"
+        assert rows[0]["cpu_user_time"] == "10.000"
+        assert rows[0]["cpu_system_time"] == ""
+
+    def test_csv_contains_peak_memory(self, tmp_path: Path, sample_testrun: TestRun):
+        """CSV file should contain the peak memory in megabytes."""
+        sample_testrun.peak_memory_mb = 42
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["peak_memory"] == "42"
+
+    def test_csv_contains_cpu_core(self, tmp_path: Path, sample_testrun: TestRun):
+        """CSV file should contain the CPU core the run was pinned to."""
+        sample_testrun.cpu_core = 5
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["cpu_core"] == "5"
+
+    def test_csv_contains_attempts_of_rerun_testrun(self, tmp_path: Path, sample_testrun: TestRun):
+        """CSV file should contain the number of attempts and their min and median time."""
+        sample_testrun.data["attempts"] = [
+            {"result": "T", "time_ns": 1_050_000_000},
+            {"result": "C", "time_ns": 960_000_000},
+        ]
+        sample_testrun.data["min_time_ns"] = 960_000_000
+        sample_testrun.data["median_time_ns"] = 1_005_000_000
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["attempts"] == "2"
+        assert rows[0]["min_time"] == "960.000"
+        assert rows[0]["median_time"] == "1005.000"
+
+    def test_csv_contains_time_samples_of_repeated_testrun(
+        self, tmp_path: Path, sample_testrun: TestRun
+    ):
+        """CSV file should contain the statistics of the samples of a repeated test run."""
+        sample_testrun.data["repeat"] = {
+            "samples_ns": [12_000_000, 10_000_000, 11_000_000],
+            "median_ns": 11_000_000,
+            "mad_ns": 1_000_000,
+            "min_ns": 10_000_000,
+            "ci_low_ns": 10_000_000,
+            "ci_high_ns": 12_000_000,
+            "confidence": 0.95,
+        }
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["samples"] == "3"
+        assert rows[0]["sample_median_time"] == "11.000"
+        assert rows[0]["sample_mad_time"] == "1.000"
+        assert rows[0]["sample_min_time"] == "10.000"
+        assert rows[0]["sample_ci_low_time"] == "10.000"
+        assert rows[0]["sample_ci_high_time"] == "12.000"
+
+    def test_csv_contains_phase_times(self, tmp_path: Path, sample_testrun: TestRun):
+        """CSV file should contain the time of every timed phase of judging."""
+        sample_testrun.record_phase_time("judge", 3_500_000)
+        sample_testrun.record_phase_time("execute", 2_000_000)
+        filename = str(tmp_path / "testruns.csv")
+        generate_testrun_log_csv([sample_testrun], filename)
+
+        with open(filename) as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows[0]["judge_phase_time"] == "3.500"
+        assert rows[0]["execute_phase_time"] == "2.000"
+        assert rows[0]["verify_phase_time"] == ""
+
     def test_testruns_sorted_by_start_time(self, tmp_path: Path, sample_testrun: TestRun):
         """Test runs should be sorted by start time in CSV."""
         # Create two test runs with different start times
@@ -0,0 +1,130 @@
+"""Tests for the re-runs of borderline test runs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+
+from hammurabi.grader import reruns
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunResult
+from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.model import TestRunWrongAnswerResult
+
+
+@pytest.fixture
+def make_timed_testrun(
+    problem: Problem, make_testrun: Callable[..., TestRun]
+) -> Callable[[TestRunResult, int], TestRun]:
+    """Return a factory of finished test runs with a 1 second time limit, re-run up to twice."""
+    problem.config.limits.time.python = 1.0
+    problem.config.limits.borderline_reruns = 2
+    problem.config.limits.borderline_band = 0.1
+
+    def make(result: TestRunResult, time_ms: int) -> TestRun:
+        testrun = make_testrun(problem, language="python", result=result)
+        testrun.wall_time_ns = time_ms * 1_000_000
+        return testrun
+
+    return make
+
+
+@pytest.mark.parametrize(
+    ("result", "time_ms", "expected"),
+    [
+        (TestRunCorrectAnswerResult(), 500, False),
+        (TestRunCorrectAnswerResult(), 950, True),
+        # A re-run can't change a wrong answer.
+        (TestRunWrongAnswerResult(), 950, False),
+        (TestRunTimeoutResult(timeout=1.0), 1050, True),
+        # Killed at the timeout, which is the end of the band.
+        (TestRunTimeoutResult(timeout=1.0), 1100, False),
+    ],
+)
+def test_is_borderline(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+    result: TestRunResult,
+    time_ms: int,
+    expected: bool,
+):
+    assert reruns.is_borderline(make_timed_testrun(result, time_ms)) is expected
+
+
+def test_is_borderline_uses_cpu_time_with_cpu_clock(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    testrun = make_timed_testrun(TestRunTimeoutResult(timeout=1.0), 3000)
+    testrun.solution.problem.config.limits.time_limit_clock = "cpu"
+    testrun.cpu_user_time_ns, testrun.cpu_system_time_ns = 1_000_000_000, 20_000_000
+
+    assert reruns.get_measured_time_ns(testrun) == 1_020_000_000
+    assert reruns.is_borderline(testrun)
+
+
+def test_testrun_killed_by_cpu_time_limit_is_not_borderline(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    # `RLIMIT_CPU` kills a busy loop within the band past a whole number of seconds.
+    testrun = make_timed_testrun(TestRunTimeoutResult(timeout=1.0), 1030)
+    testrun.solution.problem.config.limits.time_limit_clock = "cpu"
+    testrun.cpu_user_time_ns, testrun.cpu_system_time_ns = 1_000_000_000, 10_000_000
+    testrun.data["killed_at_limit"] = True
+
+    assert not reruns.is_borderline(testrun)
+
+
+def test_testrun_without_measured_time_is_not_borderline(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    testrun = make_timed_testrun(TestRunCorrectAnswerResult(), 0)
+    testrun.wall_time_ns = None
+
+    assert not reruns.is_borderline(testrun)
+
+
+def test_reruns_stop_at_configured_count(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    attempts = [make_timed_testrun(TestRunCorrectAnswerResult(), 990)]
+
+    assert reruns.should_rerun(attempts)
+    attempts.append(make_timed_testrun(TestRunCorrectAnswerResult(), 500))
+    assert not reruns.should_rerun(attempts)
+    attempts.append(make_timed_testrun(TestRunCorrectAnswerResult(), 990))
+    attempts.append(make_timed_testrun(TestRunCorrectAnswerResult(), 990))
+    assert not reruns.should_rerun(attempts)
+
+
+def test_single_attempt_is_picked_as_is(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    testrun = make_timed_testrun(TestRunCorrectAnswerResult(), 500)
+
+    assert reruns.pick_attempt([testrun]) is testrun
+    assert "attempts" not in testrun.data
+
+
+def test_fastest_attempt_is_picked_with_all_attempts_recorded(
+    make_timed_testrun: Callable[[TestRunResult, int], TestRun],
+):
+    attempts = [
+        make_timed_testrun(TestRunTimeoutResult(timeout=1.0), 1050),
+        make_timed_testrun(TestRunCorrectAnswerResult(), 960),
+        make_timed_testrun(TestRunTimeoutResult(timeout=1.0), 1020),
+    ]
+    attempts[0].judge_start_time = 1000
+
+    picked = reruns.pick_attempt(attempts)
+
+    assert picked is attempts[1]
+    assert picked.data["attempts"] == [
+        {"result": "T", "time_ns": 1_050_000_000},
+        {"result": "C", "time_ns": 960_000_000},
+        {"result": "T", "time_ns": 1_020_000_000},
+    ]
+    assert picked.data["min_time_ns"] == 960_000_000
+    assert picked.data["median_time_ns"] == 1_020_000_000
+    assert picked.judge_start_time == 1000
@@ -0,0 +1,126 @@
+"""Tests for the persistent result cache."""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunInternalErrorResult
+from hammurabi.grader.model import TestRunWrongAnswerResult
+from hammurabi.grader.resultcache import ResultCache
+
+RUN_CMD = [sys.executable, "solution.py"]
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResultCache:
+    return ResultCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def testrun(problem: Problem, make_testrun: Callable[..., TestRun]) -> TestRun:
+    """Create a test run with its input and expected answer files."""
+    Path(problem.testcases[0].input_filename).write_text("1 2")
+    Path(problem.testcases[0].correct_answer_filename).write_text("3")
+    return make_testrun(problem, memory_limit=256, time_limit=2.0)
+
+
+class TestComputeFingerprint:
+    def test_fingerprint_is_stable(self, cache: ResultCache, testrun: TestRun):
+        first = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) == first
+
+    def test_fingerprint_changes_with_solution_digest(self, cache: ResultCache, testrun: TestRun):
+        assert cache.compute_fingerprint(testrun, "a", RUN_CMD) != cache.compute_fingerprint(
+            testrun, "b", RUN_CMD
+        )
+
+    def test_fingerprint_changes_with_input(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        Path(testrun.testcase.input_filename).write_text("2 2")
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) != before
+
+    def test_fingerprint_changes_with_expected_answer(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        Path(testrun.testcase.correct_answer_filename).write_text("4")
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) != before
+
+    def test_fingerprint_changes_with_limits(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        testrun.time_limit = 3.0
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) != before
+
+    def test_fingerprint_changes_with_verifier(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        testrun.solution.problem.config.verifier = "FloatSequenceVerifier"
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) != before
+
+    def test_fingerprint_changes_with_runner_config(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        testrun.solution.problem.config.runner.params["memory_limiter"] = "none"
+
+        assert cache.compute_fingerprint(testrun, "digest", RUN_CMD) != before
+
+    def test_fingerprint_changes_with_run_command(self, cache: ResultCache, testrun: TestRun):
+        before = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+
+        assert cache.compute_fingerprint(testrun, "digest", [*RUN_CMD, "-O"]) != before
+
+
+class TestStoreAndRestore:
+    def test_restore_misses_on_empty_cache(self, cache: ResultCache, testrun: TestRun):
+        assert cache.restore("ab" * 32, testrun) is False
+
+    def test_roundtrip_restores_result_timings_and_output_files(
+        self, cache: ResultCache, testrun: TestRun
+    ):
+        testrun.result = TestRunWrongAnswerResult(expected="3", actual="4")
+        testrun.judge_start_time, testrun.lean_start_time = 1000, 1010
+        testrun.lean_end_time, testrun.judge_end_time = 1510, 1520
+        Path(testrun.answer_filename or "").write_text("4")
+        Path(testrun.stdout_filename or "").write_text("debug output")
+        fingerprint = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        cache.store(fingerprint, testrun)
+        for filename in [testrun.answer_filename, testrun.stdout_filename]:
+            Path(filename or "").unlink()
+
+        restored = TestRun(
+            testrun.solution,
+            testrun.testcase,
+            testrun.output_dir,
+            testrun.answer_filename,
+            None,
+            testrun.stdout_filename,
+            testrun.stderr_filename,
+        )
+
+        assert cache.restore(fingerprint, restored) is True
+        assert restored.result == testrun.result
+        assert restored.get_lean_elapsed_milliseconds() == 500
+        assert Path(restored.answer_filename or "").read_text() == "4"
+        assert Path(restored.stdout_filename or "").read_text() == "debug output"
+        assert not Path(restored.stderr_filename or "").exists()
+
+    def test_corrupted_entry_is_a_miss(self, cache: ResultCache, testrun: TestRun):
+        testrun.result = TestRunCorrectAnswerResult()
+        fingerprint = cache.compute_fingerprint(testrun, "digest", RUN_CMD)
+        cache.store(fingerprint, testrun)
+        (cache.cache_dir / fingerprint[:2] / fingerprint / "testrun.json").write_text("{")
+
+        assert cache.restore(fingerprint, testrun) is False
+
+    def test_internal_errors_are_not_cacheable(self, testrun: TestRun):
+        testrun.result = TestRunInternalErrorResult(exception_info="Traceback")
+
+        assert ResultCache.is_cacheable(testrun) is False
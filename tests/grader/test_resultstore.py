@@ -0,0 +1,154 @@
+"""Tests for the SQLite results store."""
+
+from __future__ import annotations
+
+import contextlib
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import Solution
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunResult
+from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.model import TestRunWrongAnswerResult
+from hammurabi.grader.resultstore import ResultStore
+
+
+@pytest.fixture
+def make_finished_testrun(make_testrun: Callable[..., TestRun]) -> Callable[..., TestRun]:
+    """Return a factory of test runs of a solution with their outcome recorded."""
+
+    def make(
+        solution: Solution, testcase_index: int, result: TestRunResult | None = None
+    ) -> TestRun:
+        testrun = make_testrun(
+            solution.problem,
+            testcase_index=testcase_index,
+            solution=solution,
+            memory_limit=256,
+            time_limit=2.0,
+            peak_memory_mb=12,
+            cpu_core=3,
+        )
+        testrun.result = result or TestRunCorrectAnswerResult(score=testrun.testcase.score)
+        testrun.judge_start_time, testrun.lean_start_time = 1000, 1010
+        testrun.lean_end_time, testrun.judge_end_time = 1210, 1220
+        testrun.wall_time_ns, testrun.cpu_user_time_ns = 199_000, 150
+        testrun.cpu_system_time_ns = 40
+        return testrun
+
+    return make
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    with contextlib.closing(ResultStore(tmp_path / "testruns.db")) as store:
+        yield store
+
+
+def test_roundtrip_preserves_testruns(
+    store: ResultStore, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    solution = Solution(problem, "alice", "/solutions/alice", ["/solutions/alice/sum.py"], "python")
+    testruns = [
+        make_finished_testrun(solution, 0),
+        make_finished_testrun(solution, 1, TestRunTimeoutResult(timeout=2.0)),
+    ]
+    testruns[1].data["note"] = "slow"
+
+    store.add_testruns(testruns)
+    loaded = store.load_testruns()
+
+    assert len(loaded) == 2
+    assert [tr.result for tr in loaded] == [tr.result for tr in testruns]
+    assert loaded[1].data == {"note": "slow"}
+    assert loaded[0].get_lean_elapsed_milliseconds() == 200
+    assert (loaded[0].wall_time_ns, loaded[0].cpu_user_time_ns) == (199_000, 150)
+    assert loaded[0].stdout_filename == testruns[0].stdout_filename
+    assert loaded[0].compiler_output_filename is None
+    assert (loaded[0].memory_limit, loaded[0].time_limit) == (256, 2.0)
+    assert loaded[0].peak_memory_mb == 12
+    assert loaded[0].cpu_core == 3
+
+
+def test_loaded_testruns_share_one_object_graph(
+    store: ResultStore, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    alice = Solution(problem, "alice", "/solutions/alice", language="python")
+    bob = Solution(problem, "bob", "/solutions/bob", language="cpp")
+    problem.output_filename = "sum.out"
+    problem.config.verifier = "IntegerSequenceVerifier"
+    store.add_testruns([make_finished_testrun(alice, index) for index in range(2)])
+    store.add_testruns([make_finished_testrun(bob, index) for index in range(2)])
+
+    loaded = store.load_testruns()
+
+    loaded_problem = loaded[0].solution.problem
+    assert all(tr.solution.problem is loaded_problem for tr in loaded)
+    assert all(tr.testcase.problem is loaded_problem for tr in loaded)
+    assert [s.author for s in loaded_problem.solutions] == ["alice", "bob"]
+    assert [tc.score for tc in loaded_problem.testcases] == [10, 20]
+    assert loaded_problem.config.verifier == "IntegerSequenceVerifier"
+    assert loaded_problem.output_filename == "sum.out"
+    assert loaded[2].solution.language == "cpp"
+
+
+def test_rewriting_a_testrun_replaces_its_outcome(
+    store: ResultStore, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    solution = Solution(problem, "alice", "/solutions/alice")
+    store.add_testruns([make_finished_testrun(solution, 0)])
+    store.add_testruns([make_finished_testrun(solution, 1)])
+
+    wrong = TestRunWrongAnswerResult(expected="3", actual="4")
+    store.add_testruns([make_finished_testrun(solution, 0, wrong)])
+    loaded = store.load_testruns()
+
+    assert [tr.testcase.name for tr in loaded] == ["01", "02"]
+    assert loaded[0].result == wrong
+
+
+def test_reference_solution_is_restored(
+    store: ResultStore, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    reference = Solution(problem, "_reference", "/problems/sum/solutions/_reference")
+    problem.reference_solution = reference
+    store.add_testruns([make_finished_testrun(reference, 0)])
+
+    loaded_problem = store.load_testruns()[0].solution.problem
+
+    assert loaded_problem.reference_solution is not None
+    assert loaded_problem.reference_solution.author == "_reference"
+    assert loaded_problem.solutions == []
+
+
+def test_store_persists_across_connections(
+    tmp_path: Path, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    solution = Solution(problem, "alice", "/solutions/alice")
+    with contextlib.closing(ResultStore(tmp_path / "testruns.db")) as store:
+        store.add_testruns([make_finished_testrun(solution, 0)])
+
+    with contextlib.closing(ResultStore(tmp_path / "testruns.db")) as store:
+        assert len(store.load_testruns()) == 1
+
+
+def test_store_is_queryable_with_sql(
+    tmp_path: Path, problem: Problem, make_finished_testrun: Callable[..., TestRun]
+):
+    solution = Solution(problem, "alice", "/solutions/alice")
+    with contextlib.closing(ResultStore(tmp_path / "testruns.db")) as store:
+        store.add_testruns([make_finished_testrun(solution, index) for index in range(2)])
+
+    with sqlite3.connect(tmp_path / "testruns.db") as connection:
+        rows = connection.execute(
+            "SELECT s.author, SUM(r.score) FROM runs r "
+            "JOIN solutions s ON s.id = r.solution_id GROUP BY s.author"
+        ).fetchall()
+
+    assert rows == [("alice", 30)]
@@ -0,0 +1,77 @@
+"""Tests for the serialization of test run outcomes."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+
+import pytest
+
+from hammurabi.grader import serialization
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.model import TestRunCompilationErrorResult
+from hammurabi.grader.model import TestRunCorrectAnswerResult
+from hammurabi.grader.model import TestRunMemoryExceededResult
+from hammurabi.grader.model import TestRunResult
+from hammurabi.grader.model import TestRunTimeoutResult
+from hammurabi.grader.model import TestRunWrongAnswerResult
+
+
+@pytest.fixture
+def testrun(problem: Problem, make_testrun: Callable[..., TestRun]) -> TestRun:
+    return make_testrun(problem)
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        TestRunCorrectAnswerResult(score=10),
+        TestRunWrongAnswerResult(expected="1", actual="2"),
+        TestRunTimeoutResult(timeout=2.5),
+        TestRunMemoryExceededResult(memory_limit_mb=256, peak_memory_mb=300),
+        TestRunCompilationErrorResult(message="error: expected ';'"),
+    ],
+)
+def test_result_roundtrip(result: TestRunResult):
+    data = json.loads(json.dumps(serialization.result_to_dict(result)))
+
+    restored = serialization.result_from_dict(data)
+
+    assert type(restored) is type(result)
+    assert restored == result
+
+
+def test_unknown_result_type_raises():
+    with pytest.raises(ValueError, match="Unknown test run result type"):
+        serialization.result_from_dict({"type": "NoSuchResult"})
+
+
+def test_testrun_outcome_roundtrip(testrun: TestRun):
+    testrun.result = TestRunTimeoutResult(timeout=1.0)
+    testrun.time_limit = 1.0
+    testrun.memory_limit = 128
+    testrun.judge_start_time = 100
+    testrun.lean_start_time = 110
+    testrun.lean_end_time = 1110
+    testrun.judge_end_time = 1120
+    testrun.wall_time_ns = 999_500_000
+    testrun.cpu_user_time_ns = 900_000_000
+    testrun.cpu_system_time_ns = 50_000_000
+    testrun.peak_memory_mb = 64
+    testrun.cpu_core = 2
+    testrun.data["note"] = "value"
+    outcome = json.loads(json.dumps(serialization.testrun_outcome_to_dict(testrun)))
+
+    restored = TestRun(testrun.solution, testrun.testcase, None, None, None, None, None)
+    serialization.apply_testrun_outcome(restored, outcome)
+
+    assert restored.result == testrun.result
+    assert restored.get_lean_elapsed_milliseconds() == 1000
+    assert restored.get_judge_elapsed_milliseconds() == 1020
+    assert restored.get_wall_time_milliseconds() == 999.5
+    assert restored.get_cpu_time_milliseconds() == 950.0
+    assert restored.peak_memory_mb == 64
+    assert restored.cpu_core == 2
+    assert (restored.time_limit, restored.memory_limit) == (1.0, 128)
+    assert restored.data == {"note": "value"}
@@ -0,0 +1,89 @@
+"""Tests for the statistics of repeated time measurements."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+
+from hammurabi.grader.model import Problem
+from hammurabi.grader.model import TestRun
+from hammurabi.grader.timing import get_median_confidence_interval
+from hammurabi.grader.timing import get_percentile
+from hammurabi.grader.timing import summarize_phase_times
+from hammurabi.grader.timing import summarize_time_samples
+
+
+def test_summarize_time_samples():
+    summary = summarize_time_samples([30, 10, 20, 100, 25])
+
+    assert summary["samples_ns"] == [30, 10, 20, 100, 25]
+    assert summary["median_ns"] == 25
+    # Deviations from the median: 5, 15, 5, 75, 0.
+    assert summary["mad_ns"] == 5
+    assert summary["min_ns"] == 10
+    assert summary["confidence"] == 0.95
+
+
+def test_summarize_single_sample():
+    summary = summarize_time_samples([42])
+
+    assert summary["median_ns"] == summary["min_ns"] == 42
+    assert summary["mad_ns"] == 0
+    assert (summary["ci_low_ns"], summary["ci_high_ns"]) == (42, 42)
+
+
+@pytest.mark.parametrize(
+    ("sample_count", "expected_bounds"),
+    [
+        # Too few samples to reach 95%: the whole range is returned.
+        (3, (1, 3)),
+        (5, (1, 5)),
+        # The 2nd smallest to 2nd largest of 10 samples covers the median with 97.9%.
+        (10, (2, 9)),
+        # The 6th smallest to 6th largest of 20 samples covers the median with 95.9%.
+        (20, (6, 15)),
+    ],
+)
+def test_median_confidence_interval(sample_count: int, expected_bounds: tuple[int, int]):
+    ordered_samples = list(range(1, sample_count + 1))
+
+    assert get_median_confidence_interval(ordered_samples) == expected_bounds
+
+
+def test_lower_confidence_gives_narrower_interval():
+    ordered_samples = list(range(1, 11))
+
+    assert get_median_confidence_interval(ordered_samples, confidence=0.5) == (4, 7)
+
+
+@pytest.mark.parametrize(
+    ("fraction", "expected"),
+    [(0.0, 1), (0.5, 10), (0.95, 19), (1.0, 20)],
+)
+def test_get_percentile(fraction: float, expected: int):
+    assert get_percentile(list(range(1, 21)), fraction) == expected
+
+
+def test_phase_times_accumulate(problem: Problem, make_testrun: Callable[..., TestRun]):
+    testrun = make_testrun(problem)
+
+    with testrun.timed_phase("work_dir"):
+        pass
+    testrun.record_phase_time("verify", 5)
+    testrun.record_phase_time("verify", 7)
+
+    assert testrun.get_phase_time_ns("verify") == 12
+    assert (testrun.get_phase_time_ns("work_dir") or 0) > 0
+    assert testrun.get_phase_time_ns("execute") is None
+
+
+def test_summarize_phase_times(problem: Problem, make_testrun: Callable[..., TestRun]):
+    testruns = [make_testrun(problem) for _ in range(20)]
+    for index, testrun in enumerate(testruns, start=1):
+        testrun.record_phase_time("run", index * 1000)
+    testruns[0].record_phase_time("verify", 300)
+
+    summary = summarize_phase_times(testruns)
+
+    assert summary == {"run": (10_000, 19_000), "verify": (300, 300)}
@@ -0,0 +1,55 @@
+"""Tests for the trace of a grading run."""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+from hammurabi.grader import tracing
+from hammurabi.grader.tracing import Tracer
+
+
+def test_spans_are_recorded_on_the_track_of_their_thread():
+    tracer = Tracer()
+
+    with tracer.span("discovery", "discovery"):
+        pass
+    worker = threading.Thread(
+        target=lambda: tracer.add_span("run a/b/01", "run", 1000, 3000, {}), name="run_0"
+    )
+    worker.start()
+    worker.join()
+
+    events = tracer.get_events()
+    thread_names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    spans = [event for event in events if event["ph"] == "X"]
+    assert [span["name"] for span in spans] == ["discovery", "run a/b/01"]
+    assert thread_names[spans[0]["tid"]] == threading.current_thread().name
+    assert thread_names[spans[1]["tid"]] == "run_0"
+    assert spans[1]["dur"] == 2.0
+
+
+def test_tracing_to_writes_trace_file(tmp_path: Path):
+    trace_path = tmp_path / "trace.json"
+
+    with (
+        tracing.tracing_to(str(trace_path)),
+        tracing.span("compile p/alice", "compile", author="alice"),
+    ):
+        pass
+
+    trace = json.loads(trace_path.read_text())
+    [span] = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert span["name"] == "compile p/alice"
+    assert span["cat"] == "compile"
+    assert span["args"] == {"author": "alice"}
+    assert span["dur"] >= 0
+
+
+def test_span_without_tracing_records_nothing(tmp_path: Path):
+    with tracing.tracing_to(None) as tracer, tracing.span("discovery", "discovery"):
+        pass
+
+    assert tracer is None
+    assert not list(tmp_path.iterdir())
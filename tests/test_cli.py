@@ -123,6 +123,97 @@ class TestParseCommandLineArgs:
         assert args.author == ["alice"]
         assert args.testcase == ["01", "02"]
 
+    def test_grade_command_jobs_defaults_to_one(self):
+        """Should run test cases sequentially unless --jobs is given."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+
+        assert args.jobs == 1
+
+    def test_grade_command_with_jobs(self):
+        """Should parse --jobs as an integer."""
+        argv = ["hammurabi", "grade", "--jobs", "8"]
+        with patch.object(sys, "argv", argv):
+            args = _parse_command_line_args(argv)
+
+        assert args.jobs == 8
+
+    def test_grade_command_rejects_non_positive_jobs(self):
+        """--jobs should reject zero and negative values."""
+        argv = ["hammurabi", "grade", "--jobs", "0"]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit):
+            _parse_command_line_args(argv)
+
+    def test_grade_command_compile_jobs_defaults_to_one(self):
+        """Should compile one solution ahead unless --compile-jobs is given."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+
+        assert args.compile_jobs == 1
+
+    def test_grade_command_with_compile_jobs(self):
+        """Should parse --compile-jobs as an integer."""
+        argv = ["hammurabi", "grade", "--compile-jobs", "3"]
+        with patch.object(sys, "argv", argv):
+            args = _parse_command_line_args(argv)
+
+        assert args.compile_jobs == 3
+
+    def test_grade_command_with_repeat(self):
+        """--repeat should default to one and reject zero."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+        argv = ["hammurabi", "grade", "--repeat", "5"]
+        with patch.object(sys, "argv", argv):
+            repeat_args = _parse_command_line_args(argv)
+
+        assert args.repeat == 1
+        assert repeat_args.repeat == 5
+        argv = ["hammurabi", "grade", "--repeat", "0"]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit):
+            _parse_command_line_args(argv)
+
+    def test_grade_command_incremental_flag(self):
+        """--incremental should default to False and be enabled by the flag."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+        argv = ["hammurabi", "grade", "--incremental"]
+        with patch.object(sys, "argv", argv):
+            incremental_args = _parse_command_line_args(argv)
+
+        assert args.incremental is False
+        assert incremental_args.incremental is True
+
+    def test_grade_command_with_trace(self):
+        """Should parse the trace file passed to --trace, and trace nothing by default."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+        argv = ["hammurabi", "grade", "--trace", "trace.json"]
+        with patch.object(sys, "argv", argv):
+            trace_args = _parse_command_line_args(argv)
+
+        assert args.trace is None
+        assert trace_args.trace == "trace.json"
+
+    def test_grade_command_profile_flag(self):
+        """--profile should default to False and be enabled by the flag."""
+        with patch.object(sys, "argv", ["hammurabi", "grade"]):
+            args = _parse_command_line_args(["hammurabi", "grade"])
+        argv = ["hammurabi", "grade", "--profile"]
+        with patch.object(sys, "argv", argv):
+            profile_args = _parse_command_line_args(argv)
+
+        assert args.profile is False
+        assert profile_args.profile is True
+
+    def test_grade_command_with_resume(self):
+        """Should parse the report directory passed to --resume."""
+        argv = ["hammurabi", "grade", "--resume", "reports/testrun-1"]
+        with patch.object(sys, "argv", argv):
+            args = _parse_command_line_args(argv)
+
+        assert args.resume == "reports/testrun-1"
+
     def test_languages_command(self):
         """Should parse languages command."""
         with patch.object(sys, "argv", ["hammurabi", "languages"]):
@@ -68,3 +68,66 @@ def test_grep_value_from_file_group_specified_returns_only_that_group(sample_fil
 
     # Assert
     assert value == "012"
+
+
+def test_clone_file_replicates_content(tmp_path):
+    # Arrange
+    source = tmp_path / "source.txt"
+    source.write_text("hello")
+    target = tmp_path / "target.txt"
+
+    # Act
+    fileio.clone_file(source, target)
+
+    # Assert
+    assert target.read_text() == "hello"
+
+
+def test_clone_file_preserves_executable_mode(tmp_path):
+    # Arrange
+    source = tmp_path / "program"
+    source.write_bytes(b"\x7fELF")
+    source.chmod(0o755)
+    target = tmp_path / "program-clone"
+
+    # Act
+    fileio.clone_file(source, target)
+
+    # Assert
+    assert target.stat().st_mode & 0o777 == 0o755
+
+
+def test_clone_file_falls_back_to_copy_when_links_fail(tmp_path, monkeypatch):
+    # Arrange
+    source = tmp_path / "source.txt"
+    source.write_text("hello")
+    target = tmp_path / "target.txt"
+
+    def fail_link(*args, **kwargs):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(fileio, "_try_reflink", lambda source, target: False)
+    monkeypatch.setattr(fileio.os, "link", fail_link)
+
+    # Act
+    fileio.clone_file(source, target)
+
+    # Assert
+    assert target.read_text() == "hello"
+    assert target.stat().st_ino != source.stat().st_ino
+
+
+def test_clone_tree_replicates_nested_directories(tmp_path):
+    # Arrange
+    source_dir = tmp_path / "source"
+    (source_dir / "pkg" / "sub").mkdir(parents=True)
+    (source_dir / "Main.class").write_text("main")
+    (source_dir / "pkg" / "sub" / "Helper.class").write_text("helper")
+    target_dir = tmp_path / "target" / "nested"
+
+    # Act
+    fileio.clone_tree(source_dir, target_dir)
+
+    # Assert
+    assert (target_dir / "Main.class").read_text() == "main"
+    assert (target_dir / "pkg" / "sub" / "Helper.class").read_text() == "helper"